@@ -0,0 +1,239 @@
+"""
+Browser Pool Module
+
+Keeps headless Chrome warm for the Selenium scrapes. The chromedriver path is
+resolved once and remembered in cache/chromedriver.json (pin a version with
+CHROMEDRIVER_VERSION), and browser sessions are reused across pages with
+images, fonts and stylesheets blocked, so scraping many dates costs one
+browser start instead of one per page.
+
+Usage:
+    python browser_pool.py benchmark --pages 5
+    python browser_pool.py benchmark --pages 3 --url https://www.wearechurchreading.com/
+"""
+
+import argparse
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+# Driver cache location (inside the local fetch cache)
+DRIVER_CACHE_PATH = os.path.join(
+    os.getenv("DEVOTIONAL_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")),
+    "chromedriver.json",
+)
+
+PINNED_VERSION = os.getenv("CHROMEDRIVER_VERSION") or None
+POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "1"))
+
+# Requests for these never leave the browser
+BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.css",
+]
+
+_idle = []
+_open_count = 0
+_pool_lock = threading.Condition()
+
+
+def resolve_driver_path():
+    """
+    Return a chromedriver path, downloading only when the cached one is gone
+    or doesn't match CHROMEDRIVER_VERSION.
+    """
+    if os.path.exists(DRIVER_CACHE_PATH):
+        with open(DRIVER_CACHE_PATH, encoding="utf-8") as f:
+            cached = json.load(f)
+        if os.path.exists(cached.get("path", "")) and cached.get("pinned") == PINNED_VERSION:
+            return cached["path"]
+
+    path = ChromeDriverManager(driver_version=PINNED_VERSION).install()
+    os.makedirs(os.path.dirname(DRIVER_CACHE_PATH), exist_ok=True)
+    with open(DRIVER_CACHE_PATH, "w", encoding="utf-8") as f:
+        json.dump({"path": path, "pinned": PINNED_VERSION}, f)
+    return path
+
+
+def _chrome_options(block_assets=True):
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    if not block_assets:
+        return chrome_options
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    chrome_options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.stylesheets": 2,
+        "profile.managed_default_content_settings.fonts": 2,
+    })
+    return chrome_options
+
+
+def start_browser(block_assets=True):
+    """Start one headless Chrome (images, fonts and CSS blocked unless `block_assets` is False)."""
+    service = Service(resolve_driver_path())
+    driver = webdriver.Chrome(service=service, options=_chrome_options(block_assets))
+    if block_assets:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    return driver
+
+
+@contextmanager
+def session(fresh=False):
+    """
+    Borrow a warm browser from the pool (up to BROWSER_POOL_SIZE are started).
+    A browser that raised is discarded rather than returned to the pool.
+    With `fresh`, an idle browser is quit and a new one started in its place.
+    """
+    global _open_count
+    stale = None
+    with _pool_lock:
+        while not _idle and _open_count >= POOL_SIZE:
+            _pool_lock.wait()
+        if _idle:
+            driver = _idle.pop()
+            if fresh:
+                stale, driver = driver, None  # Its slot goes to the new browser
+        else:
+            _open_count += 1
+            driver = None
+
+    if stale is not None:
+        try:
+            stale.quit()
+        except Exception:
+            pass
+
+    if driver is None:
+        try:
+            driver = start_browser()
+        except Exception:
+            with _pool_lock:
+                _open_count -= 1
+                _pool_lock.notify()
+            raise
+
+    healthy = False
+    try:
+        yield driver
+        healthy = True
+    finally:
+        with _pool_lock:
+            if healthy:
+                _idle.append(driver)
+            else:
+                _open_count -= 1
+            _pool_lock.notify()
+        if not healthy:
+            driver.quit()
+
+
+def run(task):
+    """
+    Return `task(driver)` run on a pooled browser.
+
+    In serve mode a pooled browser can die between runs (a crashed renderer
+    or a killed chromedriver). If the task fails and the browser no longer
+    responds, it is discarded and the task is retried once on a fresh one;
+    other failures are raised as usual.
+    """
+    died = False
+    try:
+        with session() as driver:
+            try:
+                return task(driver)
+            except WebDriverException:
+                died = not _responds(driver)
+                raise
+    except WebDriverException as e:
+        if not died:
+            raise
+        print(f"Browser died ({type(e).__name__}); retrying once on a fresh browser.")
+    with session(fresh=True) as driver:
+        return task(driver)
+
+
+def _responds(driver):
+    try:
+        driver.current_url
+        return True
+    except WebDriverException:
+        return False
+
+
+def scrape_many(urls, extract):
+    """
+    Load each URL in one warm session and apply `extract(driver)`.
+
+    Returns:
+        Dict: {url: extract result, or None if the page failed}
+    """
+    results = {}
+    with session() as driver:
+        for url in urls:
+            try:
+                driver.get(url)
+                results[url] = extract(driver)
+            except Exception as e:
+                print(f"Error scraping {url}: {e}")
+                results[url] = None
+    return results
+
+
+@atexit.register
+def close_all():
+    """Quit every idle browser in the pool."""
+    global _open_count
+    with _pool_lock:
+        drivers, _idle[:] = list(_idle), []
+        _open_count -= len(drivers)
+    for driver in drivers:
+        driver.quit()
+
+
+def benchmark(url, pages):
+    """Compare a cold headless browser per page (the old path) with one warm, asset-blocked session."""
+    start = time.perf_counter()
+    resolve_driver_path()
+    print(f"Driver resolved in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    cold = []
+    for _ in range(pages):
+        start = time.perf_counter()
+        driver = start_browser(block_assets=False)
+        driver.get(url)
+        driver.quit()
+        cold.append((time.perf_counter() - start) * 1000)
+
+    warm = []
+    with session() as driver:
+        for _ in range(pages):
+            start = time.perf_counter()
+            driver.get(url)
+            warm.append((time.perf_counter() - start) * 1000)
+
+    print(f"Cold start per page: {sum(cold) / pages:.0f} ms (n={pages})")
+    print(f"Warm session per page: {sum(warm) / pages:.0f} ms (first page {warm[0]:.0f} ms)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warm headless browser pool.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    bench_parser = subparsers.add_parser("benchmark", help="Per-page cost: cold start vs warm session.")
+    bench_parser.add_argument("--url", default="https://www.wearechurchreading.com/")
+    bench_parser.add_argument("--pages", type=int, default=5)
+    args = parser.parse_args()
+
+    benchmark(args.url, args.pages)
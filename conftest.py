@@ -0,0 +1,13 @@
+import pytest
+
+
+@pytest.fixture
+def offline_bot():
+    """devotional_bot with the offline stubs installed for one test, then restored."""
+    import devotional_bot
+    import offline_stubs
+    uninstall = offline_stubs.install(devotional_bot)
+    generation_slots = devotional_bot._generation_slots
+    yield devotional_bot
+    devotional_bot._generation_slots = generation_slots
+    uninstall()
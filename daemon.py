@@ -0,0 +1,196 @@
+"""
+Daemon Module
+
+Keeps the bot resident for `devotional_bot.py serve`: a cron-style scheduler
+runs jobs in-process (so Gemini/HTTP clients, the browser pool, caches and
+indexes stay warm between runs) and a small local HTTP endpoint reports
+health and job status.
+
+Schedules use five cron fields (minute hour day-of-month month day-of-week,
+with *, lists, ranges and */steps; Sunday is 0), evaluated in UTC like the
+GitHub Actions workflows.
+
+    GET /health   -> {"status": "ok", "uptime_s": ...}
+    GET /status   -> health plus every job's next/last run and outcome
+"""
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+
+def _parse_field(field, low, high):
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step = part.split("/")
+            step = int(step)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(x) for x in part.split("-"))
+        else:
+            start = end = int(part)
+        if start < low or end > high:
+            raise ValueError(f"Cron value out of range {low}-{high}: '{field}'")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+def parse_cron(expression):
+    """
+    Parse a five-field cron expression.
+
+    Returns:
+        List of five sets: minutes, hours, days of month, months, days of week.
+    """
+    fields = expression.split()
+    if len(fields) != 5:
+        raise ValueError(f"Expected 5 cron fields, got '{expression}'")
+    schedule = [_parse_field(field, *_FIELD_RANGES[i]) for i, field in enumerate(fields)]
+    if 7 in schedule[4]:
+        schedule[4] = (schedule[4] - {7}) | {0}  # 7 is also Sunday
+    return schedule
+
+
+def cron_matches(schedule, moment):
+    minutes, hours, days, months, weekdays = schedule
+    day_ok = moment.day in days
+    weekday_ok = (moment.weekday() + 1) % 7 in weekdays
+    if len(days) < 31 and len(weekdays) < 7:
+        day_matches = day_ok or weekday_ok  # Both restricted: cron matches either
+    else:
+        day_matches = day_ok and weekday_ok
+    return moment.minute in minutes and moment.hour in hours and moment.month in months and day_matches
+
+
+def next_fire(schedule, after):
+    """Return the first whole minute strictly after `after` that matches `schedule`."""
+    moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    for _ in range(366 * 24 * 60):
+        if cron_matches(schedule, moment):
+            return moment
+        moment += timedelta(minutes=1)
+    raise ValueError("Cron schedule never fires")
+
+
+class Job:
+    """A named callable with a cron schedule and the outcome of its last run."""
+
+    def __init__(self, name, expression, func):
+        self.name = name
+        self.expression = expression
+        self.schedule = parse_cron(expression)
+        self.func = func
+        self.next_run = next_fire(self.schedule, datetime.now(timezone.utc))
+        self.last_run = None
+        self.last_outcome = None
+        self.last_ms = None
+        self.runs = 0
+
+    def status(self):
+        return {
+            "name": self.name,
+            "schedule": self.expression,
+            "next_run": self.next_run.isoformat(timespec="minutes"),
+            "last_run": self.last_run.isoformat(timespec="seconds") if self.last_run else None,
+            "last_outcome": self.last_outcome,
+            "last_ms": self.last_ms,
+            "runs": self.runs,
+        }
+
+
+class Daemon:
+    """Runs due jobs one at a time on the scheduler thread and serves /health and /status."""
+
+    def __init__(self, jobs, host="127.0.0.1", port=8787):
+        self.jobs = jobs
+        self.host = host
+        self.port = port
+        self.started = time.monotonic()
+        self.running = None
+        self._stop = threading.Event()
+        self._server = None
+
+    def status(self, detail=True):
+        status = {
+            "status": "ok",
+            "uptime_s": round(time.monotonic() - self.started, 1),
+            "running": self.running,
+        }
+        if detail:
+            status["jobs"] = [job.status() for job in self.jobs]
+        return status
+
+    def run_job(self, job):
+        """
+        Run one job now and record its outcome (exceptions are logged, not raised).
+        A job may return a run record ({'outcome': ...}), True/None for ok, or False.
+        """
+        self.running = job.name
+        job.last_run = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        try:
+            result = job.func()
+            if isinstance(result, dict):
+                job.last_outcome = result.get("outcome", "ok")
+            else:
+                job.last_outcome = "failed" if result is False else "ok"
+        except Exception as e:
+            print(f"Error in scheduled job {job.name}: {e}")
+            job.last_outcome = f"error: {e}"
+        job.last_ms = round((time.perf_counter() - start) * 1000, 1)
+        job.runs += 1
+        self.running = None
+
+    def _serve_http(self):
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path not in ("/health", "/status"):
+                    self.send_error(404)
+                    return
+                body = json.dumps(daemon.status(detail=self.path == "/status")).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        print(f"--- Health endpoint on http://{self.host}:{self._server.server_port}/status ---")
+
+    def serve(self):
+        """Block, running jobs as they fall due, until stop() or Ctrl+C."""
+        self._serve_http()
+        for job in self.jobs:
+            print(f"Scheduled {job.name} ({job.expression}), next run {job.next_run:%Y-%m-%d %H:%M} UTC")
+        try:
+            while not self._stop.is_set():
+                now = datetime.now(timezone.utc)
+                due = [job for job in self.jobs if job.next_run <= now]
+                for job in sorted(due, key=lambda job: job.next_run):
+                    print(f"\n=== {now:%Y-%m-%d %H:%M} UTC: running {job.name} ===")
+                    self.run_job(job)
+                    job.next_run = next_fire(job.schedule, datetime.now(timezone.utc))
+                if not due:
+                    wake = min(job.next_run for job in self.jobs)
+                    self._stop.wait(min(30.0, max(1.0, (wake - now).total_seconds())))
+        except KeyboardInterrupt:
+            print("\n--- Stopping daemon ---")
+        finally:
+            if self._server:
+                self._server.shutdown()
+
+    def stop(self):
+        self._stop.set()
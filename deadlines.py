@@ -0,0 +1,79 @@
+"""
+Run Deadline Module
+
+One time budget for a whole run, passed to every stage. Timeouts and retry
+back-offs shrink to fit the time left, so a bad morning (slow model, 429s,
+SMTP hiccups) ends in a timely, partially degraded email instead of tens of
+minutes of stacked 60-second sleeps.
+
+    deadline = Deadline(1200)                 # 20 minutes for the run
+    generation = deadline.reserve(90)         # leave 90 s for rendering and SMTP
+    generation.timeout(120)                   # <= 120 s, less as time runs out
+    if not generation.backoff(60): ...        # no time for another attempt
+"""
+
+import time
+
+# A retry is only worth starting with at least this much time left
+MIN_ATTEMPT_SECONDS = 20.0
+# Never hand a network call a timeout shorter than this
+MIN_TIMEOUT_SECONDS = 5.0
+
+
+class DeadlineExceeded(Exception):
+    """Raised by stages that refuse to start once the run's time is up."""
+
+
+class Deadline:
+    """
+    A point in time every stage works towards. Deadline(None) never expires,
+    so stages can take one unconditionally (batch pre-generation has no send time).
+    """
+
+    def __init__(self, seconds, clock=time.monotonic, sleep=time.sleep, expires_at=None):
+        self._clock = clock
+        self._sleep = sleep
+        if expires_at is not None:
+            self.expires_at = expires_at
+        else:
+            self.expires_at = None if seconds is None else clock() + seconds
+
+    def remaining(self):
+        """Seconds left (infinite for an open-ended deadline)."""
+        if self.expires_at is None:
+            return float("inf")
+        return max(0.0, self.expires_at - self._clock())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def reserve(self, seconds):
+        """A deadline `seconds` earlier, leaving that much time for later stages."""
+        if self.expires_at is None:
+            return self
+        return Deadline(None, self._clock, self._sleep, expires_at=self.expires_at - seconds)
+
+    def check(self, stage):
+        """Raise DeadlineExceeded if no time is left to start `stage`."""
+        if self.expired():
+            raise DeadlineExceeded(f"run deadline reached before {stage}")
+
+    def timeout(self, default):
+        """`default` seconds, shrunk to the time left (but at least MIN_TIMEOUT_SECONDS)."""
+        return max(MIN_TIMEOUT_SECONDS, min(default, self.remaining()))
+
+    def backoff(self, seconds):
+        """
+        Sleep before a retry, shortened so the retry itself still fits.
+
+        Returns:
+            bool: False (without sleeping) if there is no time left for another attempt.
+        """
+        spare = self.remaining() - MIN_ATTEMPT_SECONDS
+        if spare <= 0:
+            return False
+        wait = min(seconds, spare / 2)
+        if wait < seconds:
+            print(f"Deadline: waiting {wait:.0f}s instead of {seconds}s before retrying.")
+        self._sleep(wait)
+        return True
@@ -0,0 +1,135 @@
+"""
+Delivery Scheduling Module
+
+Per-recipient, timezone-aware delivery. Each recipient has an IANA timezone
+and a preferred local delivery time; their sends go into a time-ordered
+priority queue (heapq) and are released when due, spaced so that many
+recipients sharing a slot become an even stream of SMTP sends instead of a
+burst.
+
+Recipients live in recipients.json (not committed; see
+recipients.example.json):
+    [{"email": "a@example.com", "timezone": "America/Los_Angeles", "time": "06:30"}, ...]
+A recipient may add "language" (a code from TRANSLATION_LANGUAGES) to get
+that translated edition.
+
+Usage:
+    python devotional_bot.py deliver                    # today's reading
+    python devotional_bot.py deliver --date 2026-10-20  # generate ahead, send at each slot
+"""
+
+import heapq
+import itertools
+import json
+import os
+import time
+from datetime import date, datetime, time as dt_time, timezone
+from zoneinfo import ZoneInfo
+
+# Recipients file location (same directory as this script)
+RECIPIENTS_PATH = os.getenv(
+    "RECIPIENTS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "recipients.json")
+)
+
+DEFAULT_TIME = "06:00"
+SENDS_PER_MINUTE = float(os.getenv("DELIVERY_SENDS_PER_MINUTE", "60"))
+
+
+def load_recipients(path=None):
+    """
+    Load recipients, falling back to EMAIL_RECEIVER (delivered at once) if no file exists.
+
+    Returns:
+        List of dicts: [{'email', 'timezone', 'time'}, ...]
+    """
+    path = path or RECIPIENTS_PATH
+    if not os.path.exists(path):
+        receiver = os.getenv("EMAIL_RECEIVER")
+        return [{"email": receiver, "timezone": "UTC", "time": None}] if receiver else []
+    with open(path, encoding="utf-8") as f:
+        recipients = json.load(f)
+    for recipient in recipients:
+        ZoneInfo(recipient.setdefault("timezone", "UTC"))  # Fail early on unknown zones
+        recipient.setdefault("time", DEFAULT_TIME)
+    return recipients
+
+
+def due_at(recipient, day):
+    """
+    UTC datetime at which `recipient` should receive the devotional for `day`
+    (their local delivery time on that date). A recipient without a time is due at once.
+    """
+    if not recipient.get("time"):
+        return datetime.now(timezone.utc)
+    hour, minute = (int(x) for x in recipient["time"].split(":"))
+    local = datetime.combine(date.fromisoformat(str(day)), dt_time(hour, minute), ZoneInfo(recipient["timezone"]))
+    return local.astimezone(timezone.utc)
+
+
+class DeliveryQueue:
+    """Min-heap of (due time, item); ties keep insertion order."""
+
+    def __init__(self):
+        self._heap = []
+        self._order = itertools.count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, due, item):
+        heapq.heappush(self._heap, (due, next(self._order), item))
+
+    def next_due(self):
+        return self._heap[0][0] if self._heap else None
+
+    def pop(self):
+        due, _, item = heapq.heappop(self._heap)
+        return due, item
+
+
+def build_queue(recipients, day):
+    """Queue every recipient at their due time for `day`."""
+    queue = DeliveryQueue()
+    for recipient in recipients:
+        queue.push(due_at(recipient, day), recipient)
+    return queue
+
+
+def release(queue, send, now=None, sleep=time.sleep, sends_per_minute=SENDS_PER_MINUTE, on_idle=None):
+    """
+    Send every queued item at (or after) its due time, at most `sends_per_minute`.
+
+    Args:
+        queue: DeliveryQueue of recipients
+        send: Callable(item) -> bool
+        now: Callable returning the current UTC datetime (for tests)
+        sleep: Callable(seconds)
+        on_idle: Called before sleeping until a later slot (e.g. to close an SMTP connection)
+
+    Returns:
+        dict: {'sent', 'failed', 'max_lateness_s'}
+    """
+    now = now or (lambda: datetime.now(timezone.utc))
+    interval = 60.0 / sends_per_minute if sends_per_minute else 0.0
+    stats = {"sent": 0, "failed": 0, "max_lateness_s": 0.0}
+    last_send = None
+
+    while len(queue):
+        wait = (queue.next_due() - now()).total_seconds()
+        if wait > 0:
+            if on_idle and wait > 60:
+                on_idle()
+            sleep(wait)
+            continue
+        if last_send is not None and interval:
+            gap = interval - (now() - last_send).total_seconds()
+            if gap > 0:
+                sleep(gap)
+        due, item = queue.pop()
+        last_send = now()
+        stats["max_lateness_s"] = max(stats["max_lateness_s"], round((now() - due).total_seconds(), 1))
+        if send(item):
+            stats["sent"] += 1
+        else:
+            stats["failed"] += 1
+    return stats
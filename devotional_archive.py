@@ -0,0 +1,330 @@
+"""
+Devotional Archive Module
+
+Keeps every generated devotional (reference, V2 content, case study, core
+devotional and quotes) so past runs can be searched, re-rendered and
+compared without a model call. Scripture is stored only as its reference
+and version: the licensed text is not redistributed through the repo, and
+is re-resolved from the local passage cache / verse store when a day is
+rendered (devotional_bot.archived_bible_texts).
+
+Each run is stored as one JSON file per day under archive/ (small, mergeable
+text diffs, like quotes_history/). Content generated ahead of time by batch
+mode waits under archive/pending/ until its day is sent. archive.db is a
+local SQLite index with an FTS5 table over the reference, big idea,
+insight, case study and quotes; it is rebuilt incrementally from the JSON
+files on load.
+
+Usage:
+    python devotional_archive.py search "Genesis 43"
+    python devotional_archive.py search "Corrie ten Boom" --field case_study
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import scripture_refs
+
+# File locations (same directory as this script)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ARCHIVE_DIR = os.path.join(BASE_DIR, "archive")
+PENDING_DIR = os.path.join(ARCHIVE_DIR, "pending")
+DB_PATH = os.path.join(BASE_DIR, "archive.db")
+
+# Serializes index syncs when stages run on worker threads
+_sync_lock = threading.Lock()
+
+SEARCH_FIELDS = ["reference", "subject", "big_idea", "insight", "case_study", "quotes", "core_devotional"]
+
+
+def _run_path(date):
+    return os.path.join(ARCHIVE_DIR, f"{date}.json")
+
+
+def save_run(reference, v2_content, case_study, core_devo, quotes_list, date=None, persona=None, version=None):
+    """
+    Write one day's devotional to the archive (indexed on the next search).
+    `version` is the scripture translation it was written against. Runs for a
+    non-default `persona` go under archive/personas/<name>/ and are kept but not indexed.
+
+    Returns:
+        str: Path of the archived JSON file.
+    """
+    date = date or datetime.now().isoformat()[:10]  # YYYY-MM-DD
+    record = {
+        "date": date,
+        "reference": reference,
+        "version": version,
+        "v2_content": v2_content,
+        "case_study": case_study,
+        "core_devotional": core_devo,
+        "quotes": quotes_list or [],
+    }
+    if persona:
+        record["persona"] = persona
+
+    path = os.path.join(ARCHIVE_DIR, "personas", persona, f"{date}.json") if persona else _run_path(date)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False, indent=1)
+        f.write("\n")
+    return path
+
+
+def _pending_path(date):
+    return os.path.join(PENDING_DIR, f"{date}.json")
+
+
+def save_pending(date, reference, v2_content, case_study, core_devo, quotes_list, version=None):
+    """
+    Store content generated ahead of time for a future date.
+
+    Returns:
+        str: Path of the pending JSON file.
+    """
+    record = {
+        "date": date,
+        "reference": reference,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "version": version,
+        "v2_content": v2_content,
+        "case_study": case_study,
+        "core_devotional": core_devo,
+        "quotes": quotes_list or [],
+    }
+    os.makedirs(PENDING_DIR, exist_ok=True)
+    path = _pending_path(date)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False, indent=1)
+        f.write("\n")
+    return path
+
+
+def load_pending(date):
+    """Return pre-generated content for a YYYY-MM-DD date, or None."""
+    path = _pending_path(date)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def list_pending():
+    """Return the dates that have pre-generated content waiting to be sent."""
+    if not os.path.isdir(PENDING_DIR):
+        return []
+    return sorted(name[:-5] for name in os.listdir(PENDING_DIR) if name.endswith(".json"))
+
+
+def discard_pending(date):
+    """Remove a date's pre-generated content once it has been sent."""
+    path = _pending_path(date)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def load_run(date):
+    """Return the archived record for a YYYY-MM-DD date, or None."""
+    path = _run_path(date)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def find_cached_sections(reference, before=None):
+    """
+    The most recent archived day (before `before`, default today) for the same
+    passage, compared by canonical reference. Used to stand in for modules a
+    run had no time to generate.
+
+    Returns:
+        dict: {'date', 'case_study', 'core_devotional', 'quotes'}, or {} if none.
+    """
+    key = scripture_refs.cache_key(reference)
+    before = before or datetime.now().isoformat()[:10]
+    for match in sorted(search(reference, field="reference", limit=50), key=lambda m: m["date"], reverse=True):
+        if match["date"] >= before or scripture_refs.cache_key(match["reference"] or "") != key:
+            continue
+        record = load_run(match["date"])
+        if record:
+            return {field: record.get(field) for field in ("date", "case_study", "core_devotional", "quotes")}
+    return {}
+
+
+def _fts_rowid(date):
+    """Stable FTS rowid for a YYYY-MM-DD date, so re-indexing a day is a keyed delete."""
+    return int(date.replace("-", ""))
+
+
+def _index_fields(record):
+    """Flatten an archived record into the FTS columns."""
+    v2 = record.get("v2_content") or {}
+    case = record.get("case_study") or {}
+    core = record.get("core_devotional") or {}
+    return {
+        "reference": record.get("reference") or "",
+        "subject": v2.get("header", {}).get("subject", ""),
+        "big_idea": v2.get("header", {}).get("big_idea", ""),
+        "insight": v2.get("anchor", {}).get("insight", ""),
+        "case_study": " ".join(filter(None, [case.get("subject"), case.get("narrative"), case.get("connection")])),
+        "quotes": " ".join(f"{q.get('quote', '')} {q.get('author', '')}" for q in record.get("quotes") or []),
+        "core_devotional": f"{core.get('title', '')} {core.get('content', '')}".strip(),
+        "case_subject": case.get("subject", ""),
+    }
+
+
+def init_db(conn):
+    """Create the index tables if they don't exist."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS runs (
+            date TEXT PRIMARY KEY,
+            reference TEXT,
+            subject TEXT,
+            case_subject TEXT,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL
+        )
+    """)
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS runs_fts USING fts5(
+            date UNINDEXED, {", ".join(SEARCH_FIELDS)},
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    """)
+    conn.commit()
+
+
+def sync_index(conn):
+    """
+    Index new or changed archive files and drop removed ones.
+
+    Returns:
+        int: Number of files (re)indexed or removed.
+    """
+    known = {date: (size, mtime_ns) for date, size, mtime_ns in conn.execute("SELECT date, size, mtime_ns FROM runs")}
+    on_disk = {
+        name[:-5]: os.path.join(ARCHIVE_DIR, name)
+        for name in (os.listdir(ARCHIVE_DIR) if os.path.isdir(ARCHIVE_DIR) else [])
+        if name.endswith(".json")
+    }
+
+    changed = 0
+    for date, path in sorted(on_disk.items()):
+        stat = os.stat(path)
+        if known.get(date) == (stat.st_size, stat.st_mtime_ns):
+            continue  # Unchanged file
+
+        with open(path, encoding="utf-8") as f:
+            fields = _index_fields(json.load(f))
+        conn.execute("DELETE FROM runs_fts WHERE rowid = ?", (_fts_rowid(date),))
+        conn.execute(
+            f"INSERT INTO runs_fts (rowid, date, {', '.join(SEARCH_FIELDS)}) VALUES (?, ?{', ?' * len(SEARCH_FIELDS)})",
+            (_fts_rowid(date), date, *(fields[name] for name in SEARCH_FIELDS))
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO runs (date, reference, subject, case_subject, size, mtime_ns) VALUES (?, ?, ?, ?, ?, ?)",
+            (date, fields["reference"], fields["subject"], fields["case_subject"], stat.st_size, stat.st_mtime_ns)
+        )
+        changed += 1
+
+    for date in set(known) - set(on_disk):
+        conn.execute("DELETE FROM runs_fts WHERE rowid = ?", (_fts_rowid(date),))
+        conn.execute("DELETE FROM runs WHERE date = ?", (date,))
+        changed += 1
+
+    conn.commit()
+    return changed
+
+
+def _connect():
+    """Open the index, creating and syncing it as needed."""
+    conn = sqlite3.connect(DB_PATH)
+    with _sync_lock:
+        init_db(conn)
+        sync_index(conn)
+    return conn
+
+
+def _fts_query(text, field=None):
+    """Turn free text into an FTS5 query: every word must match (in `field` if given)."""
+    terms = " ".join(f'"{word}"' for word in re.findall(r"\w+", text))
+    if field:
+        return f"{field} : ({terms})"
+    return terms
+
+
+def search(text, field=None, limit=20):
+    """
+    Full-text search over archived devotionals, best matches first.
+
+    Args:
+        text: Free-text query, e.g. "Genesis 43" or "Corrie ten Boom"
+        field: Restrict matching to one of SEARCH_FIELDS
+        limit: Maximum number of results
+
+    Returns:
+        List of dicts: [{'date', 'reference', 'subject', 'snippet'}, ...]
+    """
+    if field and field not in SEARCH_FIELDS:
+        raise ValueError(f"Unknown field '{field}'. Choose from: {', '.join(SEARCH_FIELDS)}")
+    query = _fts_query(text, field)
+    if not query:
+        return []
+
+    conn = _connect()
+    rows = conn.execute(
+        """SELECT runs_fts.date, runs.reference, runs.subject,
+                  snippet(runs_fts, -1, '[', ']', '...', 12)
+           FROM runs_fts JOIN runs ON runs.date = runs_fts.date
+           WHERE runs_fts MATCH ?
+           ORDER BY bm25(runs_fts) LIMIT ?""",
+        (query, limit)
+    ).fetchall()
+    conn.close()
+    return [{"date": d, "reference": r, "subject": s, "snippet": snip} for d, r, s, snip in rows]
+
+
+def recent_case_study_subjects(limit=30):
+    """Return the case study subjects of the most recent archived runs."""
+    conn = _connect()
+    rows = conn.execute(
+        "SELECT case_subject FROM runs WHERE case_subject != '' ORDER BY date DESC LIMIT ?",
+        (limit,)
+    ).fetchall()
+    conn.close()
+    return [row[0] for row in rows]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search the devotional archive.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    search_parser = subparsers.add_parser("search", help="Full-text search over past devotionals.")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--field", choices=SEARCH_FIELDS)
+    search_parser.add_argument("--limit", type=int, default=20)
+    subparsers.add_parser("rebuild", help="Drop and rebuild the local search index.")
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        if os.path.exists(DB_PATH):
+            os.remove(DB_PATH)
+        start = time.perf_counter()
+        conn = _connect()
+        count = conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+        conn.close()
+        print(f"Indexed {count} archived runs in {(time.perf_counter() - start) * 1000:.1f} ms")
+    else:
+        start = time.perf_counter()
+        results = search(args.query, field=args.field, limit=args.limit)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for result in results:
+            print(f"{result['date']}  {result['reference']}  |  {result['subject']}")
+            print(f"    {result['snippet']}")
+        print(f"\n{len(results)} result(s) in {elapsed_ms:.1f} ms")
@@ -1,26 +1,42 @@
 import os
+import sys
 import json
+import hashlib
+import argparse
 import time
 import smtplib
 import ssl
+import sqlite3
+import threading
 import urllib.parse
 import markdown
-import requests
 import certifi
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from datetime import date, datetime
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 from google import genai
 from google.genai import types
 import re
+import browser_pool
+import deadlines
+import http_client
+import quote_bank
 import quotes_db
+import rate_limit
+import scripture_refs
+import style_gate
+import verse_store
+import delivery
+import devotional_archive
+import reading_plan
+import run_history
+import tracing
 from dotenv import load_dotenv
 
 # Load environment variables from .env file (if running locally)
@@ -30,6 +46,40 @@ load_dotenv()
 MODEL_NAME = "gemini-3-flash-preview"
 FALLBACK_MODEL_NAME = "gemini-2.5-flash-preview-09-2025"
 
+# Scripture translations: the first is used for generation; any others are
+# fetched in the same BibleGateway request and shown side by side
+SCRIPTURE_VERSIONS = [v.strip() for v in os.getenv("SCRIPTURE_VERSIONS", "ESV").split(",") if v.strip()]
+DEFAULT_VERSION = SCRIPTURE_VERSIONS[0]
+
+# Local cache for fetched content (not committed)
+CACHE_DIR = os.getenv("DEVOTIONAL_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache"))
+
+# Extra devotionals fetched alongside the scripture, e.g.
+# EXTRA_DEVOTIONALS='[{"name": "...", "url": "https://...", "deadline": 8}]'
+# Sources that miss their deadline (seconds) are left out of the email.
+EXTRA_DEVOTIONAL_SOURCES = json.loads(os.getenv("EXTRA_DEVOTIONALS", "[]"))
+EXTRA_DEVOTIONAL_DEADLINE = float(os.getenv("EXTRA_DEVOTIONAL_DEADLINE", "10"))
+
+# Languages the finished devotional is translated into, one parallel model call each, e.g.
+# TRANSLATION_LANGUAGES='[{"code": "es", "name": "Spanish", "version": "RVR1960", "receiver": "..."}]'
+# `version` is the local BibleGateway translation quoted instead of translating the verses;
+# `receiver` gets the translated email on `run` (on `deliver`, recipients pick a "language").
+TRANSLATION_LANGUAGES = json.loads(os.getenv("TRANSLATION_LANGUAGES", "[]"))
+
+# Fetch the predicted day's scripture while the reference is scraped (turned off
+# by --profile, which only profiles stages on the main thread)
+SCRIPTURE_PREFETCH = os.getenv("SCRIPTURE_PREFETCH", "1") != "0"
+
+# Batch mode: days generated concurrently (each day runs its stages in order)
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "4"))
+
+# Run-wide time budget (see deadlines.py); optional modules are dropped or
+# replaced from the archive rather than delaying the send
+RUN_DEADLINE_SECONDS = float(os.getenv("RUN_DEADLINE_SECONDS", "1200"))
+SEND_RESERVE_SECONDS = 90  # Held back from generation for rendering and SMTP
+OPTIONAL_MIN_SECONDS = 120  # An optional module only starts with this much time left
+MODEL_TIMEOUT_SECONDS = 120
+
 # Permissive Safety Settings (Critical for Bible content)
 SAFETY_SETTINGS = [
     types.SafetySetting(
@@ -143,32 +193,33 @@ You must explicitly avoid "AI Slop"—generic, cliché, or overly flowery langua
 """
 
 # --- STEP 1: Get the Reference (Selenium) ---
+def _read_passage_references(driver):
+    """Read the passage references from a loaded reading page; returns a list of strings."""
+    wait = WebDriverWait(driver, 20)
+    
+    # Wait for at least one passage element to load
+    wait.until(EC.presence_of_element_located((By.CLASS_NAME, "BiblePassages__text")))
+    
+    # Find ALL passage elements (there may be multiple)
+    elements = driver.find_elements(By.CLASS_NAME, "BiblePassages__text")
+    
+    # Extract text from each and filter out empty strings
+    return [el.text.strip() for el in elements if el.text.strip()]
+
+
+@tracing.traced("get_todays_reference")
 def get_todays_reference():
     """Extract all Bible passage references from wearechurchreading.com.
     Returns a semicolon-separated string of all passages (e.g., 'Genesis 15-16; Matthew 6:1-15').
     """
     print("--- Step 1: Fetching Daily Reading Reference ---")
-    chrome_options = Options()
-    chrome_options.add_argument("--headless") 
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
     
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    def read_home_page(driver):
+        driver.get("https://www.wearechurchreading.com/")
+        return _read_passage_references(driver)
     
     try:
-        url = "https://www.wearechurchreading.com/"
-        driver.get(url)
-        wait = WebDriverWait(driver, 20)
-        
-        # Wait for at least one passage element to load
-        wait.until(EC.presence_of_element_located((By.CLASS_NAME, "BiblePassages__text")))
-        
-        # Find ALL passage elements (there may be multiple)
-        elements = driver.find_elements(By.CLASS_NAME, "BiblePassages__text")
-        
-        # Extract text from each and filter out empty strings
-        references = [el.text.strip() for el in elements if el.text.strip()]
+        references = browser_pool.run(read_home_page)
         
         if references:
             # Combine with semicolons for BibleGateway URL format
@@ -181,57 +232,72 @@ def get_todays_reference():
     except Exception as e:
         print(f"Error in Step 1: {e}")
         return None
-    finally:
-        driver.quit()
+
+
+def get_references(urls):
+    """Scrape the passage references of many reading pages in one warm browser session.
+    Returns: {url: 'Ref A; Ref B' or None}
+    """
+    results = browser_pool.scrape_many(urls, _read_passage_references)
+    return {url: "; ".join(refs) if refs else None for url, refs in results.items()}
 
 # --- STEP 2: Get the Bible Text (Requests) ---
-def get_bible_text(reference):
-    """Fetch Bible text from BibleGateway for one or more references.
+def _passage_version(div):
+    """Return the translation code a BibleGateway passage block belongs to, or None."""
+    node = div
+    while node is not None and node.name:
+        for css_class in node.get('class') or []:
+            if css_class.startswith('version-'):
+                return css_class[len('version-'):]
+        if node.get('data-translation'):
+            return node['data-translation']
+        node = node.parent
+    return None
+
+
+def _clean_passage_div(div):
+    """Strip footnotes, cross-references and verse/chapter numbers; return inner HTML."""
+    # --- CLEANUP LOGIC ---
+    # Remove unwanted elements to ensure clean reading flow
+    # 1. Footnotes and Cross-references
+    for element in div.find_all(class_=['footnotes', 'crossrefs', 'full-chap-link']):
+        element.decompose()
     
-    Returns a LIST of HTML strings, where each string is a passage.
-    Preserves formatting (paragraphs, etc.) while removing unwanted elements.
-    """
-    print(f"\n--- Step 2: Fetching Text for {reference} ---")
-    encoded_ref = urllib.parse.quote(reference)
-    url = f"https://www.biblegateway.com/passage/?search={encoded_ref}&version=ESV"
-    headers = {"User-Agent": "Mozilla/5.0"}
+    # 2. Superscript markers (cross-ref markers, footnote markers)
+    for element in div.find_all('sup', class_=['crossreference', 'footnote']):
+        element.decompose()
     
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Find passage text divs - look for 'result-text-style-normal' which contains actual Scripture
-        passage_divs = soup.find_all('div', class_='result-text-style-normal')
-        
-        if passage_divs:
-            all_passages = []
-            for div in passage_divs:
-                # --- CLEANUP LOGIC ---
-                # Remove unwanted elements to ensure clean reading flow
-                # 1. Footnotes and Cross-references
-                for element in div.find_all(class_=['footnotes', 'crossrefs', 'full-chap-link']):
-                    element.decompose()
-                
-                # 2. Superscript markers (cross-ref markers, footnote markers)
-                for element in div.find_all('sup', class_=['crossreference', 'footnote']):
-                    element.decompose()
-                
-                # 3. Verse numbers and Chapter numbers (for clean reading as requested)
-                for element in div.find_all(['sup', 'span'], class_=['versenum', 'chapternum']):
-                    element.decompose()
+    # 3. Verse numbers and Chapter numbers (for clean reading as requested)
+    for element in div.find_all(['sup', 'span'], class_=['versenum', 'chapternum']):
+        element.decompose()
 
-                # Extract inner HTML to preserve <p> tags, etc.
-                # decode_contents() returns the string representation of children
-                passage_html = div.decode_contents().strip()
-                
-                if passage_html:
-                    all_passages.append(passage_html)
-            
-            if all_passages:
-                print(f"Success! Retrieved {len(all_passages)} passage(s) with formatting.")
-                return all_passages
-        
+    # Extract inner HTML to preserve <p> tags, etc.
+    # decode_contents() returns the string representation of children
+    return div.decode_contents().strip()
+
+
+def _extract_passages(content, versions):
+    """
+    Parse a BibleGateway page and split the cleaned passages back out by version.
+    Returns:
+        dict: {version: [passage_html, ...]} for every version found (may be empty)
+    """
+    soup = BeautifulSoup(content, 'html.parser')
+    by_version = {}
+    
+    # Find passage text divs - look for 'result-text-style-normal' which contains actual Scripture
+    passage_divs = soup.find_all('div', class_='result-text-style-normal')
+    
+    for div in passage_divs:
+        # Single-version pages may not label their blocks
+        version = _passage_version(div) or (versions[0] if len(versions) == 1 else None)
+        if version not in versions:
+            continue
+        passage_html = _clean_passage_div(div)
+        if passage_html:
+            by_version.setdefault(version, []).append(passage_html)
+    
+    if not by_version and len(versions) == 1:
         # Fallback to original method if result-text-style-normal divs not found
         passage_content = soup.find(class_="passage-text")
         if passage_content:
@@ -241,22 +307,168 @@ def get_bible_text(reference):
             
             full_html = passage_content.decode_contents().strip()
             print(f"Success (fallback)! Retrieved text with formatting.")
-            return [full_html]
+            by_version[versions[0]] = [full_html]
+    
+    return by_version
+
+
+def _passage_cache_path(reference, version):
+    # Keyed on the canonical reference, so equivalent spellings share one entry
+    key = hashlib.sha1(scripture_refs.cache_key(reference).encode("utf-8")).hexdigest()[:20]
+    return os.path.join(CACHE_DIR, "passages", version, f"{key}.json")
+
+
+def _load_cached_passages(reference, version):
+    """Return cached passage HTML for (reference, version), or None."""
+    path = _passage_cache_path(reference, version)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)["passages"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _store_cached_passages(reference, version, passages):
+    path = _passage_cache_path(reference, version)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"reference": reference, "version": version, "passages": passages}, f, ensure_ascii=False)
+
+
+@tracing.traced("get_bible_text")
+def get_bible_text(reference, versions=None, deadline=None):
+    """Fetch Bible text from BibleGateway for one or more references.
+    
+    With no `versions`, returns a LIST of HTML strings in the default version,
+    where each string is a passage. With a list of versions (e.g. ["ESV", "CJB"]),
+    every uncached version is fetched in ONE request and a dict
+    {version: [passage_html, ...]} is returned. Each (reference, version) is cached
+    separately, and fetched verses go into the local verse store, which can assemble
+    any fully stored range without a request. Preserves formatting (paragraphs, etc.)
+    while removing unwanted elements. A run `deadline` shortens the fetch timeout.
+    """
+    requested = versions or [DEFAULT_VERSION]
+    print(f"\n--- Step 2: Fetching Text for {reference} ({', '.join(requested)}) ---")
+    
+    results = {}
+    assembled = 0
+    for version in requested:
+        cached = _load_cached_passages(reference, version)
+        if not cached:
+            with tracing.span("verse_store.assemble"):
+                cached = verse_store.assemble(reference, version)
+            assembled += bool(cached)
+        if cached:
+            results[version] = cached
+    missing = [version for version in requested if version not in results]
+    tracing.annotate(versions=len(requested), cache_hits=len(results), verse_store_hits=assembled)
+    
+    if missing:
+        encoded_ref = urllib.parse.quote(scripture_refs.cache_key(reference))
+        url = f"https://www.biblegateway.com/passage/?search={encoded_ref}&version={';'.join(missing)}"
         
-        print("Error: Could not find passage content on Bible Gateway.")
+        try:
+            read_timeout = deadline.timeout(http_client.DEFAULT_TIMEOUT[1]) if deadline else http_client.DEFAULT_TIMEOUT[1]
+            response = http_client.fetch(url, timeout=(http_client.DEFAULT_TIMEOUT[0], read_timeout))
+            tracing.annotate(revalidated=response.revalidated)
+            with tracing.span("get_bible_text.cleanup"):
+                fetched = _extract_passages(response.content, missing)
+        except Exception as e:
+            print(f"Error in Step 2: {e}")
+            fetched = {}
+        
+        for version, passages in fetched.items():
+            _store_cached_passages(reference, version, passages)
+            verse_store.store_passages(reference, version, passages)
+            results[version] = passages
+    else:
+        print("Success! All versions served from cache.")
+    
+    for version in requested:
+        if version not in results:
+            print(f"Error: Could not find {version} passage content on Bible Gateway.")
+        elif version in missing:
+            print(f"Success! Retrieved {len(results[version])} {version} passage(s) with formatting.")
+    
+    if versions is None:
+        return results.get(DEFAULT_VERSION)
+    return results or None
+
+# --- STEP 2a: Speculative Scripture Prefetch ---
+def predict_reference(day):
+    """
+    Guess `day`'s reference before the scrape confirms it: the reading plan
+    calendar if it knows the day, otherwise a forecast from the last known day.
+    Returns:
+        tuple: (reference, source) with source 'calendar' or 'predicted', or (None, None)
+    """
+    [(_, reference, source)] = reading_plan.forecast(1, start=date.fromisoformat(day))
+    return reference, source
+
+
+def start_scripture_prefetch(day, deadline=None):
+    """
+    Start fetching the predicted reference's scripture in the background, so it
+    overlaps the reference scrape. The fetch lands in the passage cache, where
+    prepare_content picks it up if the prediction was right.
+    Returns:
+        dict: Prefetch state to pass to settle_scripture_prefetch, or None if nothing was
+        predicted (or prefetching is off)
+    """
+    if not SCRIPTURE_PREFETCH:
         return None
-    except Exception as e:
-        print(f"Error in Step 2: {e}")
+    reference, source = predict_reference(day)
+    if not reference:
         return None
+    print(f"--- Prefetching scripture for predicted reference {reference} ({source}) ---")
+    
+    def fetch():
+        with tracing.span("scripture_prefetch", predicted=reference, source=source):
+            get_bible_text(reference, versions=SCRIPTURE_VERSIONS, deadline=deadline)
+        return time.perf_counter()
+    
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scripture-prefetch")
+    prefetch = {"reference": reference, "source": source, "started": time.perf_counter(),
+                "future": pool.submit(fetch)}
+    pool.shutdown(wait=False)
+    return prefetch
+
+
+def settle_scripture_prefetch(prefetch, ref, deadline=None):
+    """
+    Compare the prefetch with the confirmed reference `ref`. On a hit, wait for the
+    fetch to finish (prepare_content then reads it from the cache); on a miss, leave
+    it and fetch `ref` as usual. Records the outcome and the time saved on the run.
+    """
+    if not prefetch:
+        return
+    confirmed_at = time.perf_counter()
+    hit = bool(ref) and scripture_refs.cache_key(prefetch["reference"]) == scripture_refs.cache_key(ref)
+    saved_ms = 0.0
+    if hit:
+        try:
+            finished_at = prefetch["future"].result(timeout=deadline.timeout(http_client.DEFAULT_TIMEOUT[1])
+                                                    if deadline else None)
+            # Only the part of the fetch that overlapped the scrape is saved
+            saved_ms = round((min(finished_at, confirmed_at) - prefetch["started"]) * 1000, 1)
+        except Exception as e:
+            print(f"Scripture prefetch did not complete: {e}")
+        print(f"--- Scripture prefetch hit ({prefetch['source']}): {saved_ms:,.0f} ms overlapped the scrape ---")
+    else:
+        print(f"--- Scripture prefetch missed: predicted {prefetch['reference']}, confirmed {ref} ---")
+    tracing.set_run_attrs(prefetch="hit" if hit else "miss", prefetch_source=prefetch["source"],
+                          prefetch_saved_ms=saved_ms)
 
 # --- STEP 2.5: Get Extra Devotionals (Requests) ---
-def get_biblegateway_devotional(url, name):
+@tracing.traced("get_biblegateway_devotional")
+def get_biblegateway_devotional(url, name, timeout=EXTRA_DEVOTIONAL_DEADLINE):
     print(f"\n--- Fetching Extra Devotional: {name} ---")
-    headers = {"User-Agent": "Mozilla/5.0"}
+    tracing.annotate(source=name)
     
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
+        response = http_client.fetch(url, timeout=(min(5, timeout), timeout))
         soup = BeautifulSoup(response.content, 'html.parser')
         
         # Look for 'rp-content' (Reading Plan Content)
@@ -282,8 +494,161 @@ def get_biblegateway_devotional(url, name):
         print(f"Error fetching {name}: {e}")
         return None
 
+def _devotional_cache_path(url, day):
+    key = hashlib.sha1(f"{url}|{day}".encode("utf-8")).hexdigest()[:20]
+    return os.path.join(CACHE_DIR, "devotionals", f"{key}.html")
+
+
+def _fetch_devotional_cached(url, name, day, timeout):
+    """Fetch one extra devotional, reusing a copy cached for the same URL and date."""
+    path = _devotional_cache_path(url, day)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    html_content = get_biblegateway_devotional(url, name, timeout=timeout)
+    if html_content:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html_content)
+    return html_content
+
+
+def start_extra_devotionals(sources, day):
+    """
+    Start fetching the configured extra devotionals in the background.
+    Each source is {'name': ..., 'url': ..., 'deadline': seconds (optional)};
+    '{date}' in a URL is replaced with `day`.
+    Returns:
+        list: [(name, future, deadline_at), ...] to pass to collect_extra_devotionals
+    """
+    if not sources:
+        return []
+    pool = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="extra-devotional")
+    fetches = []
+    for source in sources:
+        deadline = float(source.get("deadline", EXTRA_DEVOTIONAL_DEADLINE))
+        url = source["url"].replace("{date}", day)
+        future = pool.submit(_fetch_devotional_cached, url, source["name"], day, deadline)
+        fetches.append((source["name"], future, time.monotonic() + deadline))
+    pool.shutdown(wait=False)
+    return fetches
+
+
+def collect_extra_devotionals(fetches):
+    """
+    Gather the extra devotionals that arrived before their deadlines.
+    Late or failing sources are skipped, never waited on past their deadline.
+    Returns:
+        list: [{'name': ..., 'html': ...}, ...] in configured order
+    """
+    collected = []
+    for name, future, deadline_at in fetches:
+        try:
+            html_content = future.result(timeout=max(0.0, deadline_at - time.monotonic()))
+        except FuturesTimeoutError:
+            print(f"Skipping extra devotional {name}: missed its deadline.")
+            continue
+        except Exception as e:
+            print(f"Skipping extra devotional {name}: {e}")
+            continue
+        if html_content:
+            collected.append({"name": name, "html": html_content})
+    tracing.set_run_attrs(extra_devotionals=f"{len(collected)}/{len(fetches)}")
+    return collected
+
+# --- Personas ---
+DEFAULT_AUDIENCE = "a high-capacity leader (INTJ / Enneagram 5)"
+
+
+def _system_identity(persona):
+    """System prompt for a persona ({'system_identity': text or path to a .md file}); defaults to SYSTEM_IDENTITY."""
+    identity = (persona or {}).get("system_identity")
+    if not identity:
+        return SYSTEM_IDENTITY
+    if identity.endswith((".md", ".txt")) and os.path.exists(identity):
+        with open(identity, encoding="utf-8") as f:
+            return f.read()
+    return identity
+
+
+def _audience(persona):
+    return (persona or {}).get("audience") or DEFAULT_AUDIENCE
+
+
+# --- Shared Model Call ---
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _get_client(api_key):
+    """Return a Gemini client for `api_key`, reused across stages and (in serve mode) runs."""
+    with _clients_lock:
+        if api_key not in _clients:
+            _clients[api_key] = genai.Client(api_key=api_key)
+        return _clients[api_key]
+
+
+# Bounds model calls in flight across threads (personas, batch days)
+MAX_CONCURRENT_GENERATIONS = int(os.getenv("MAX_CONCURRENT_GENERATIONS", "4"))
+_generation_slots = threading.BoundedSemaphore(MAX_CONCURRENT_GENERATIONS)
+
+
+def set_generation_limit(limit):
+    """Change the number of model calls allowed in flight at once."""
+    global _generation_slots
+    _generation_slots = threading.BoundedSemaphore(max(1, int(limit)))
+
+
+def _generate(client, model, prompt, config, deadline=None):
+    """
+    Call the model once, recording model, attempt and payload sizes on the current span.
+    The call first queues for the model's rate limit and a generation slot; time spent
+    queued (queue_wait_ms) is recorded separately from the model's own latency (model_ms).
+    With a `deadline`, the call is refused once it has passed (or when the rate limit queue
+    would outlast it) and its HTTP timeout shrinks to fit.
+    """
+    if deadline is not None:
+        deadline.check(f"calling {model}")
+        timeout_ms = int(deadline.timeout(MODEL_TIMEOUT_SECONDS) * 1000)
+        config = config.model_copy(update={"http_options": types.HttpOptions(timeout=timeout_ms)})
+    tracing.increment("attempts")
+    tracing.annotate(model=model, prompt_chars=len(prompt))
+    limiter = rate_limit.limiter_for(model)
+    estimated_tokens = rate_limit.estimate_tokens(prompt)
+    
+    queued_at = time.perf_counter()
+    try:
+        limiter.acquire(estimated_tokens, timeout=deadline.remaining() if deadline is not None else None)
+    except TimeoutError as e:
+        raise deadlines.DeadlineExceeded(f"run deadline reached queueing for {model} ({e})") from e
+    with _generation_slots:
+        started_at = time.perf_counter()
+        tracing.increment("queue_wait_ms", round((started_at - queued_at) * 1000, 1))
+        try:
+            response = client.models.generate_content(
+                model=model,
+                contents=prompt,
+                config=config
+            )
+        except Exception as e:
+            if rate_limit.is_rate_limited(e):
+                # Hold every queued call for this model instead of letting each retry hit the 429
+                tracing.increment("rate_limited")
+                limiter.backoff(60)
+            raise
+        finally:
+            tracing.increment("model_ms", round((time.perf_counter() - started_at) * 1000, 1))
+    
+    usage = getattr(response, "usage_metadata", None)
+    limiter.reconcile(estimated_tokens, getattr(usage, "total_token_count", None))
+    tracing.increment("input_tokens", getattr(usage, "prompt_token_count", None) or 0)
+    tracing.increment("output_tokens", getattr(usage, "candidates_token_count", None) or 0)
+    tracing.annotate(response_chars=len(response.text or ""))
+    return response
+
 # --- STEP 3a: Generate Devotional ---
-def generate_devotional(reference, bible_text):
+@tracing.traced("generate_devotional")
+def generate_devotional(reference, bible_text, persona=None):
     print(f"\n--- Step 3a: Generating AI Devotional ---")
     api_key = os.getenv("GOOGLE_API_KEY") 
     if not api_key:
@@ -305,7 +670,7 @@ def generate_devotional(reference, bible_text):
     Based on this devotional, highlight 3 important practices the reader should implement today.
     """
 
-    client = genai.Client(api_key=api_key)
+    client = _get_client(api_key)
     max_retries = 3
     
     # helper for attempt loop
@@ -313,14 +678,11 @@ def generate_devotional(reference, bible_text):
         for attempt in range(1, max_retries + 1):
             try:
                 print(f"{attempt_label} Attempt {attempt}/{max_retries} with {model_to_use}...")
-                response = client.models.generate_content(
-                    model=model_to_use,
-                    contents=user_prompt,
-                    config=types.GenerateContentConfig(
-                        system_instruction=SYSTEM_IDENTITY,
-                        safety_settings=SAFETY_SETTINGS,
-                    )
+                config = types.GenerateContentConfig(
+                    system_instruction=_system_identity(persona),
+                    safety_settings=SAFETY_SETTINGS,
                 )
+                response = _generate(client, model_to_use, user_prompt, config)
                 
                 if not response.text:
                     print(f"Warning: Generated devotional text is empty (attempt {attempt}).")
@@ -378,9 +740,67 @@ def parse_quotes_from_response(response_text):
     return quotes
 
 
-def generate_prayer_quotes(reference, bible_text):
+PRAYER_QUOTE_COUNT = 3
+
+
+@tracing.traced("write_quote_contexts")
+def write_quote_contexts(reference, bible_text, big_idea, picks, persona=None, deadline=None):
+    """
+    Ask the model, in one call, for the "context" line of each quote picked from the quote bank.
+    Returns:
+        list: The picks as [{'quote', 'author', 'context'}, ...], or None on failure
+    """
+    api_key = os.getenv("GOOGLE_API_KEY")
+    numbered = "\n".join(f'{i}. "{pick["quote"]}" - {pick["author"]}' for i, pick in enumerate(picks, 1))
+    user_prompt = f"""
+    Here is the Bible passage for today: {reference}
+    Text: {bible_text}
+    Big Idea: {big_idea}
+
+    **QUOTE CONTEXTS:**
+    These prayer quotes were chosen for today's devotional:
+    {numbered}
+
+    For each quote, write one or two sentences explaining strictly HOW it connects to the provided
+    scripture, using direct, un-inflated language.
+
+    **OUTPUT FORMAT:**
+    Return ONLY a valid JSON list of {len(picks)} strings, in the same order as the quotes.
+    """
+    client = _get_client(api_key)
+    config = types.GenerateContentConfig(
+        system_instruction=_system_identity(persona),
+        safety_settings=SAFETY_SETTINGS,
+        response_mime_type="application/json"
+    )
+    for model_to_use in (MODEL_NAME, FALLBACK_MODEL_NAME):
+        try:
+            print(f"Writing quote contexts with {model_to_use}...")
+            response = _generate(client, model_to_use, user_prompt, config, deadline)
+            clean_text = (response.text or "").strip()
+            if clean_text.startswith("```json"):
+                clean_text = clean_text[7:]
+            if clean_text.endswith("```"):
+                clean_text = clean_text[:-3]
+            contexts = json.loads(clean_text)
+            if len(contexts) != len(picks) or not all(isinstance(c, str) and c.strip() for c in contexts):
+                raise ValueError(f"Expected {len(picks)} contexts, got {contexts!r:.80}")
+            print(f"Success! Picked {len(picks)} quotes from the quote bank.")
+            return [
+                {"quote": pick["quote"], "author": pick["author"], "context": context.strip()}
+                for pick, context in zip(picks, contexts)
+            ]
+        except Exception as e:
+            print(f"Error writing quote contexts with {model_to_use}: {e}")
+    return None
+
+
+@tracing.traced("generate_prayer_quotes")
+def generate_prayer_quotes(reference, bible_text, persona=None, v2_content=None, deadline=None):
     """
     Generate contextual prayer quotes, excluding previously used ones.
+    When the local quote bank has enough matches for the day's big idea, the
+    quotes are picked locally and the model only writes their contexts.
     Returns:
         list: [{'quote': '...', 'author': '...', 'context': '...'}, ...] or None on failure
     """
@@ -389,9 +809,23 @@ def generate_prayer_quotes(reference, bible_text):
     if not api_key:
         print("Error: GOOGLE_API_KEY environment variable is not set.")
         return None
+    deadline = deadline or deadlines.Deadline(None)
+    
+    header = (v2_content or {}).get("header", {})
+    big_idea = header.get("big_idea", "")
+    if big_idea:
+        with tracing.span("quote_bank.select") as record:
+            picks = quote_bank.select(f"{big_idea} {header.get('mode', '')}", count=PRAYER_QUOTE_COUNT)
+            record["picked"] = len(picks)
+        if len(picks) == PRAYER_QUOTE_COUNT:
+            quotes = write_quote_contexts(reference, bible_text, big_idea, picks, persona, deadline)
+            if quotes:
+                return quotes
+        print(f"Quote bank: {len(picks)}/{PRAYER_QUOTE_COUNT} usable matches, asking the model to select quotes.")
     
     # Get exclusion list from database
-    exclusion_list = quotes_db.format_exclusion_list(max_quotes=360)
+    with tracing.span("quotes_db.format_exclusion_list"):
+        exclusion_list = quotes_db.format_exclusion_list(max_quotes=360)
     
     # Build exclusion instruction
     exclusion_instruction = ""
@@ -428,7 +862,7 @@ def generate_prayer_quotes(reference, bible_text):
     ]
     """
 
-    client = genai.Client(api_key=api_key)
+    client = _get_client(api_key)
     max_retries = 3
     
     def attempt_quote_generation(model_to_use, attempt_label):
@@ -437,16 +871,12 @@ def generate_prayer_quotes(reference, bible_text):
                 print(f"{attempt_label} Attempt {attempt}/{max_retries} with {model_to_use}...")
                 
                 config = types.GenerateContentConfig(
-                    system_instruction=SYSTEM_IDENTITY,
+                    system_instruction=_system_identity(persona),
                     safety_settings=SAFETY_SETTINGS,
                      response_mime_type="application/json"
                 )
 
-                response = client.models.generate_content(
-                    model=model_to_use,
-                    contents=user_prompt,
-                    config=config
-                )
+                response = _generate(client, model_to_use, user_prompt, config, deadline)
                 
                 if not response.text:
                     raise ValueError("Empty response")
@@ -464,8 +894,8 @@ def generate_prayer_quotes(reference, bible_text):
                 
             except Exception as e:
                 print(f"Error in Quote Generation (attempt {attempt}): {e}")
-                if attempt < max_retries:
-                    time.sleep(60)
+                if attempt == max_retries or not deadline.backoff(60):
+                    break
         return None
 
     # 1. Try Primary Model
@@ -481,7 +911,8 @@ def generate_prayer_quotes(reference, bible_text):
         
     return []
 
-def generate_case_study(reference, bible_text, v2_content=None):
+@tracing.traced("generate_case_study")
+def generate_case_study(reference, bible_text, v2_content=None, persona=None, deadline=None):
     """
     Generate a deep-dive Case Study based on the Bible text.
     Returns:
@@ -492,6 +923,7 @@ def generate_case_study(reference, bible_text, v2_content=None):
     if not api_key:
         print("Error: GOOGLE_API_KEY environment variable is not set.")
         return None
+    deadline = deadline or deadlines.Deadline(None)
 
     theme_context = ""
     if v2_content:
@@ -499,10 +931,17 @@ def generate_case_study(reference, bible_text, v2_content=None):
         insight = v2_content.get("anchor", {}).get("insight", "")
         theme_context = f"\n    **CENTRAL DEVOTIONAL THEME:**\n    Big Idea: {big_idea}\n    Key Insight: {insight}\n"
 
+    # Recently featured subjects come from the local archive (no model call)
+    recent_subjects = devotional_archive.recent_case_study_subjects(limit=30)
+    subject_exclusion = ""
+    if recent_subjects:
+        subject_exclusion = "\n    **RECENTLY FEATURED (CHOOSE A DIFFERENT SUBJECT):** " + "; ".join(recent_subjects) + "\n"
+
     user_prompt = f"""
     Here is the Bible passage for today: {reference}
     Text: {bible_text}
     {theme_context}
+    {subject_exclusion}
 
     **OBJECTIVE:**
     Generate a **Deep Dive Case Study** that brings the spiritual principles of this text to life through a concrete historical or contemporary narrative (no flowery language).
@@ -524,23 +963,19 @@ def generate_case_study(reference, bible_text, v2_content=None):
     }}
     """
     
-    client = genai.Client(api_key=api_key)
+    client = _get_client(api_key)
     max_retries = 3
 
     for attempt in range(1, max_retries + 1):
         try:
             print(f"Case Study Attempt {attempt}/{max_retries}...")
             config = types.GenerateContentConfig(
-                system_instruction=SYSTEM_IDENTITY,
+                system_instruction=_system_identity(persona),
                 safety_settings=SAFETY_SETTINGS,
                 response_mime_type="application/json"
             )
             
-            response = client.models.generate_content(
-                model=MODEL_NAME,
-                contents=user_prompt,
-                config=config
-            )
+            response = _generate(client, MODEL_NAME, user_prompt, config, deadline)
 
             if not response.text:
                 raise ValueError("Empty response")
@@ -558,16 +993,18 @@ def generate_case_study(reference, bible_text, v2_content=None):
 
         except Exception as e:
             print(f"Error in Case Study Generation (attempt {attempt}): {e}")
-            if attempt < max_retries:
-                time.sleep(60)
+            if attempt == max_retries or not deadline.backoff(60):
+                break
 
     # Fallback attempt
     print(f"\n--- Switching to Fallback Model for Case Study: {FALLBACK_MODEL_NAME} ---")
     try:
-        response = client.models.generate_content(
-            model=FALLBACK_MODEL_NAME,
-            contents=user_prompt,
-            config=types.GenerateContentConfig(response_mime_type="application/json")
+        response = _generate(
+            client,
+            FALLBACK_MODEL_NAME,
+            user_prompt,
+            types.GenerateContentConfig(response_mime_type="application/json"),
+            deadline
         )
         if response.text:
              clean_text = response.text.strip()
@@ -580,7 +1017,8 @@ def generate_case_study(reference, bible_text, v2_content=None):
     return None
 
 # --- STEP 3X: Generate Core Devotional (Deep Dive) ---
-def generate_core_devotional(reference, bible_text, v2_content=None):
+@tracing.traced("generate_core_devotional")
+def generate_core_devotional(reference, bible_text, v2_content=None, persona=None, deadline=None):
     """
     Generate a disciple-focused deep dive devotional unpacking the key insights.
     Returns:
@@ -591,6 +1029,7 @@ def generate_core_devotional(reference, bible_text, v2_content=None):
     if not api_key:
         print("Error: GOOGLE_API_KEY environment variable is not set.")
         return None
+    deadline = deadline or deadlines.Deadline(None)
 
     theme_context = ""
     if v2_content:
@@ -621,23 +1060,19 @@ def generate_core_devotional(reference, bible_text, v2_content=None):
     }}
     """
     
-    client = genai.Client(api_key=api_key)
+    client = _get_client(api_key)
     max_retries = 3
 
     for attempt in range(1, max_retries + 1):
         try:
             print(f"Core Devotional Attempt {attempt}/{max_retries}...")
             config = types.GenerateContentConfig(
-                system_instruction=SYSTEM_IDENTITY,
+                system_instruction=_system_identity(persona),
                 safety_settings=SAFETY_SETTINGS,
                 response_mime_type="application/json"
             )
             
-            response = client.models.generate_content(
-                model=MODEL_NAME,
-                contents=user_prompt,
-                config=config
-            )
+            response = _generate(client, MODEL_NAME, user_prompt, config, deadline)
 
             if not response.text:
                 raise ValueError("Empty response")
@@ -652,16 +1087,18 @@ def generate_core_devotional(reference, bible_text, v2_content=None):
 
         except Exception as e:
             print(f"Error in Core Devotional Generation (attempt {attempt}): {e}")
-            if attempt < max_retries:
-                time.sleep(30)
+            if attempt == max_retries or not deadline.backoff(30):
+                break
 
     # Fallback attempt
     print(f"\n--- Switching to Fallback Model for Core Devotional: {FALLBACK_MODEL_NAME} ---")
     try:
-        response = client.models.generate_content(
-            model=FALLBACK_MODEL_NAME,
-            contents=user_prompt,
-            config=types.GenerateContentConfig(response_mime_type="application/json")
+        response = _generate(
+            client,
+            FALLBACK_MODEL_NAME,
+            user_prompt,
+            types.GenerateContentConfig(response_mime_type="application/json"),
+            deadline
         )
         if response.text:
              clean_text = response.text.strip()
@@ -674,15 +1111,14 @@ def generate_core_devotional(reference, bible_text, v2_content=None):
     return None
 
 # --- STEP 3: Generate V2 Content (JSON) ---
-def generate_v2_content(reference, bible_text):
-    print(f"\n--- Step 3: Generating V2 Devotional Content (JSON) ---")
-    api_key = os.getenv("GOOGLE_API_KEY") 
-    if not api_key:
-        print("Error: GOOGLE_API_KEY environment variable is not set.")
-        return None
-    
+def build_v2_prompt(reference, bible_text, persona=None):
+    """
+    User prompt for the V2 content. A persona's `v2_instructions` (used by prompt
+    experiments, see experiments.py) are appended as additional instructions.
+    """
     # Get exclusion list from database (re-used for V2 quotes)
-    exclusion_list = quotes_db.format_exclusion_list(max_quotes=360)
+    with tracing.span("quotes_db.format_exclusion_list"):
+        exclusion_list = quotes_db.format_exclusion_list(max_quotes=360)
     
     exclusion_instruction = ""
     if exclusion_list:
@@ -697,7 +1133,7 @@ def generate_v2_content(reference, bible_text):
     Text (ESV Version): {bible_text}
 
     **OBJECTIVE:**
-    Generate a holistic daily devotional for a high-capacity leader (INTJ / Enneagram 5).
+    Generate a holistic daily devotional for {_audience(persona)}.
     You must output valid JSON containing 6 specific modules.
 
     **MODULE 1: THE HEADER (The BLUF)**
@@ -738,8 +1174,26 @@ def generate_v2_content(reference, bible_text):
         }}
     }}
     """
+    instructions = (persona or {}).get("v2_instructions")
+    if instructions:
+        user_prompt += f"""
+    **ADDITIONAL INSTRUCTIONS:**
+    {instructions}
+    """
+    return user_prompt
+
+
+@tracing.traced("generate_v2_content")
+def generate_v2_content(reference, bible_text, persona=None, deadline=None):
+    print(f"\n--- Step 3: Generating V2 Devotional Content (JSON) ---")
+    api_key = os.getenv("GOOGLE_API_KEY") 
+    if not api_key:
+        print("Error: GOOGLE_API_KEY environment variable is not set.")
+        return None
+    deadline = deadline or deadlines.Deadline(None)
+    user_prompt = build_v2_prompt(reference, bible_text, persona)
 
-    client = genai.Client(api_key=api_key)
+    client = _get_client(api_key)
     max_retries = 3
     
     def attempt_generation_with_model(model_to_use, attempt_label):
@@ -749,16 +1203,12 @@ def generate_v2_content(reference, bible_text):
                 
                 # Configure for JSON output if supported, or rely on prompt
                 config = types.GenerateContentConfig(
-                    system_instruction=SYSTEM_IDENTITY,
+                    system_instruction=_system_identity(persona),
                     safety_settings=SAFETY_SETTINGS,
                     response_mime_type="application/json" 
                 )
                 
-                response = client.models.generate_content(
-                    model=model_to_use,
-                    contents=user_prompt,
-                    config=config
-                )
+                response = _generate(client, model_to_use, user_prompt, config, deadline)
                 
                 if not response.text:
                     print(f"Warning: Generated text is empty (attempt {attempt}).")
@@ -780,11 +1230,11 @@ def generate_v2_content(reference, bible_text):
                  # Retry might fix it
             except Exception as e:
                 print(f"Error in V2 Generation (attempt {attempt}): {e}")
-                if attempt < max_retries:
-                    print("Waiting 60 seconds before retrying...")
-                    time.sleep(60)
-                else:
+                if attempt == max_retries:
                     print("All retries exhausted for this model.")
+                elif not deadline.backoff(60):
+                    print("No time left before the run deadline for another attempt.")
+                    break
         return None
 
     # 1. Try Primary Model
@@ -800,18 +1250,250 @@ def generate_v2_content(reference, bible_text):
         
     return None
 
-# --- STEP 4: Send V2 Email (HTML with Tables) ---
-def send_v2_email(reference, bible_texts, v2_data, case_study_data, quotes_list, core_devo_data):
-    print(f"\n--- Step 4: Sending V2 Email (HTML) ---")
+# --- STEP 3Z: Style Gate ---
+GENERATION_STAGES = 4  # v2, case study, core devotional, quotes
+
+
+def apply_style_gate(reference, bible_text, content, persona=None, deadline=None):
+    """
+    Scan generated content for blacklisted phrases, missing keys and oversized sections,
+    and regenerate only the flagged sections with a short corrective prompt.
+    `content` ({'v2_content', 'case_study', 'core_devotional', 'quotes'}) is patched in place.
+    Returns:
+        list: Issues still present after the repairs
+    """
+    with tracing.span("style_gate.scan"):
+        issues = style_gate.scan(content)
+    tracing.annotate(issues=len(issues))
+    if not issues:
+        return []
     
-    sender_email = os.getenv("EMAIL_SENDER")
-    password = os.getenv("EMAIL_PASSWORD")
-    receiver_email = os.getenv("EMAIL_RECEIVER")
+    print(f"\n--- Style Gate: {len(issues)} issue(s) found ---")
+    by_target = {}
+    for issue in issues:
+        print(f"  {issue['section']}: {issue['kind']} ({issue['detail']})")
+        by_target.setdefault(style_gate.repair_target(issue["section"]), []).append(issue)
+    
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        return issues
+    client = _get_client(api_key)
+    config = types.GenerateContentConfig(
+        safety_settings=SAFETY_SETTINGS,
+        response_mime_type="application/json"
+    )
+    big_idea = (content.get("v2_content") or {}).get("header", {}).get("big_idea", "")
+    
+    regen_tokens = 0
+    for target, target_issues in by_target.items():
+        current = style_gate.get_section(content, target)
+        prompt = style_gate.corrective_prompt(target, current, target_issues, reference, big_idea)
+        try:
+            response = _generate(client, MODEL_NAME, prompt, config, deadline)
+            clean_text = response.text.strip()
+            if clean_text.startswith("```json"):
+                clean_text = clean_text[7:]
+            if clean_text.endswith("```"):
+                clean_text = clean_text[:-3]
+            style_gate.set_section(content, target, json.loads(clean_text)["value"])
+            regen_tokens += len(prompt + response.text) // rate_limit.CHARS_PER_TOKEN
+            tracing.increment("sections_regenerated")
+            print(f"Regenerated {target}.")
+        except Exception as e:
+            print(f"Warning: could not regenerate {target}: {e}")
+    
+    # Without the gate, a flagged run is regenerated in full
+    full_tokens = GENERATION_STAGES * rate_limit.estimate_tokens(_system_identity(persona) + bible_text)
+    remaining = style_gate.scan(content)
+    tracing.annotate(regen_tokens_est=regen_tokens, tokens_saved_est=full_tokens - regen_tokens,
+                     issues_remaining=len(remaining))
+    print(f"Style gate: {len(issues) - len(remaining)} issue(s) fixed, "
+          f"~{full_tokens - regen_tokens} tokens saved vs. full regeneration.")
+    return remaining
 
-    if not all([sender_email, password, receiver_email]):
-        print("Error: Missing email environment variables.")
-        return
+# --- STEP 3T: Translation Fan-out ---
+TRANSLATED_SECTIONS = {"v2_content": dict, "case_study": dict, "core_devotional": dict, "quotes": list}
 
+
+@tracing.traced("translate_content")
+def translate_content(reference, sections, language, local_text=None, deadline=None):
+    """
+    Translate the finished sections ({'v2_content', 'case_study', 'core_devotional', 'quotes'})
+    into `language` ({'code', 'name', 'version'}) in one model call. With `local_text` (the
+    passage in the language's own version), quoted verses use its wording.
+    Returns:
+        dict: The translated sections (same structure), or None
+    """
+    print(f"\n--- Step 3t: Translating into {language['name']} ---")
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        print("Error: GOOGLE_API_KEY environment variable is not set.")
+        return None
+    deadline = deadline or deadlines.Deadline(None)
+    
+    scripture_instruction = ""
+    if local_text:
+        scripture_instruction = f"""
+    **SCRIPTURE WORDING:**
+    Where a value quotes the passage (`anchor.key_verses`, the `verse` fields, quoted verses in the prose),
+    use the wording of this {language.get('version')} text instead of translating it yourself:
+    {local_text}
+    """
+    
+    user_prompt = f"""
+    **TRANSLATION ({language['code']}):**
+    Translate today's finished devotional on {reference} into {language['name']}.
+    
+    **RULES:**
+    1. Translate every string value; keep every key, list and the JSON structure exactly as given.
+    2. Keep Markdown formatting, names and `author` values unchanged.
+    3. Translate for meaning and tone, in natural {language['name']} (not word for word).
+    {scripture_instruction}
+    **CONTENT:**
+    ```json
+    {json.dumps(sections, ensure_ascii=False)}
+    ```
+    
+    **OUTPUT FORMAT:**
+    Return ONLY the translated JSON object.
+    """
+    
+    client = _get_client(api_key)
+    max_retries = 2
+    
+    for attempt in range(1, max_retries + 1):
+        try:
+            config = types.GenerateContentConfig(
+                safety_settings=SAFETY_SETTINGS,
+                response_mime_type="application/json"
+            )
+            response = _generate(client, MODEL_NAME, user_prompt, config, deadline)
+            
+            if not response.text:
+                raise ValueError("Empty response")
+            
+            clean_text = response.text.strip()
+            if clean_text.startswith("```json"): clean_text = clean_text[7:]
+            if clean_text.endswith("```"): clean_text = clean_text[:-3]
+            
+            data = json.loads(clean_text)
+            if not isinstance(data, dict) or not isinstance(data.get("v2_content"), dict):
+                raise ValueError("Translation is missing v2_content")
+            print(f"Success! Translated into {language['name']}.")
+            return data
+        
+        except Exception as e:
+            print(f"Error in {language['name']} Translation (attempt {attempt}): {e}")
+            tracing.increment("retries")
+            if attempt == max_retries or not deadline.backoff(30):
+                break
+    return None
+
+
+def _merge_translation(sections, translated):
+    """Translated sections, falling back to the original for any the model dropped or reshaped."""
+    merged = {}
+    for name, kind in TRANSLATED_SECTIONS.items():
+        original, value = sections.get(name), translated.get(name)
+        if original is None or not isinstance(value, kind) or (kind is list and len(value) != len(original)):
+            merged[name] = original
+            continue
+        merged[name] = value
+    # Quotes keep their original attribution; a reshaped item falls back to the original quote
+    if merged["quotes"] is not sections["quotes"]:
+        merged["quotes"] = [
+            {**quote, "author": source.get("author")} if isinstance(quote, dict) and isinstance(source, dict) else source
+            for quote, source in zip(merged["quotes"], sections["quotes"])
+        ]
+    return merged
+
+
+def translate_all(ref, content, languages, deadline=None):
+    """
+    Translate the finished content (as prepared by prepare_content) into every language at
+    once: the languages' local scripture versions come back from one request, then each
+    language is one parallel model call, sharing the generation slots.
+    Returns:
+        dict: {code: content dict with 'language' and 'version' added} for the languages that succeeded
+    """
+    if not languages:
+        return {}
+    local_versions = []
+    for language in languages:
+        if language.get("version") and language["version"] not in local_versions:
+            local_versions.append(language["version"])
+    local_texts = (get_bible_text(ref, versions=local_versions, deadline=deadline) or {}) if local_versions else {}
+    sections = {
+        "v2_content": content["v2_content"],
+        "case_study": content["case_study"],
+        "core_devotional": content["core_devo"],
+        "quotes": content["quotes_list"],
+    }
+    
+    def translate(language):
+        with tracing.span("translation", language=language["code"]):
+            local = local_texts.get(language.get("version"))
+            translated = translate_content(ref, sections, language, to_plain_text(local) if local else None, deadline)
+            if not translated:
+                return None
+            merged = _merge_translation(sections, translated)
+            return {
+                "language": language["code"],
+                "version": language["version"] if local else DEFAULT_VERSION,
+                "bible_texts": local or content["bible_texts"],
+                "parallel_texts": None,
+                "v2_content": merged["v2_content"],
+                "case_study": merged["case_study"],
+                "core_devo": merged["core_devotional"],
+                "quotes_list": merged["quotes"],
+            }
+    
+    translations = {}
+    with ThreadPoolExecutor(max_workers=len(languages), thread_name_prefix="translate") as pool:
+        futures = {pool.submit(translate, language): language for language in languages}
+        for future in as_completed(futures):
+            language = futures[future]
+            try:
+                translated = future.result()
+            except Exception as e:
+                print(f"Translation into {language['name']} failed: {e}")
+                translated = None
+            if translated:
+                translations[language["code"]] = translated
+            else:
+                tracing.append_run_attr("degraded", {"module": "translation", "language": language["code"]})
+    tracing.set_run_attrs(translations=f"{len(translations)}/{len(languages)}")
+    return translations
+
+# --- STEP 4: Render + Send V2 Email (HTML with Tables) ---
+def passage_headers(reference, bible_texts):
+    """
+    One header per passage. The passages were fetched for the canonical reference, so its
+    parts line up with them; if the counts still differ, each passage is labelled from its
+    own verse ids (e.g. 'Gen-43-1' ... 'Gen-43-34' -> 'Genesis 43:1-34').
+    """
+    try:
+        parts = scripture_refs.canonical_parts(reference)
+    except ValueError:
+        parts = reference.split("; ")
+    if len(parts) == len(bible_texts):
+        return parts
+    
+    headers = []
+    for text in bible_texts:
+        verse_ids = re.findall(r'class="text ([1-3]?[A-Za-z]+-\d+-\d+)', text)
+        headers.append(scripture_refs.label_from_verse_ids(verse_ids) or "Scripture")
+    return headers
+
+
+def render_v2_html(reference, bible_texts, v2_data, case_study_data, quotes_list, core_devo_data,
+                   parallel_texts=None, extra_devotionals=None, version=None, language=None):
+    """
+    Render the V2 devotional as a complete HTML document.
+    `parallel_texts` ({version: [passage_html, ...]}) adds side-by-side translations;
+    `extra_devotionals` ([{'name', 'html'}, ...]) adds one card per fetched devotional.
+    `version` and `language` label a translated edition (scripture version, page language).
+    """
     # --- HTML COMPONENTS ---
     HEADER_COLOR = "#2c3e50"
     
@@ -849,19 +1531,26 @@ def send_v2_email(reference, bible_texts, v2_data, case_study_data, quotes_list,
     # 3. Source Code Module
     source_content = ""
     if isinstance(bible_texts, list):
-        ref_parts = reference.split("; ")
+        ref_parts = passage_headers(reference, bible_texts)
         for i, text in enumerate(bible_texts):
-            header_text = ref_parts[i] if i < len(ref_parts) else "Scripture"
+            header_text = ref_parts[i]
             source_content += f"""
             <h3 style="margin-top: 30px; border-bottom: 1px solid #eee; padding-bottom: 10px;">{header_text}</h3>
             {text}
             """
+            for version, texts in (parallel_texts or {}).items():
+                if i < len(texts):
+                    source_content += f"""
+            <h4 style="margin-top: 20px; color: #666;">{header_text} ({version})</h4>
+            {texts[i]}
+            """
     else:
         source_content = bible_texts
 
+    version_label = ", ".join([version or DEFAULT_VERSION] + list(parallel_texts or {}))
     source_section = f"""
     <div class="card">
-        <div class="card-header">The Source Code (ESV)</div>
+        <div class="card-header">The Source Code ({version_label})</div>
         <div class="card-body scripture-text" style="max-height: 500px; overflow-y: auto;">
              {source_content}
         </div>
@@ -951,15 +1640,17 @@ def send_v2_email(reference, bible_texts, v2_data, case_study_data, quotes_list,
     quotes_rows = ""
     if quotes_list:
         for q in quotes_list:
+            # Quote bank picks used when generation was degraded have no context
+            context_row = f"""
+                <div style="margin-top: 5px; font-size: 14px; color: #666;">
+                    Context: {q.get('context')}
+                </div>""" if q.get('context') else ""
             quotes_rows += f"""
             <div style="margin-bottom: 20px; padding-bottom: 20px; border-bottom: 1px solid #eee;">
                 <blockquote style="border-left: 4px solid #2c3e50; margin: 0; padding-left: 15px; color: #555; font-style: italic; font-size: 16px;">
                     "{q.get('quote')}"
                 </blockquote>
-                <div style="margin-top: 8px; font-weight: bold; color: #333;">— {q.get('author')}</div>
-                <div style="margin-top: 5px; font-size: 14px; color: #666;">
-                    Context: {q.get('context')}
-                </div>
+                <div style="margin-top: 8px; font-weight: bold; color: #333;">— {q.get('author')}</div>{context_row}
             </div>
             """
     
@@ -972,10 +1663,22 @@ def send_v2_email(reference, bible_texts, v2_data, case_study_data, quotes_list,
     </div>
     """
 
+    # 7. Extra Devotionals Module
+    extras_section = ""
+    for extra in extra_devotionals or []:
+        extras_section += f"""
+    <div class="card">
+        <div class="card-header">{extra['name']}</div>
+        <div class="card-body">
+            {extra['html']}
+        </div>
+    </div>
+    """
+
     # --- ASSEMBLE HTML BODY ---
     html_body = f"""
     <!DOCTYPE html>
-    <html>
+    <html lang="{language or 'en'}">
     <head>
         <meta charset="utf-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
@@ -1020,16 +1723,61 @@ def send_v2_email(reference, bible_texts, v2_data, case_study_data, quotes_list,
             {matrix_section}
             {quotes_section}
             {case_section}
+            {extras_section}
         </div>
     </body>
     </html>
     """
+    return html_body
+
+
+def archived_bible_texts(record):
+    """
+    Scripture for an archive record, re-resolved from its reference and version through the
+    passage cache and verse store (fetched only if neither has it). Older records carry the
+    passage HTML inline.
+    Returns:
+        list: Passage HTML strings (empty if the scripture can't be resolved)
+    """
+    if record.get("bible_texts"):
+        return record["bible_texts"]
+    version = record.get("version") or DEFAULT_VERSION
+    return (get_bible_text(record["reference"], versions=[version]) or {}).get(version) or []
+
+
+def render_archived(record):
+    """Render an archived day (devotional_archive record) with the email layout."""
+    return render_v2_html(record["reference"], archived_bible_texts(record), record["v2_content"],
+                          record.get("case_study"), record.get("quotes") or [], record.get("core_devotional"),
+                          version=record.get("version"))
+
+@tracing.traced("send_v2_email")
+def send_v2_email(reference, bible_texts, v2_data, case_study_data, quotes_list, core_devo_data,
+                  parallel_texts=None, extra_devotionals=None, receiver=None, deadline=None,
+                  version=None, language=None):
+    print(f"\n--- Step 4: Sending V2 Email (HTML{f', {language}' if language else ''}) ---")
+    deadline = deadline or deadlines.Deadline(None)
+    
+    sender_email = os.getenv("EMAIL_SENDER")
+    password = os.getenv("EMAIL_PASSWORD")
+    receiver_email = receiver or os.getenv("EMAIL_RECEIVER")
+
+    if not all([sender_email, password, receiver_email]):
+        print("Error: Missing email environment variables.")
+        return False
+
+    with tracing.span("send_v2_email.render"):
+        html_body = render_v2_html(reference, bible_texts, v2_data, case_study_data, quotes_list, core_devo_data,
+                                   parallel_texts, extra_devotionals, version, language)
+    header_data = v2_data.get("header", {})
 
     msg = MIMEMultipart("alternative")
     msg["Subject"] = header_data.get('subject', f"Daily Reading: {reference}")
     msg["From"] = sender_email
     msg["To"] = receiver_email
     msg.attach(MIMEText(html_body, "html"))
+    message_text = msg.as_string()
+    tracing.annotate(email_bytes=len(message_text))
 
     # Send Logic (Same as before)
     max_retries = 3
@@ -1037,66 +1785,652 @@ def send_v2_email(reference, bible_texts, v2_data, case_study_data, quotes_list,
         try:
             print(f"Email attempt {attempt}/{max_retries}...")
             context = ssl.create_default_context(cafile=certifi.where())
-            with smtplib.SMTP_SSL("smtp.gmail.com", 465, context=context, timeout=30) as server:
+            with smtplib.SMTP_SSL("smtp.gmail.com", 465, context=context, timeout=deadline.timeout(30)) as server:
                 server.login(sender_email, password)
-                server.sendmail(sender_email, receiver_email, msg.as_string())
+                server.sendmail(sender_email, receiver_email, message_text)
             print("Success! V2 Email sent successfully.")
-            return
+            return True
         except Exception as e:
             print(f"Error (attempt {attempt}): {e}")
-            if attempt < max_retries:
-                time.sleep(10)
+            tracing.increment("retries")
+            if attempt == max_retries or not deadline.backoff(10):
+                break
     print("All email attempts failed.")
+    return False
 
 # --- Main Execution ---
-if __name__ == "__main__":
-    # 1. Get Reference
+def to_plain_text(bible_texts):
+    """Flatten passage HTML into plain text for the model prompts."""
+    with tracing.span("prepare_plain_text"):
+        combined_html = "".join(bible_texts)
+        return BeautifulSoup(combined_html, "html.parser").get_text(separator="\n\n")
+
+
+def _degrade(degraded, module, reason, persona=None):
+    """Record an optional module that was dropped or replaced (printed and kept in the run log)."""
+    degraded[module] = reason
+    print(f"Degraded: {module} ({reason})")
+    entry = {"module": module, "reason": reason}
+    if persona:
+        entry["persona"] = persona.get("name")
+    tracing.append_run_attr("degraded", entry)
+
+
+def generate_all_content(ref, combined_text, persona=None, deadline=None):
+    """
+    Run every generation stage for one reference (for `persona`, or the default voice).
+    Returns:
+        tuple: (v2_content, case_study, core_devo, quotes_list); v2_content is None on failure
+    Sections that fail the style gate are regenerated individually. Against a run
+    `deadline`, optional modules (case study, core devotional, quotes, style gate) are
+    skipped when too little time is left, and missing ones are replaced from the archive
+    (same passage, earlier day) or the quote bank where possible.
+    """
+    deadline = deadline or deadlines.Deadline(None)
+    degraded = {}
+    
+    def optional(module, generate, *args):
+        if deadline.remaining() < OPTIONAL_MIN_SECONDS:
+            _degrade(degraded, module, f"skipped with {deadline.remaining():.0f}s left before the deadline", persona)
+            return None
+        result = generate(*args, deadline=deadline)
+        if not result:
+            reason = "run deadline reached" if deadline.expired() else "generation failed"
+            _degrade(degraded, module, reason, persona)
+        return result
+    
+    # A. Core Devotional (Header, Anchor, Matrix)
+    v2_content = generate_v2_content(ref, combined_text, persona, deadline=deadline)
+    if not v2_content:
+        return None, None, None, []
+    
+    # B. Case Study (Deep Dive)
+    case_study = optional("case_study", generate_case_study, ref, combined_text, v2_content, persona)
+    
+    # B2. Core Devotional (Deep Dive)
+    core_devo = optional("core_devotional", generate_core_devotional, ref, combined_text, v2_content, persona)
+    
+    # C. Prayer Quotes (Decoupled)
+    quotes_list = optional("quotes", generate_prayer_quotes, ref, combined_text, persona, v2_content)
+    
+    # Degraded modules: cached placeholders instead of holding up the send
+    if "case_study" in degraded or "core_devotional" in degraded:
+        cached = devotional_archive.find_cached_sections(ref)
+        if "case_study" in degraded and cached.get("case_study"):
+            case_study = cached["case_study"]
+            degraded["case_study"] += f"; reused from {cached['date']}"
+        if "core_devotional" in degraded and cached.get("core_devotional"):
+            core_devo = cached["core_devotional"]
+            degraded["core_devotional"] += f"; reused from {cached['date']}"
+    if "quotes" in degraded:
+        header = v2_content.get("header", {})
+        picks = quote_bank.select(f"{header.get('big_idea', '')} {header.get('mode', '')}", count=PRAYER_QUOTE_COUNT)
+        quotes_list = [{"quote": pick["quote"], "author": pick["author"]} for pick in picks]
+        if quotes_list:
+            degraded["quotes"] += "; quote bank picks without context"
+    
+    # D. Style gate (fix flagged sections only)
+    content = {"v2_content": v2_content, "case_study": case_study,
+               "core_devotional": core_devo, "quotes": quotes_list or []}
+    if deadline.remaining() < OPTIONAL_MIN_SECONDS:
+        _degrade(degraded, "style_gate", f"skipped with {deadline.remaining():.0f}s left before the deadline", persona)
+    else:
+        with tracing.span("style_gate"):
+            apply_style_gate(ref, combined_text, content, persona, deadline)
+    
+    # E. Check quoted key verses against the stored scripture
+    version = ((persona or {}).get("versions") or SCRIPTURE_VERSIONS)[0]
+    with tracing.span("verse_store.check_key_verses") as record:
+        checks = verse_store.check_key_verses(v2_content.get("anchor", {}).get("key_verses"), version)
+        record["mismatches"] = sum(check["status"] == "mismatch" for check in checks)
+        record["unchecked"] = sum(check["status"] == "unknown" for check in checks)
+    for check in checks:
+        if check["status"] == "mismatch":
+            print(f"Warning: key verse {check['reference']} differs from {version} "
+                  f"(similarity {check['similarity']}): {check['actual']}")
+    
+    return v2_content, case_study, core_devo, quotes_list
+
+
+def set_reading_time(v2_content, combined_text, case_study, core_devo, quotes_list):
+    """Calculate reading time programmatically and store it in the V2 header."""
+    total_text = f"{combined_text} {v2_content} {case_study} {core_devo} {quotes_list}"
+    word_count = len(total_text.split())
+    reading_time_mins = max(1, round(word_count / 200)) # 200 wpm
+    if "header" not in v2_content:
+        v2_content["header"] = {}
+    v2_content["header"]["reading_time"] = f"{reading_time_mins} mins"
+
+
+def prepare_content(ref, day, deadline=None):
+    """
+    Scripture and generated content for `day`: batch pre-generated content when it
+    matches `ref`, otherwise fetched and generated live. Generation works to the run
+    `deadline` minus SEND_RESERVE_SECONDS, so the send still fits.
+    Returns:
+        dict: {'bible_texts', 'parallel_texts', 'v2_content', 'case_study', 'core_devo', 'quotes_list'},
+              or None on failure (the run outcome is set)
+    """
+    pending = devotional_archive.load_pending(day)
+    pregenerated = pending and pending.get("reference") == ref
+    
+    # All configured translations come back from one request (pre-generated days only
+    # store the reference, so their scripture is resolved here too, usually from cache)
+    texts_by_version = get_bible_text(ref, versions=SCRIPTURE_VERSIONS, deadline=deadline) or {}
+    bible_texts = texts_by_version.pop(DEFAULT_VERSION, None) or (pending.get("bible_texts") if pregenerated else None)
+    parallel_texts = texts_by_version
+    if not bible_texts:
+        tracing.set_run_attrs(outcome="scripture_failed")
+        return None
+    combined_text = to_plain_text(bible_texts)
+    
+    if pregenerated:
+        print(f"\n--- Using content pre-generated at {pending.get('generated_at')} ---")
+        tracing.set_run_attrs(pregenerated=True)
+        v2_content = pending["v2_content"]
+        case_study = pending["case_study"]
+        core_devo = pending["core_devotional"]
+        quotes_list = pending["quotes"]
+    else:
+        generation_deadline = deadline.reserve(SEND_RESERVE_SECONDS) if deadline else None
+        v2_content, case_study, core_devo, quotes_list = generate_all_content(ref, combined_text,
+                                                                              deadline=generation_deadline)
+    
+    if not v2_content:
+        print("Error: content generation failed.")
+        tracing.set_run_attrs(outcome="generation_failed")
+        return None
+    
+    set_reading_time(v2_content, combined_text, case_study, core_devo, quotes_list)
+    return {
+        "bible_texts": bible_texts,
+        "parallel_texts": parallel_texts,
+        "v2_content": v2_content,
+        "case_study": case_study,
+        "core_devo": core_devo,
+        "quotes_list": quotes_list,
+    }
+
+
+def record_sent_content(ref, day, content):
+    """Archive the day's content and store its quotes once it has gone out."""
+    with tracing.span("devotional_archive.save_run"):
+        devotional_archive.save_run(ref, content["v2_content"], content["case_study"], content["core_devo"],
+                                    content["quotes_list"], date=day, version=DEFAULT_VERSION)
+        devotional_archive.discard_pending(day)
+    
+    if content["quotes_list"]:
+        with tracing.span("quotes_db.add_quotes"):
+            added = quotes_db.add_quotes(content["quotes_list"], reference=ref)
+        print(f"\n--- Stored {added} new quotes in database ---")
+
+
+def run_pipeline():
+    """Run the daily pipeline once: reference -> scripture -> generation -> email."""
+    today = datetime.now().isoformat()[:10]  # YYYY-MM-DD
+    deadline = deadlines.Deadline(RUN_DEADLINE_SECONDS)
+    
+    # 1. Get Reference (today's scripture is prefetched on a guess meanwhile)
+    prefetch = start_scripture_prefetch(today, deadline)
     ref = get_todays_reference()
+    tracing.set_run_attrs(reference=ref)
+    settle_scripture_prefetch(prefetch, ref, deadline)
     
     if ref:
-        # 2. Get Text (returns a list now)
-        bible_texts = get_bible_text(ref)
+        reading_plan.record(today, ref)
         
-        if bible_texts:
-            # Prepare plain text for AI Generation
-            combined_html = "".join(bible_texts)
-            combined_text = BeautifulSoup(combined_html, "html.parser").get_text(separator="\n\n")
+        # Extra devotionals download in the background while we fetch and generate
+        extra_fetches = start_extra_devotionals(EXTRA_DEVOTIONAL_SOURCES, today)
+        
+        # 2-3. Scripture and generated content
+        content = prepare_content(ref, today, deadline)
+        
+        if content:
+            # 4. Send V2 Email (Pass all components)
+            extra_devotionals = collect_extra_devotionals(extra_fetches)
+            sent = send_v2_email(ref, content["bible_texts"], content["v2_content"], content["case_study"],
+                                 content["quotes_list"], content["core_devo"],
+                                 content["parallel_texts"], extra_devotionals, deadline=deadline)
+            tracing.set_run_attrs(outcome="sent" if sent else "send_failed")
+            
+            # 4b. Translated editions, one parallel model call per language
+            languages = [language for language in TRANSLATION_LANGUAGES if language.get("receiver")]
+            for code, translated in translate_all(ref, content, languages, deadline).items():
+                receiver = next(language["receiver"] for language in languages if language["code"] == code)
+                send_v2_email(ref, translated["bible_texts"], translated["v2_content"], translated["case_study"],
+                              translated["quotes_list"], translated["core_devo"], None, extra_devotionals,
+                              receiver=receiver, deadline=deadline, version=translated["version"], language=code)
+            
+            # 5. Archive the run and store quotes in database (a failed send keeps
+            # any pre-generated content and leaves its quotes unused)
+            if sent:
+                record_sent_content(ref, today, content)
+
+
+def run_delivery(day=None):
+    """
+    Generate the day's devotional once, then release one email per recipient at
+    their local delivery time (see delivery.py), over one reused SMTP connection.
+    Returns:
+        dict: Delivery stats, or None if nothing was sent
+    """
+    today = datetime.now().isoformat()[:10]  # YYYY-MM-DD
+    day = day or today
+    recipients = delivery.load_recipients()
+    if not recipients:
+        print("Error: no recipients (recipients.json or EMAIL_RECEIVER).")
+        tracing.set_run_attrs(outcome="no_recipients")
+        return None
+    queue = delivery.build_queue(recipients, day)
+    print(f"--- Delivery for {day}: {len(recipients)} recipient(s), first slot {queue.next_due():%Y-%m-%d %H:%M} UTC ---")
+    
+    # 1-3. Reference, scripture and content, once for everyone
+    deadline = deadlines.Deadline(RUN_DEADLINE_SECONDS)
+    if day == today:
+        prefetch = start_scripture_prefetch(today, deadline)
+        ref = get_todays_reference()
+        settle_scripture_prefetch(prefetch, ref, deadline)
+    else:
+        ref = reading_plan.get_reference(day)
+    tracing.set_run_attrs(reference=ref, recipients=len(recipients))
+    if not ref:
+        print(f"Error: no reference for {day}.")
+        tracing.set_run_attrs(outcome="no_reference")
+        return None
+    if day == today:
+        reading_plan.record(today, ref)
+    extra_fetches = start_extra_devotionals(EXTRA_DEVOTIONAL_SOURCES, day)
+    content = prepare_content(ref, day, deadline)
+    if not content:
+        return None
+    
+    # 3b. Translated editions for the languages recipients asked for
+    wanted = {recipient.get("language") for recipient in recipients}
+    editions = {None: content}
+    editions.update(translate_all(ref, content, [lang for lang in TRANSLATION_LANGUAGES if lang["code"] in wanted],
+                                  deadline))
+    
+    # 4. Render once per language; each recipient only changes the To header
+    extra_devotionals = collect_extra_devotionals(extra_fetches)
+    rendered = {}
+    with tracing.span("send_v2_email.render", editions=len(editions)):
+        for code, edition in editions.items():
+            rendered[code] = (
+                edition["v2_content"].get("header", {}).get("subject", f"Daily Reading: {ref}"),
+                render_v2_html(ref, edition["bible_texts"], edition["v2_content"], edition["case_study"],
+                               edition["quotes_list"], edition["core_devo"], edition["parallel_texts"],
+                               extra_devotionals, edition.get("version"), code),
+            )
+    sender_email = os.getenv("EMAIL_SENDER")
+    password = os.getenv("EMAIL_PASSWORD")
+    connection = {}
+    
+    def close_connection():
+        server = connection.pop("server", None)
+        if server:
+            try:
+                server.quit()
+            except Exception:
+                pass
+    
+    def send(recipient):
+        subject, html_body = rendered.get(recipient.get("language"), rendered[None])
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = subject
+        msg["From"] = sender_email
+        msg["To"] = recipient["email"]
+        msg.attach(MIMEText(html_body, "html"))
+        # Late time zones are released hours after the run deadline, so each
+        # recipient gets its own send budget
+        send_deadline = deadlines.Deadline(SEND_RESERVE_SECONDS)
+        max_retries = 3
+        for attempt in range(1, max_retries + 1):
+            try:
+                if "server" not in connection:
+                    context = ssl.create_default_context(cafile=certifi.where())
+                    connection["server"] = smtplib.SMTP_SSL("smtp.gmail.com", 465, context=context,
+                                                            timeout=send_deadline.timeout(30))
+                    connection["server"].login(sender_email, password)
+                message_text = msg.as_string()
+                connection["server"].sendmail(sender_email, recipient["email"], message_text)
+                tracing.increment("email_bytes", len(message_text))
+                return True
+            except Exception as e:
+                print(f"Error sending to {recipient['email']} (attempt {attempt}): {e}")
+                tracing.increment("retries")
+                close_connection()
+                if attempt == max_retries or not send_deadline.backoff(5 * attempt):
+                    break
+        return False
+    
+    with tracing.span("delivery.release") as record:
+        try:
+            stats = delivery.release(queue, send, on_idle=close_connection)
+        finally:
+            close_connection()
+        record.update(stats)
+    print(f"\n--- Delivered {stats['sent']}/{len(recipients)} (max {stats['max_lateness_s']}s late) ---")
+    tracing.set_run_attrs(outcome="sent" if not stats["failed"] else "partial", delivered=stats["sent"])
+    
+    # 5. Archive the run and store quotes in database
+    if stats["sent"]:
+        record_sent_content(ref, day, content)
+    return stats
+
+
+def run_batch(days, workers=BATCH_WORKERS):
+    """
+    Pre-generate content for the next `days` days of the reading plan on a
+    bounded worker pool and store it under archive/pending/. Days missing from
+    the calendar use the forecast reference; the daily run only uses pending
+    content whose reference matches the one it scrapes, so a wrong guess costs
+    generation time but never sends the wrong reading.
+    Returns:
+        int: Number of days generated
+    """
+    print(f"--- Batch: pre-generating up to {days} day(s) with {workers} worker(s) ---")
+    todo = []
+    for day, ref, source in reading_plan.forecast(days):
+        if not ref:
+            print(f"{day}: no reference in the reading plan calendar and none can be predicted, skipping.")
+            continue
+        if source == "predicted":
+            print(f"{day}: predicted {ref} from the last known reading.")
+        pending = devotional_archive.load_pending(day)
+        if pending and pending.get("reference") == ref:
+            print(f"{day}: already pre-generated for {ref}, skipping.")
+            continue
+        todo.append((day, ref))
+    
+    # Quotes picked for other pending days are reserved, so days generated in
+    # parallel (which all see the same exclusion list) don't repeat each other
+    reserved = {
+        quotes_db.text_hash(q.get("quote", ""))
+        for day in devotional_archive.list_pending()
+        for q in (devotional_archive.load_pending(day) or {}).get("quotes", [])
+    }
+    reserved_lock = threading.Lock()
+    
+    def generate_day(day, ref):
+        with tracing.span("batch_day", date=day, reference=ref) as record:
+            bible_texts = get_bible_text(ref)
+            if not bible_texts:
+                record["outcome"] = "failed"
+                return False
+            combined_text = to_plain_text(bible_texts)
+            v2_content, case_study, core_devo, quotes_list = generate_all_content(ref, combined_text)
+            if not v2_content:
+                record["outcome"] = "failed"
+                return False
             
-            # 3. Generate Content (3-Step Process)
-            # A. Core Devotional (Header, Anchor, Matrix)
-            v2_content = generate_v2_content(ref, combined_text)
+            unique_quotes = []
+            with reserved_lock:
+                for q in quotes_list or []:
+                    quote_hash = quotes_db.text_hash(q.get("quote", ""))
+                    if quote_hash not in reserved:
+                        reserved.add(quote_hash)
+                        unique_quotes.append(q)
+            if len(unique_quotes) < len(quotes_list or []):
+                print(f"{day}: dropped {len(quotes_list) - len(unique_quotes)} quote(s) already used this batch.")
             
-            # B. Case Study (Deep Dive)
-            case_study = None
-            if v2_content:
-                case_study = generate_case_study(ref, combined_text, v2_content)
+            devotional_archive.save_pending(day, ref, v2_content, case_study, core_devo, unique_quotes,
+                                            version=DEFAULT_VERSION)
+            return True
+    
+    generated = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(generate_day, day, ref): day for day, ref in todo}
+        for future in as_completed(futures):
+            day = futures[future]
+            try:
+                if future.result():
+                    generated += 1
+                    print(f"{day}: pre-generated.")
+                else:
+                    print(f"{day}: generation failed.")
+            except Exception as e:
+                print(f"{day}: error in batch generation: {e}")
+    
+    print(f"\n--- Batch complete: {generated}/{len(todo)} day(s) pre-generated ---")
+    tracing.set_run_attrs(outcome="batch_complete", batch_days=len(todo), batch_generated=generated)
+    return generated
+
+
+def load_run_config(path):
+    """
+    Load a multi-audience run configuration:
+        {
+            "max_concurrent_generations": 4,
+            "plans": [{"name": "church", "source": "wearechurchreading"},
+                      {"name": "nt", "calendar": "plans/nt.json"}],
+            "personas": [{"name": "leader", "plan": "church", "receiver": "a@example.com"},
+                         {"name": "students", "plan": "nt", "audience": "...",
+                          "system_identity": "personas/students.md", "versions": ["NIV"]}]
+        }
+    A plan takes its reference from the daily scrape (default), a date -> reference
+    `calendar` file, or a fixed `reference`. The first persona is the primary one
+    (archived and indexed like a single-audience run).
+    """
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    plans = {plan["name"]: plan for plan in config.get("plans", [])}
+    if not config.get("personas"):
+        raise ValueError(f"{path}: no personas configured")
+    for persona in config["personas"]:
+        if persona.get("plan") not in plans:
+            raise ValueError(f"{path}: persona '{persona.get('name')}' uses unknown plan '{persona.get('plan')}'")
+    config["plans"] = plans
+    return config
+
+
+def _plan_reference(plan, day, scraped):
+    """Resolve a plan's reference for `day`; the live scrape runs at most once per run (memoized in `scraped`)."""
+    if plan.get("reference"):
+        return plan["reference"]
+    if plan.get("calendar"):
+        return reading_plan.load_calendar(plan["calendar"]).get(day)
+    if "reference" not in scraped:
+        scraped["reference"] = get_todays_reference()
+        if scraped["reference"]:
+            reading_plan.record(day, scraped["reference"])
+    return scraped["reference"]
+
+
+def run_multi(config_path):
+    """
+    Run several plans and personas in one process: each distinct reference is
+    fetched once (with every translation any persona needs), then the personas
+    generate and send in parallel, sharing the model concurrency limit.
+    Returns:
+        int: Number of personas sent
+    """
+    config = load_run_config(config_path)
+    set_generation_limit(config.get("max_concurrent_generations", MAX_CONCURRENT_GENERATIONS))
+    today = datetime.now().isoformat()[:10]  # YYYY-MM-DD
+    deadline = deadlines.Deadline(RUN_DEADLINE_SECONDS)
+    personas = config["personas"]
+    
+    # 1. References, one per plan
+    scraped = {}
+    plan_refs = {name: _plan_reference(plan, today, scraped) for name, plan in config["plans"].items()}
+    
+    # 2. Scripture, one fetch per distinct reference covering all requested versions
+    versions_by_ref = {}
+    for persona in personas:
+        ref = plan_refs[persona["plan"]]
+        if ref:
+            wanted = versions_by_ref.setdefault(ref, [])
+            for version in persona.get("versions") or SCRIPTURE_VERSIONS:
+                if version not in wanted:
+                    wanted.append(version)
+    texts_by_ref = {
+        ref: get_bible_text(ref, versions=versions, deadline=deadline) or {} for ref, versions in versions_by_ref.items()
+    }
+    tracing.set_run_attrs(plans=len(plan_refs), personas=len(personas), scripture_fetches=len(texts_by_ref))
+    
+    extra_fetches = start_extra_devotionals(EXTRA_DEVOTIONAL_SOURCES, today)
+    extras = {}
+    extras_lock = threading.Lock()
+    
+    # Personas pick quotes in parallel against the same exclusion list; a quote
+    # goes to the first persona that reserves it, as in run_batch
+    reserved = set()
+    reserved_lock = threading.Lock()
+    
+    def run_persona(persona, primary):
+        name = persona["name"]
+        ref = plan_refs[persona["plan"]]
+        with tracing.span("persona", persona=name, reference=ref) as record:
+            versions = persona.get("versions") or SCRIPTURE_VERSIONS
+            texts = texts_by_ref.get(ref, {})
+            bible_texts = texts.get(versions[0])
+            if not bible_texts:
+                print(f"[{name}] No scripture for {ref}, skipping.")
+                record["outcome"] = "failed"
+                return False
+            parallel_texts = {version: texts[version] for version in versions[1:] if version in texts}
+            combined_text = to_plain_text(bible_texts)
+            v2_content, case_study, core_devo, quotes_list = generate_all_content(
+                ref, combined_text, persona, deadline.reserve(SEND_RESERVE_SECONDS)
+            )
+            if not v2_content:
+                record["outcome"] = "failed"
+                return False
             
-            # B2. Core Devotional (Deep Dive)
-            core_devo = None
-            if v2_content:
-                core_devo = generate_core_devotional(ref, combined_text, v2_content)
+            unique_quotes = []
+            with reserved_lock:
+                for q in quotes_list or []:
+                    quote_hash = quotes_db.text_hash(q.get("quote", ""))
+                    if quote_hash not in reserved:
+                        reserved.add(quote_hash)
+                        unique_quotes.append(q)
+            if len(unique_quotes) < len(quotes_list or []):
+                print(f"[{name}] dropped {len(quotes_list) - len(unique_quotes)} quote(s) another persona picked.")
+            quotes_list = unique_quotes
+            set_reading_time(v2_content, combined_text, case_study, core_devo, quotes_list)
             
-            # C. Prayer Quotes (Decoupled)
-            quotes_list = []
-            if v2_content:
-                quotes_list = generate_prayer_quotes(ref, combined_text)
+            with extras_lock:
+                if "collected" not in extras:
+                    extras["collected"] = collect_extra_devotionals(extra_fetches)
+            sent = send_v2_email(ref, bible_texts, v2_content, case_study, quotes_list, core_devo,
+                                 parallel_texts, extras["collected"], receiver=persona.get("receiver"),
+                                 deadline=deadline)
             
-            if v2_content:
-                # Calculate reading time programmatically
-                total_text = f"{combined_text} {v2_content} {case_study} {core_devo} {quotes_list}"
-                word_count = len(total_text.split())
-                reading_time_mins = max(1, round(word_count / 200)) # 200 wpm
-                if "header" not in v2_content:
-                    v2_content["header"] = {}
-                v2_content["header"]["reading_time"] = f"{reading_time_mins} mins"
-                
-                # 4. Send V2 Email (Pass all components)
-                send_v2_email(ref, bible_texts, v2_content, case_study, quotes_list, core_devo)
-                
-                # 5. Store quotes in database
-                if quotes_list:
-                    added = quotes_db.add_quotes(quotes_list)
-                    print(f"\n--- Stored {added} new quotes in database ---")
-            else:
-                 print("Error: content generation failed.")
+            devotional_archive.save_run(ref, v2_content, case_study, core_devo, quotes_list,
+                                        persona=None if primary else name, version=versions[0])
+            if quotes_list:
+                quotes_db.add_quotes(quotes_list, reference=ref)
+            if not sent:
+                record["outcome"] = "failed"
+            return sent
     
+    sent_count = 0
+    with ThreadPoolExecutor(max_workers=len(personas)) as pool:
+        futures = {pool.submit(run_persona, persona, i == 0): persona["name"] for i, persona in enumerate(personas)}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                if future.result():
+                    sent_count += 1
+                    print(f"[{name}] sent.")
+                else:
+                    print(f"[{name}] failed.")
+            except Exception as e:
+                print(f"[{name}] error: {e}")
+    
+    print(f"\n--- Multi run complete: {sent_count}/{len(personas)} persona(s) sent ---")
+    tracing.set_run_attrs(outcome="sent" if sent_count == len(personas) else "partial", personas_sent=sent_count)
+    return sent_count
+
+
+def run_command(command, args):
+    """
+    Run one command as a traced run (one record in the run metrics log).
+    Returns:
+        dict: The run record
+    """
+    tracing.start_run(outcome="incomplete", command=command, offline=args.offline, profile=args.profile)
+    try:
+        if command == "batch":
+            run_batch(args.days, args.workers)
+        elif command == "multi":
+            run_multi(args.config)
+        elif command == "deliver":
+            run_delivery(args.date)
+        else:
+            run_pipeline()
+    finally:
+        record = tracing.end_run()
+        try:
+            run_history.record(record)
+        except sqlite3.Error as e:
+            print(f"Error recording run history: {e}")
+    return record
+
+
+# Default serve schedule: the same times as the GitHub Actions workflows (UTC)
+DEFAULT_SCHEDULE = ["30 9 * * *=run", "0 11 * * 0=batch"]
+
+
+def serve(args):
+    """Stay resident and run scheduled commands in this process (clients, caches and indexes stay warm)."""
+    import daemon
+    jobs = []
+    for entry in args.schedule or DEFAULT_SCHEDULE:
+        expression, _, command = entry.rpartition("=")
+        if command not in ("run", "batch", "multi", "deliver"):
+            raise ValueError(f"Unknown scheduled command '{command}' in '{entry}'")
+        jobs.append(daemon.Job(command, expression, lambda command=command: run_command(command, args)))
+    
+    # Warm up once: indexes synced and migrated before the first job
+    quotes_db.init_db()
+    devotional_archive.recent_case_study_subjects(limit=1)
+    if args.web_port:
+        import web_server
+        web_server.start(web_server.DevotionalSite(render_archived), port=args.web_port)
+    daemon.Daemon(jobs, port=args.port).serve()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate and email the daily devotional.")
+    parser.add_argument("command", nargs="?", default="run", choices=["run", "batch", "multi", "deliver", "serve"],
+                        help="'run' sends today's devotional; 'batch' pre-generates upcoming days; "
+                             "'multi' runs every plan and persona in --config; "
+                             "'deliver' sends to each recipient at their local time; "
+                             "'serve' stays resident and runs them on --schedule.")
+    parser.add_argument("--days", type=int, default=7,
+                        help="Number of upcoming days to pre-generate (batch).")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS,
+                        help="Maximum days generated concurrently (batch).")
+    parser.add_argument("--config", default="run_config.json",
+                        help="Plans and personas for 'multi' (see load_run_config).")
+    parser.add_argument("--date",
+                        help="YYYY-MM-DD reading day to deliver (deliver; default today).")
+    parser.add_argument("--schedule", action="append",
+                        help="'CRON=command' for serve, repeatable (default: " + ", ".join(DEFAULT_SCHEDULE) + ").")
+    parser.add_argument("--port", type=int, default=8787,
+                        help="Local port for the serve health/status endpoint.")
+    parser.add_argument("--web-port", type=int,
+                        help="Also serve archived devotionals (HTML/JSON) on this port (serve; see web_server.py).")
+    parser.add_argument("--offline", action="store_true",
+                        help="Use deterministic stubs instead of the network, Gemini and SMTP.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Run each stage under cProfile and tracemalloc and write a per-stage report.")
+    args = parser.parse_args()
+
+    if args.offline:
+        import offline_stubs
+        offline_stubs.install(sys.modules[__name__])
+    if args.profile:
+        import profiling
+        profiling.enable()
+        SCRIPTURE_PREFETCH = False  # Fetch on the main thread so the scripture stages are profiled
+
+    try:
+        if args.command == "serve":
+            serve(args)
+        else:
+            run_command(args.command, args)
+    finally:
+        if args.profile:
+            profiling.write_report()
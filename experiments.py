@@ -0,0 +1,233 @@
+"""
+Prompt Experiments Module
+
+Measures prompt variants before they replace SYSTEM_IDENTITY or the V2
+prompt. Every variant x passage combination makes one V2 generation call
+through the normal model path (_generate, with its rate limit and
+generation slots), run concurrently within a concurrency cap, and each is
+scored on:
+
+    latency (wall and model time), input/output tokens, whether the reply
+    parses as JSON, and style gate issues (blacklist phrases, missing keys)
+
+A variant is a persona-style dict; anything it leaves out uses the
+production prompt:
+
+    {"name": "terse-insight",
+     "system_identity": "prompts/identity_v3.md",     # text or a .md/.txt path
+     "audience": "a busy pastor",
+     "v2_instructions": "Keep `insight` under 120 words.",
+     "model": "gemini-2.5-flash-preview-09-2025"}
+
+The corpus is (reference, scripture text) pairs: the most recent archived
+days, or a JSONL file written by the `corpus` command.
+
+Usage:
+    python experiments.py corpus --days 30 --out corpus.jsonl
+    python experiments.py run experiments.example.json --corpus corpus.jsonl --concurrency 4
+    python experiments.py run experiments.example.json --offline --out results.jsonl
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import devotional_archive
+import run_history
+import style_gate
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_CORPUS_DAYS = 20
+
+_DAY_FILE = re.compile(r"^(\d{4}-\d{2}-\d{2})\.json$")
+
+
+def load_variants(path):
+    """Read a JSON list of variants (or {"variants": [...]}); each needs a unique name."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    variants = data["variants"] if isinstance(data, dict) else data
+    names = [variant.get("name") for variant in variants]
+    if not all(names) or len(set(names)) != len(names):
+        raise ValueError("Every variant needs a unique 'name'")
+    return variants
+
+
+def archive_corpus(days=DEFAULT_CORPUS_DAYS):
+    """(reference, scripture text) pairs from the `days` most recent archived runs."""
+    import devotional_bot
+    archive_dir = devotional_archive.ARCHIVE_DIR
+    dates = sorted(
+        (match.group(1) for match in map(_DAY_FILE.match, os.listdir(archive_dir) if os.path.isdir(archive_dir) else [])
+         if match),
+        reverse=True,
+    )
+    corpus = []
+    for date in dates:
+        record = devotional_archive.load_run(date)
+        bible_texts = devotional_bot.archived_bible_texts(record) if record and record.get("reference") else None
+        if bible_texts:
+            corpus.append({
+                "date": date,
+                "reference": record["reference"],
+                "text": devotional_bot.to_plain_text(bible_texts),
+            })
+        if len(corpus) == days:
+            break
+    return corpus
+
+
+def load_corpus(path):
+    """Read (reference, text) pairs from a JSONL file, one {"reference", "text"} per line."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _parse_json(text):
+    """The reply as JSON, with the same code-fence cleanup as generate_v2_content (None if invalid)."""
+    clean_text = (text or "").strip()
+    if clean_text.startswith("```json"):
+        clean_text = clean_text[7:]
+    if clean_text.endswith("```"):
+        clean_text = clean_text[:-3]
+    try:
+        data = json.loads(clean_text)
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def run_case(bot, variant, passage):
+    """
+    One V2 generation call for `variant` on `passage`, with no retries (a retry
+    would hide the failure rate being measured).
+
+    Returns:
+        dict: {'variant', 'reference', 'ok', 'error', 'valid_json', 'wall_ms', 'model_ms',
+               'queue_wait_ms', 'input_tokens', 'output_tokens', 'blacklist', 'missing'}
+    """
+    result = {"variant": variant["name"], "reference": passage["reference"], "ok": False, "error": None,
+              "valid_json": False, "blacklist": 0, "missing": 0}
+    model = variant.get("model") or bot.MODEL_NAME
+    with bot.tracing.span("experiment.case", variant=variant["name"]) as record:
+        try:
+            prompt = bot.build_v2_prompt(passage["reference"], passage["text"], variant)
+            config = bot.types.GenerateContentConfig(
+                system_instruction=bot._system_identity(variant),
+                safety_settings=bot.SAFETY_SETTINGS,
+                response_mime_type="application/json"
+            )
+            response = bot._generate(bot._get_client(os.getenv("GOOGLE_API_KEY")), model, prompt, config)
+            result["ok"] = True
+            content = _parse_json(response.text)
+            if content is not None:
+                result["valid_json"] = True
+                for issue in style_gate.scan({"v2_content": content}):
+                    if issue["kind"] == "blacklist":
+                        result["blacklist"] += len(issue["detail"].split(", "))
+                    elif issue["kind"] == "missing":
+                        result["missing"] += 1
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+    for field in ("wall_ms", "model_ms", "queue_wait_ms", "input_tokens", "output_tokens"):
+        result[field] = record.get(field)
+    return result
+
+
+def run_experiment(bot, variants, corpus, concurrency=DEFAULT_CONCURRENCY):
+    """
+    Run every variant x passage combination, at most `concurrency` model calls at once.
+
+    Returns:
+        (results, seconds): per-case result dicts (see run_case) and the total wall time.
+    """
+    bot.set_generation_limit(concurrency)
+    cases = [(variant, passage) for variant in variants for passage in corpus]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda case: run_case(bot, *case), cases))
+    return results, time.perf_counter() - start
+
+
+def summarize(results, seconds):
+    """Per-variant summary rows, in the order variants first appear."""
+    rows = {}
+    for result in results:
+        rows.setdefault(result["variant"], []).append(result)
+    summary = []
+    for name, cases in rows.items():
+        answered = [case for case in cases if case["ok"]]
+        wall = [case["wall_ms"] for case in cases]
+        summary.append({
+            "variant": name,
+            "cases": len(cases),
+            "errors": len(cases) - len(answered),
+            "valid_json_rate": sum(case["valid_json"] for case in cases) / len(cases),
+            "blacklist_hits": sum(case["blacklist"] for case in cases),
+            "cases_with_blacklist": sum(case["blacklist"] > 0 for case in cases),
+            "missing_keys": sum(case["missing"] for case in cases),
+            "p50_ms": run_history.percentile(wall, 50),
+            "p95_ms": run_history.percentile(wall, 95),
+            "mean_input_tokens": sum(case["input_tokens"] or 0 for case in answered) / max(1, len(answered)),
+            "mean_output_tokens": sum(case["output_tokens"] or 0 for case in answered) / max(1, len(answered)),
+            # Variants share the pool, so this is each variant's share of overall throughput
+            "cases_per_minute": len(cases) / seconds * 60 if seconds else None,
+        })
+    return summary
+
+
+def print_summary(summary, seconds, concurrency):
+    print(f"\n{sum(row['cases'] for row in summary)} cases in {seconds:,.1f}s (concurrency {concurrency})\n")
+    print(f"{'variant':<20} {'cases':>5} {'err':>4} {'json ok':>8} {'blacklist':>9} {'missing':>7} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'in tok':>7} {'out tok':>7} {'per min':>8}")
+    for row in summary:
+        print(f"{row['variant']:<20} {row['cases']:>5} {row['errors']:>4} {row['valid_json_rate']:>8.0%} "
+              f"{row['blacklist_hits']:>4} ({row['cases_with_blacklist']:>2}) {row['missing_keys']:>7} "
+              f"{run_history._fmt(row['p50_ms']):>8} {run_history._fmt(row['p95_ms']):>8} "
+              f"{row['mean_input_tokens']:>7,.0f} {row['mean_output_tokens']:>7,.0f} "
+              f"{run_history._fmt(row['cases_per_minute'], 1):>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare prompt variants over a corpus of past passages.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    corpus_parser = subparsers.add_parser("corpus", help="Export recent archived passages as a corpus file.")
+    corpus_parser.add_argument("--days", type=int, default=DEFAULT_CORPUS_DAYS)
+    corpus_parser.add_argument("--out", required=True)
+    run_parser = subparsers.add_parser("run", help="Run every variant over the corpus and summarize.")
+    run_parser.add_argument("variants", help="JSON file with the prompt variants.")
+    run_parser.add_argument("--corpus", help="Corpus JSONL (default: the most recent archived days).")
+    run_parser.add_argument("--days", type=int, default=DEFAULT_CORPUS_DAYS, help="Archived days without --corpus.")
+    run_parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    run_parser.add_argument("--out", help="Write one JSON line per case.")
+    run_parser.add_argument("--offline", action="store_true", help="Use the offline stub backend.")
+    args = parser.parse_args()
+
+    import devotional_bot
+    if getattr(args, "offline", False):
+        import offline_stubs
+        offline_stubs.install(devotional_bot)
+
+    if args.command == "corpus":
+        passages = archive_corpus(args.days)
+        with open(args.out, "w", encoding="utf-8") as f:
+            for passage in passages:
+                f.write(json.dumps(passage, ensure_ascii=False) + "\n")
+        print(f"Wrote {len(passages)} passages to {args.out}")
+    else:
+        passages = load_corpus(args.corpus) if args.corpus else archive_corpus(args.days)
+        if not passages and args.offline:
+            import offline_stubs
+            passages = [{"reference": offline_stubs.REFERENCE,
+                         "text": devotional_bot.to_plain_text(offline_stubs.sample_bible_texts())}]
+        if not passages:
+            raise SystemExit("No passages: archive some days or pass --corpus.")
+        results, seconds = run_experiment(devotional_bot, load_variants(args.variants), passages, args.concurrency)
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                for result in results:
+                    f.write(json.dumps(result) + "\n")
+        print_summary(summarize(results, seconds), seconds, args.concurrency)
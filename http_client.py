@@ -0,0 +1,184 @@
+"""
+Shared HTTP Client Module
+
+One HTTP layer for every fetcher: a pooled keep-alive session, connect/read
+timeouts, transient-error retries, and ETag / Last-Modified revalidation
+backed by a local response store (SQLite under cache/), so unchanged pages
+come back as a bodiless 304.
+
+Set HTTP_TRANSPORT=httpx to use an httpx client instead of requests; it
+negotiates HTTP/2 when the optional `h2` package is installed.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import tracing
+
+# Response store location (inside the local fetch cache)
+STORE_PATH = os.path.join(
+    os.getenv("DEVOTIONAL_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")),
+    "http_responses.db",
+)
+
+USER_AGENT = "Mozilla/5.0"
+DEFAULT_TIMEOUT = (5, 20)  # (connect, read) seconds
+TRANSPORT = os.getenv("HTTP_TRANSPORT", "requests")
+
+_session = None
+_session_lock = threading.Lock()
+_store_lock = threading.Lock()
+
+
+class FetchResult:
+    """Body and metadata of a fetch; `revalidated` is True when served from the store after a 304."""
+
+    def __init__(self, url, status_code, content, headers, revalidated=False, elapsed_ms=0.0):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.revalidated = revalidated
+        self.elapsed_ms = elapsed_ms
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+
+class _HttpxSession:
+    """Adapts an httpx.Client to the small part of the requests.Session API used here."""
+
+    def __init__(self):
+        import httpx
+        try:
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            http2 = False
+        # Pool and protocol settings belong on the transport: a Client given
+        # `transport=` ignores its own `limits=` and `http2=`
+        transport = httpx.HTTPTransport(
+            retries=2,
+            http2=http2,
+            limits=httpx.Limits(max_keepalive_connections=10),
+        )
+        self.client = httpx.Client(follow_redirects=True, transport=transport)
+
+    def get(self, url, headers=None, timeout=DEFAULT_TIMEOUT):
+        import httpx
+        connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        return self.client.get(url, headers=headers, timeout=httpx.Timeout(read, connect=connect))
+
+
+def get_session():
+    """Return the process-wide keep-alive session, creating it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            if TRANSPORT == "httpx":
+                _session = _HttpxSession()
+            else:
+                session = requests.Session()
+                retries = Retry(total=2, backoff_factor=0.5, status_forcelist=[502, 503, 504],
+                                allowed_methods=["GET"])
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=retries)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers["User-Agent"] = USER_AGENT
+                _session = session
+        return _session
+
+
+def _store_connect():
+    os.makedirs(os.path.dirname(STORE_PATH), exist_ok=True)
+    conn = sqlite3.connect(STORE_PATH)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS responses (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            content BLOB NOT NULL,
+            fetched_at TEXT NOT NULL
+        )
+    """)
+    return conn
+
+
+def _load_stored(url):
+    with _store_lock:
+        conn = _store_connect()
+        row = conn.execute("SELECT etag, last_modified, content FROM responses WHERE url = ?", (url,)).fetchone()
+        conn.close()
+    return row
+
+
+def _save_stored(url, etag, last_modified, content):
+    with _store_lock:
+        conn = _store_connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (url, etag, last_modified, content, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            (url, etag, last_modified, content, datetime.now().isoformat(timespec="seconds"))
+        )
+        conn.commit()
+        conn.close()
+
+
+def fetch(url, timeout=DEFAULT_TIMEOUT, revalidate=True):
+    """
+    GET a URL through the shared session.
+
+    Args:
+        url: Absolute URL
+        timeout: Seconds, or a (connect, read) tuple
+        revalidate: Send If-None-Match / If-Modified-Since from the response
+                    store and keep validators of fresh responses
+
+    Returns:
+        FetchResult
+
+    Raises:
+        requests.HTTPError / httpx.HTTPStatusError on 4xx/5xx, and the
+        transport's timeout/connection errors.
+    """
+    headers = {"User-Agent": USER_AGENT}
+    stored = _load_stored(url) if revalidate else None
+    if stored:
+        etag, last_modified, _ = stored
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+    start = time.perf_counter()
+    response = get_session().get(url, headers=headers, timeout=timeout)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if response.status_code == 304 and stored:
+        tracing.increment("http_revalidated")
+        return FetchResult(url, 200, stored[2], dict(response.headers), revalidated=True, elapsed_ms=elapsed_ms)
+
+    response.raise_for_status()
+    content = response.content
+    tracing.increment("http_bytes", len(content))
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if revalidate and (etag or last_modified):
+        _save_stored(url, etag, last_modified, content)
+
+    return FetchResult(url, response.status_code, content, dict(response.headers), elapsed_ms=elapsed_ms)
+
+
+def set_session(session):
+    """Replace the shared session (used by the offline stubs and tests)."""
+    global _session
+    with _session_lock:
+        _session = session
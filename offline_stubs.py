@@ -0,0 +1,352 @@
+"""
+Offline Stub Backend
+
+Deterministic stand-ins for the network dependencies of devotional_bot
+(reading-plan scrape, BibleGateway, Gemini and SMTP) so the pipeline can be
+run and profiled without credentials or network access.
+
+Usage:
+    import devotional_bot, offline_stubs
+    offline_stubs.install(devotional_bot)
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import urllib.parse
+from datetime import date
+
+import devotional_archive
+import http_client
+import quote_bank
+import quotes_db
+import reading_plan
+import style_gate
+import verse_store
+
+REFERENCE = "Genesis 43; Matthew 12:1-13:23"
+
+# (book code, chapter, verse count) for each passage in REFERENCE
+_PASSAGE_SHAPES = [
+    ("Gen", [(43, 34)]),
+    ("Matt", [(12, 50), (13, 23)]),
+]
+
+_WORDS = (
+    "and he said to them the LORD your God has brought you out of the land "
+    "with a mighty hand so that you may know that I am he who keeps covenant"
+).split()
+
+
+def _verse_text(book, chapter, verse):
+    """Build a deterministic pseudo-verse of 20-30 words."""
+    count = 20 + (chapter * 7 + verse * 3) % 11
+    start = (chapter + verse) % len(_WORDS)
+    return " ".join(_WORDS[(start + i) % len(_WORDS)] for i in range(count))
+
+
+def _passage_div(book, chapters, version="ESV"):
+    """Render one BibleGateway-shaped passage block with footnotes and cross-refs."""
+    parts = [f'<div class="version-{version} result-text-style-normal text-html">']
+    for chapter, verses in chapters:
+        parts.append(f'<h3><span class="text {book}-{chapter}-1">Heading for {book} {chapter}</span></h3>')
+        for verse in range(1, verses + 1):
+            if verse == 1 or verse % 6 == 0:
+                if verse != 1:
+                    parts.append("</p>")
+                parts.append("<p>")
+            marker = (
+                f'<span class="chapternum">{chapter} </span>' if verse == 1
+                else f'<sup class="versenum">{verse} </sup>'
+            )
+            parts.append(
+                f'<span id="en-ESV-{chapter}{verse:03d}" class="text {book}-{chapter}-{verse}">'
+                f'{marker}{_verse_text(book, chapter, verse)}'
+                f'<sup class="crossreference" data-cr="#cen-ESV-{verse}">(<a href="#">{chr(97 + verse % 26)}</a>)</sup>'
+                f'</span> '
+            )
+        parts.append("</p>")
+    parts.append('<div class="footnotes"><h4>Footnotes</h4><ol><li>Or <i>stub</i></li></ol></div>')
+    parts.append('<div class="crossrefs hidden"><h4>Cross references</h4><ol><li>Stub 1:1</li></ol></div>')
+    parts.append('<a class="full-chap-link" href="#">Read full chapter</a>')
+    parts.append("</div>")
+    return "".join(parts)
+
+
+def biblegateway_page(versions=("ESV",)):
+    """Return a full BibleGateway-style search result page for REFERENCE, one column per version."""
+    passages = "".join(
+        f'<div class="passage-col version-{version}" data-translation="{version}"><div class="passage-text">'
+        + "".join(_passage_div(book, chapters, version) for book, chapters in _PASSAGE_SHAPES)
+        + "</div></div>"
+        for version in versions
+    )
+    nav = "".join(f'<li><a href="/nav/{i}">Link {i}</a></li>' for i in range(200))
+    return f"<html><head><title>Stub</title></head><body><ul>{nav}</ul>{passages}</body></html>"
+
+
+# --- Canned model output (shapes match the prompts in devotional_bot) ---
+V2_CONTENT = {
+    "header": {
+        "subject": "Stop Negotiating with God (Gen 43)",
+        "big_idea": "Mercy arrives before we manage to earn it.",
+        "reading_time": "6 mins",
+        "mode": "Mercy > Merit",
+    },
+    "anchor": {
+        "key_verses": [
+            f"Genesis 43:23 - {_verse_text('Gen', 43, 23)}",
+            f"Matthew 12:7 - {_verse_text('Matt', 12, 7)}",
+        ],
+        "insight": "Judah offers himself as a pledge. **Mercy** reframes the ledger.",
+    },
+    "integration": {
+        "soma": {"action": "Open your hands for two minutes.", "verse": "Genesis 43:23", "explanation": "Posture trains the heart."},
+        "soul": {"pivot": "From audit to gift.", "verse": "Matthew 12:7", "explanation": "Replace the ledger with a table."},
+        "spirit": {"breath_prayer_inhale": "Peace to me", "breath_prayer_exhale": "I will not fear", "explanation": "Rhythm anchors trust."},
+    },
+}
+
+CASE_STUDY = {
+    "subject": "Corrie ten Boom",
+    "narrative": "In 1947 Corrie ten Boom met a former Ravensbruck guard after a talk in Munich. " * 8,
+    "connection": "Joseph's brothers navigate an expected audit and receive a feast.",
+    "takeaway": "Forgiveness is a decision made before the feeling arrives.",
+}
+
+CORE_DEVOTIONAL = {
+    "title": "The Table Before the Ledger",
+    "content": ("The brothers return to Egypt carrying double money. **They expect a trap.** " * 30).strip(),
+}
+
+PRAYER_QUOTES = [
+    {"quote": "Prayer is not preparation for the greater work; prayer is the greater work.", "author": "Oswald Chambers", "context": "Judah's plea precedes the feast."},
+    {"quote": "God shapes the world by prayer.", "author": "E.M. Bounds", "context": "Jacob's blessing sends his sons."},
+    {"quote": "The man who mobilizes the Christian church to pray will make the greatest contribution to world evangelization in history.", "author": "Andrew Murray", "context": "Mercy is received, not earned."},
+]
+
+
+def sample_bible_texts(version="ESV"):
+    """The stub passages for REFERENCE, as get_bible_text returns them."""
+    return [_passage_div(book, chapters, version) for book, chapters in _PASSAGE_SHAPES]
+
+
+def sample_record(date):
+    """
+    An archive record (as devotional_archive.save_run writes it) built from the canned
+    content. Its scripture resolves through get_bible_text, so render it with the stubs installed.
+    """
+    return {
+        "date": date,
+        "reference": REFERENCE,
+        "version": "ESV",
+        "v2_content": V2_CONTENT,
+        "case_study": CASE_STUDY,
+        "core_devotional": CORE_DEVOTIONAL,
+        "quotes": PRAYER_QUOTES,
+    }
+
+
+def _corrected_section(prompt):
+    """Answer a style-gate correction by echoing the section with blacklisted words replaced."""
+    current = prompt.split("```json", 1)[1].split("```", 1)[0].strip()
+    value = None if current == "(missing)" else json.loads(current)
+    fixed = style_gate.BLACKLIST_PATTERN.sub("walk through", json.dumps(value))
+    return json.dumps({"value": json.loads(fixed) if value is not None else "Stub section."})
+
+
+def _translated(prompt):
+    """Answer a translation by tagging every string (except authors) with the language code."""
+    code = re.search(r"TRANSLATION \(([\w-]+)\)", prompt).group(1)
+    sections = json.loads(prompt.split("```json", 1)[1].split("```", 1)[0])
+
+    def tag(value, key=None):
+        if isinstance(value, dict):
+            return {k: tag(v, k) for k, v in value.items()}
+        if isinstance(value, list):
+            return [tag(v) for v in value]
+        if isinstance(value, str) and key != "author":
+            return f"[{code}] {value}"
+        return value
+    return json.dumps(tag(sections), ensure_ascii=False)
+
+
+def _canned_response(prompt):
+    """Pick the canned payload whose prompt shape matches `prompt`."""
+    if "STYLE CORRECTION" in prompt:
+        return _corrected_section(prompt)
+    if "TRANSLATION (" in prompt:
+        return _translated(prompt)
+    if "MODULE 1: THE HEADER" in prompt:
+        return json.dumps(V2_CONTENT)
+    if "Deep Dive Case Study" in prompt:
+        return json.dumps(CASE_STUDY)
+    if "Core Devotional" in prompt:
+        return json.dumps(CORE_DEVOTIONAL)
+    if "QUOTE CONTEXTS" in prompt:
+        count = len(re.findall(r"^\s*\d+\. \"", prompt, re.MULTILINE))
+        return json.dumps([f"Stub context {i} for the day's passage." for i in range(1, count + 1)])
+    if "POWER AND IMPORTANCE OF PRAYER" in prompt:
+        return json.dumps(PRAYER_QUOTES)
+    return "Stub devotional text."
+
+
+class StubUsage:
+    """usage_metadata with the rough 4-characters-per-token counts of the canned exchange."""
+
+    def __init__(self, prompt, text):
+        self.prompt_token_count = len(prompt) // 4
+        self.candidates_token_count = len(text) // 4
+        self.total_token_count = self.prompt_token_count + self.candidates_token_count
+
+
+class StubResponse:
+    def __init__(self, text, prompt=""):
+        self.text = text
+        self.usage_metadata = StubUsage(prompt, text)
+
+
+class _StubModels:
+    def generate_content(self, model, contents, config=None):
+        return StubResponse(_canned_response(contents), contents)
+
+
+class StubClient:
+    """Drop-in for genai.Client that answers from canned payloads."""
+
+    def __init__(self, api_key=None, **kwargs):
+        self.models = _StubModels()
+
+
+class StubHTTPResponse:
+    def __init__(self, content, status_code=200, headers=None):
+        self.content = content.encode("utf-8")
+        self.text = content
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        pass
+
+
+def devotional_page(url):
+    """Return a BibleGateway reading-plan style devotional page."""
+    body = "".join(f"<p>Devotional paragraph {i} for {url}.</p>" for i in range(5))
+    return (
+        f'<html><body><div class="rp-content"><h2>Stub Devotional</h2>{body}'
+        f'<div class="devotional-footer">Footer</div></div></body></html>'
+    )
+
+
+def stub_requests_get(url, headers=None, **kwargs):
+    """Serve stub passage pages (honouring `version=A;B`) or devotional pages."""
+    parsed = urllib.parse.urlparse(url)
+    if not parsed.path.startswith("/passage"):
+        return StubHTTPResponse(devotional_page(url))
+    query = urllib.parse.parse_qs(parsed.query)
+    versions = query.get("version", ["ESV"])[0].split(";")
+    return StubHTTPResponse(biblegateway_page(versions))
+
+
+class StubSession:
+    """Drop-in for the shared HTTP session; sends ETags and answers matching If-None-Match with 304."""
+
+    def __init__(self):
+        self.requests = 0
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests += 1
+        response = stub_requests_get(url, headers=headers)
+        etag = '"' + hashlib.sha1(response.content).hexdigest()[:16] + '"'
+        if (headers or {}).get("If-None-Match") == etag:
+            return StubHTTPResponse("", status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return response
+
+
+class StubSMTP:
+    """Accepts and discards outgoing mail."""
+
+    def __init__(self, *args, **kwargs):
+        self.sent = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def login(self, user, password):
+        pass
+
+    def sendmail(self, sender, receiver, message):
+        self.sent.append((sender, receiver, len(message)))
+
+    def quit(self):
+        pass
+
+
+def install(bot):
+    """
+    Swap the network dependencies of the `devotional_bot` module for stubs.
+
+    The quote history log is copied to a temp directory so offline runs read
+    real history but never modify the committed one; the archive and a
+    reading plan calendar for the coming week (from today, so the scripture
+    prefetch has a prediction) live in the same scratch directory.
+
+    Returns:
+        Callable: uninstall(), which restores every patched path, client and
+        environment variable and removes the scratch directory (used by tests).
+    """
+    originals = []
+    added_env = []
+
+    def patch(obj, name, value):
+        originals.append((obj, name, getattr(obj, name)))
+        setattr(obj, name, value)
+
+    for key, value in {
+        "GOOGLE_API_KEY": "offline",
+        "EMAIL_SENDER": "offline@example.com",
+        "EMAIL_PASSWORD": "offline",
+        "EMAIL_RECEIVER": "offline@example.com",
+    }.items():
+        if key not in os.environ:
+            os.environ[key] = value
+            added_env.append(key)
+
+    scratch_dir = tempfile.mkdtemp(prefix="devotional_offline_")
+    scratch_log = os.path.join(scratch_dir, "quotes_history")
+    if os.path.isdir(quotes_db.LOG_DIR):
+        shutil.copytree(quotes_db.LOG_DIR, scratch_log)
+    patch(quotes_db, "LOG_DIR", scratch_log)
+    patch(quotes_db, "DB_PATH", os.path.join(scratch_dir, "quotes.db"))
+    patch(quote_bank, "DB_PATH", os.path.join(scratch_dir, "quote_bank.db"))
+    patch(devotional_archive, "ARCHIVE_DIR", os.path.join(scratch_dir, "archive"))
+    patch(devotional_archive, "DB_PATH", os.path.join(scratch_dir, "archive.db"))
+    patch(devotional_archive, "PENDING_DIR", os.path.join(scratch_dir, "archive", "pending"))
+    patch(reading_plan, "PLAN_PATH", os.path.join(scratch_dir, "reading_plan.json"))
+    patch(bot, "CACHE_DIR", os.path.join(scratch_dir, "cache"))
+    patch(http_client, "STORE_PATH", os.path.join(scratch_dir, "cache", "http_responses.db"))
+    patch(verse_store, "DB_PATH", os.path.join(scratch_dir, "cache", "verses.db"))
+    for day, _ in reading_plan.upcoming(7, start=date.today()):
+        reading_plan.record(day, REFERENCE)
+
+    patch(bot, "get_todays_reference", bot.tracing.traced("get_todays_reference")(lambda: REFERENCE))
+    patch(http_client, "_session", StubSession())
+    patch(bot, "_clients", {})
+    patch(bot.genai, "Client", StubClient)
+    patch(bot.smtplib, "SMTP_SSL", StubSMTP)
+    print("--- Offline mode: using stub reference, scripture, model and SMTP ---")
+
+    def uninstall():
+        for obj, name, value in reversed(originals):
+            setattr(obj, name, value)
+        for key in added_env:
+            os.environ.pop(key, None)
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+    return uninstall
@@ -0,0 +1,103 @@
+"""
+Profiling Mode
+
+Runs every traced stage under cProfile and tracemalloc and writes a
+per-stage report (wall time, peak allocation, top functions by cumulative
+time) plus one .prof file per stage for tools like snakeviz.
+
+Nested stages are attributed exclusively: while an inner stage runs, the
+outer stage's profiler is paused, so the BeautifulSoup cleanup inside
+get_bible_text is reported on its own rather than folded into the fetch.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import tracing
+
+# Report location (same directory as this script)
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+TOP_FUNCTIONS = 15
+
+_stack = []
+_results = []
+
+
+@contextmanager
+def _profile_stage(name):
+    """Profile one stage on the main thread; stages on worker threads are skipped."""
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    parent = _stack[-1] if _stack else None
+    if parent:
+        parent["profiler"].disable()
+        parent["peak"] = max(parent["peak"], tracemalloc.get_traced_memory()[1] - parent["base"])
+
+    tracemalloc.reset_peak()
+    stage = {
+        "name": name,
+        "profiler": cProfile.Profile(),
+        "base": tracemalloc.get_traced_memory()[0],
+        "peak": 0,
+        "start": time.perf_counter(),
+    }
+    _stack.append(stage)
+    stage["profiler"].enable()
+    try:
+        yield
+    finally:
+        stage["profiler"].disable()
+        _stack.pop()
+        stage["peak"] = max(stage["peak"], tracemalloc.get_traced_memory()[1] - stage["base"])
+        stage["wall_ms"] = (time.perf_counter() - stage["start"]) * 1000
+        _results.append(stage)
+        if parent:
+            parent["profiler"].enable()
+
+
+def enable():
+    """Turn on profiling for every subsequent tracing span."""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    tracing.add_span_hook(_profile_stage)
+    print("--- Profiling mode: cProfile + tracemalloc on every stage ---")
+
+
+def write_report(profile_dir=PROFILE_DIR, top=TOP_FUNCTIONS):
+    """
+    Write profile_report.txt and per-stage .prof files to `profile_dir`.
+
+    Returns:
+        str: Path of the text report.
+    """
+    os.makedirs(profile_dir, exist_ok=True)
+    lines = [f"{'Stage':<40} {'Wall ms':>10} {'CPU ms':>10} {'Peak KiB':>10}", "-" * 73]
+    details = []
+
+    for index, stage in enumerate(_results, start=1):
+        stats = pstats.Stats(stage["profiler"])
+        cpu_ms = stats.total_tt * 1000
+        lines.append(
+            f"{stage['name']:<40} {stage['wall_ms']:>10.1f} {cpu_ms:>10.1f} {stage['peak'] / 1024:>10.1f}"
+        )
+
+        stats.dump_stats(os.path.join(profile_dir, f"{index:02d}_{stage['name']}.prof"))
+        buffer = io.StringIO()
+        pstats.Stats(stage["profiler"], stream=buffer).sort_stats("cumulative").print_stats(top)
+        details.append(f"\n=== {stage['name']} ===\n{buffer.getvalue().strip()}")
+
+    report_path = os.path.join(profile_dir, "profile_report.txt")
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n" + "\n".join(details) + "\n")
+
+    print("\n" + "\n".join(lines))
+    print(f"\n--- Profile report written to {report_path} ---")
+    return report_path
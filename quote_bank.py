@@ -0,0 +1,207 @@
+"""
+Quote Bank Module
+
+A local bank of vetted prayer quotes, ranked against the day's big idea with
+SQLite FTS5 (BM25), so generate_prayer_quotes can pick quotes locally in
+milliseconds and only ask the model for the short "context" explanations.
+
+The bank is the curated quote_bank.jsonl (one {"quote", "author", "themes"}
+object per line). Theme keywords come from the curated themes and the
+author's description ("E.M. Bounds (Clergyman and Author on the power of
+prayer)"). A quote already in the quotes_history/ log is never picked (the
+filter runs in SQL against the quote index), so each bank quote is used
+once; when fewer than the requested number of unused matches remain, the
+caller asks the model for new quotes instead.
+
+quote_bank.db is a local index, rebuilt when the curated file changes.
+
+Usage:
+    python quote_bank.py search "mercy before merit"
+    python quote_bank.py stats
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+
+import quotes_db
+
+# File locations (same directory as this script)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CURATED_PATH = os.path.join(BASE_DIR, "quote_bank.jsonl")
+DB_PATH = os.path.join(BASE_DIR, "quote_bank.db")
+
+# BM25 column weights: quote text, author, theme keywords
+BM25_WEIGHTS = (1.0, 0.5, 2.0)
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "before", "but", "by", "for", "from", "god", "has", "have",
+    "his", "in", "into", "is", "it", "its", "not", "of", "on", "or", "our", "than", "that", "the", "their",
+    "them", "they", "this", "to", "us", "was", "we", "what", "when", "who", "will", "with", "you", "your",
+}
+
+# Bump when the indexed columns change, to force a rebuild
+INDEX_VERSION = 2
+
+_lock = threading.Lock()
+
+
+def _split_author(author):
+    """'E.M. Bounds (Clergyman and Author)' -> ('E.M. Bounds', 'Clergyman and Author')."""
+    match = re.match(r"^\s*(.*?)\s*\((.*)\)\s*$", author or "")
+    if match:
+        return match.group(1), match.group(2)
+    return (author or "").strip(), ""
+
+
+def _sources():
+    """Source files whose size/mtime decide whether the index is stale."""
+    return [CURATED_PATH] if os.path.exists(CURATED_PATH) else []
+
+
+def _signature(paths):
+    return json.dumps([INDEX_VERSION] + [(os.path.basename(path), os.path.getsize(path), os.stat(path).st_mtime_ns) for path in paths])
+
+
+def entry_problem(entry):
+    """Why a curated entry can't be emailed as-is (e.g. a truncated byline), or None if it can."""
+    quote, author = entry.get("quote"), entry.get("author")
+    if not isinstance(quote, str) or not quote.strip():
+        return "missing quote"
+    if not isinstance(author, str) or not author.strip():
+        return "missing author"  # Unattributed quotes can't be shown with a byline
+    if author.count("(") != author.count(")") or not _split_author(author)[0]:
+        return f"malformed author {author!r}"
+    return None
+
+
+def _read_entries(paths):
+    """
+    Yield (text_hash, quote, full author, author name, themes) from the curated
+    file; the first occurrence of a quote wins. Entries with a missing quote or
+    a malformed byline are skipped with a warning.
+    """
+    seen = set()
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                problem = entry_problem(entry)
+                if problem:
+                    print(f"Quote bank: skipping {os.path.basename(path)} line {number}: {problem}")
+                    continue
+                quote_hash = quotes_db.text_hash(entry["quote"])
+                if quote_hash in seen:
+                    continue
+                seen.add(quote_hash)
+                name, description = _split_author(entry.get("author"))
+                themes = " ".join(filter(None, [
+                    " ".join(entry.get("themes", [])) if isinstance(entry.get("themes"), list) else entry.get("themes"),
+                    description,
+                ]))
+                yield quote_hash, entry["quote"], entry["author"], name, themes
+
+
+def _connect():
+    """
+    Open the index, rebuilding it if any source file changed since the last
+    build, with the quote history index attached as `used`.
+    """
+    quotes_db.init_db()  # Synced with the history log
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute("ATTACH DATABASE ? AS used", (quotes_db.DB_PATH,))
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS bank USING fts5(
+            quote, author, themes, text_hash UNINDEXED, full_author UNINDEXED,
+            tokenize = 'porter unicode61 remove_diacritics 2'
+        )
+    """)
+    paths = _sources()
+    signature = _signature(paths)
+    stored = conn.execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+    if not stored or stored[0] != signature:
+        conn.execute("DELETE FROM bank")
+        conn.executemany(
+            "INSERT INTO bank (text_hash, quote, full_author, author, themes) VALUES (?, ?, ?, ?, ?)",
+            _read_entries(paths)
+        )
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('signature', ?)", (signature,))
+        conn.commit()
+    return conn
+
+
+def _match_query(text):
+    """FTS5 OR-query of the distinct content words in `text`."""
+    words = []
+    for word in re.findall(r"[a-z]+", (text or "").lower()):
+        if len(word) > 2 and word not in STOPWORDS and word not in words:
+            words.append(word)
+    return " OR ".join(f'"{word}"' for word in words)
+
+
+def select(theme, count=3):
+    """
+    Pick `count` quotes for `theme` (e.g. the day's big idea), best BM25 match
+    first, at most one per author, skipping every quote in the history log.
+
+    Returns:
+        List of dicts: [{'quote', 'author', 'score'}, ...] (shorter than `count`
+        if the bank has too few unused matches).
+    """
+    query = _match_query(theme)
+    if not query:
+        return []
+    picks, authors = [], set()
+    with _lock:
+        conn = _connect()
+        rows = conn.execute(
+            f"""SELECT quote, full_author, author, bm25(bank, {', '.join(map(str, BM25_WEIGHTS))})
+                FROM bank
+                WHERE bank MATCH ? AND text_hash NOT IN (SELECT text_hash FROM used.quotes WHERE text_hash IS NOT NULL)
+                ORDER BY 4""",
+            (query,)
+        )
+        for quote, full_author, author, score in rows:
+            if author.lower() in authors:
+                continue
+            picks.append({"quote": quote, "author": full_author, "score": round(-score, 3)})
+            authors.add(author.lower())
+            if len(picks) == count:
+                break
+        conn.close()
+    return picks
+
+
+def stats():
+    """Return (quotes in the bank, quotes not used yet)."""
+    with _lock:
+        conn = _connect()
+        total, unused = conn.execute(
+            """SELECT COUNT(*), SUM(text_hash NOT IN (SELECT text_hash FROM used.quotes WHERE text_hash IS NOT NULL))
+               FROM bank"""
+        ).fetchone()
+        conn.close()
+    return total, unused or 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search the local prayer quote bank.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    search_parser = subparsers.add_parser("search", help="Rank unused quotes against a theme.")
+    search_parser.add_argument("theme")
+    search_parser.add_argument("--count", type=int, default=3)
+    subparsers.add_parser("stats", help="Count quotes in the bank and those not used yet.")
+    args = parser.parse_args()
+
+    if args.command == "search":
+        for pick in select(args.theme, args.count):
+            print(f"[{pick['score']}] \"{pick['quote']}\" - {pick['author']}")
+    else:
+        total, eligible = stats()
+        print(f"{total} quotes in the bank, {eligible} not used yet")
@@ -1,65 +1,300 @@
 """
 Quote History Database Module
 
-Manages a SQLite database to track previously used prayer quotes,
-ensuring fresh quotes are generated for each devotional email.
+Tracks previously used prayer quotes, ensuring fresh quotes are generated
+for each devotional email.
+
+History is persisted as an append-only, line-oriented log (one JSON object
+per line, one segment file per month under quotes_history/) so the daily
+commit is a small text diff that merges cleanly. quotes.db is a local
+SQLite index rebuilt from the log on load; segments whose size and mtime
+are unchanged are skipped, and segments that only grew are imported from
+their previous end offset.
 """
 
+import hashlib
+import json
+import re
 import sqlite3
 import os
+import threading
+import unicodedata
 from datetime import datetime
 
-# Database file location (same directory as this script)
-DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "quotes.db")
+# File locations (same directory as this script)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(BASE_DIR, "quotes.db")
+LOG_DIR = os.path.join(BASE_DIR, "quotes_history")
 
+# Serializes migrations and log syncs when stages run on worker threads
+_sync_lock = threading.Lock()
 
-def init_db():
-    """Initialize the database and create tables if they don't exist."""
-    conn = sqlite3.connect(DB_PATH)
+
+def _segment_name(date_used):
+    """Monthly segment file name for a YYYY-MM-DD date."""
+    return f"{date_used[:7]}.jsonl"
+
+
+def _log_line(quote_text, author, date_used, reference=None, context=None):
+    entry = {"date": date_used, "author": author, "quote": quote_text}
+    if reference:
+        entry["reference"] = reference
+    if context:
+        entry["context"] = context
+    return json.dumps(entry, ensure_ascii=False) + "\n"
+
+
+def text_hash(quote_text):
+    """
+    Hash of a quote's normalized text (case, accents, punctuation and
+    whitespace folded), so trivially re-punctuated repeats compare equal.
+    """
+    normalized = unicodedata.normalize("NFKD", quote_text or "")
+    normalized = "".join(c for c in normalized if not unicodedata.combining(c)).lower()
+    normalized = " ".join(re.sub(r"[^\w\s]", " ", normalized).split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def _file_sha1(path, length=None):
+    """SHA-1 of the first `length` bytes of a file (whole file if None)."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        digest.update(f.read() if length is None else f.read(length))
+    return digest.hexdigest()
+
+
+def _import_legacy_db(conn):
+    """
+    One-time export of a pre-log quotes.db (quotes table without a segment
+    column) into log segments, oldest first. If the log already exists it is
+    authoritative and the legacy table is simply dropped.
+    """
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(quotes)")]
+    if not columns or "segment" in columns:
+        return 0
+    
+    rows = []
+    if not (os.path.isdir(LOG_DIR) and os.listdir(LOG_DIR)):
+        rows = conn.execute("SELECT quote_text, author, date_used FROM quotes ORDER BY id").fetchall()
+    os.makedirs(LOG_DIR, exist_ok=True)
+    for quote_text, author, date_used in rows:
+        with open(os.path.join(LOG_DIR, _segment_name(date_used)), "a", encoding="utf-8") as f:
+            f.write(_log_line(quote_text, author, date_used))
+    
+    conn.execute("DROP TABLE quotes")
+    conn.commit()
+    print(f"Exported {len(rows)} quotes from legacy database to {LOG_DIR}")
+    return len(rows)
+
+
+def _import_segment(cursor, name, path, offset):
+    """Insert the log lines of one segment starting at byte `offset`."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for raw_line in f:
+            line = raw_line.decode("utf-8").strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            # A later line for the same quote is a reuse: it moves the quote's last use forward
+            cursor.execute(
+                """INSERT INTO quotes
+                   (quote_text, author, date_used, segment, reference, context, text_hash)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (quote_text) DO UPDATE SET
+                       date_used = excluded.date_used, segment = excluded.segment,
+                       reference = excluded.reference, context = excluded.context
+                   WHERE excluded.date_used > quotes.date_used""",
+                (entry["quote"], entry.get("author", "Unknown"), entry["date"], name,
+                 entry.get("reference"), entry.get("context"), text_hash(entry["quote"]))
+            )
+
+
+def sync_index(conn):
+    """
+    Bring the SQLite index up to date with the log segments.
+    
+    Returns:
+        int: Number of segments that had to be (re)imported.
+    """
     cursor = conn.cursor()
+    known = {
+        name: (size, mtime_ns, sha1)
+        for name, size, mtime_ns, sha1 in cursor.execute("SELECT name, size, mtime_ns, sha1 FROM log_segments")
+    }
+    on_disk = sorted(f for f in os.listdir(LOG_DIR) if f.endswith(".jsonl")) if os.path.isdir(LOG_DIR) else []
+    
+    changed = 0
+    for name in on_disk:
+        path = os.path.join(LOG_DIR, name)
+        stat = os.stat(path)
+        previous = known.get(name)
     
-    cursor.execute("""
+        if previous and previous[0] == stat.st_size and previous[1] == stat.st_mtime_ns:
+            continue  # Unchanged segment
+    
+        sha1 = _file_sha1(path)
+        if previous and previous[0] == stat.st_size and previous[2] == sha1:
+            pass  # Touched (e.g. fresh checkout) but identical content
+        elif previous and stat.st_size > previous[0] and _file_sha1(path, previous[0]) == previous[2]:
+            _import_segment(cursor, name, path, previous[0])  # Appended tail only
+            changed += 1
+        else:
+            cursor.execute("DELETE FROM quotes WHERE segment = ?", (name,))
+            _import_segment(cursor, name, path, 0)
+            changed += 1
+    
+        cursor.execute(
+            "INSERT OR REPLACE INTO log_segments (name, size, mtime_ns, sha1) VALUES (?, ?, ?, ?)",
+            (name, stat.st_size, stat.st_mtime_ns, sha1)
+        )
+    
+    for name in set(known) - set(on_disk):
+        cursor.execute("DELETE FROM quotes WHERE segment = ?", (name,))
+        cursor.execute("DELETE FROM log_segments WHERE name = ?", (name,))
+        changed += 1
+    
+    conn.commit()
+    return changed
+
+
+# --- Schema Migrations ---
+# Each entry upgrades the index by one version; PRAGMA user_version records
+# how many have been applied. Append new migrations, never edit old ones.
+def _migration_1_log_index(conn):
+    """Quotes table plus the segment bookkeeping for the log-backed index."""
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS quotes (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             quote_text TEXT UNIQUE NOT NULL,
             author TEXT,
-            date_used TEXT NOT NULL
+            date_used TEXT NOT NULL,
+            segment TEXT NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS log_segments (
+            name TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            sha1 TEXT NOT NULL
         )
     """)
+
+
+def _migration_2_reference_context_hash(conn):
+    """Reference, context and normalized-text hash, with covering indexes."""
+    conn.execute("ALTER TABLE quotes ADD COLUMN reference TEXT")
+    conn.execute("ALTER TABLE quotes ADD COLUMN context TEXT")
+    conn.execute("ALTER TABLE quotes ADD COLUMN text_hash TEXT")
+
+    # One-shot backfill of rows indexed before this migration
+    rows = conn.execute("SELECT id, quote_text FROM quotes").fetchall()
+    conn.executemany(
+        "UPDATE quotes SET text_hash = ? WHERE id = ?",
+        [(text_hash(quote_text), row_id) for row_id, quote_text in rows]
+    )
+
+    # Recency scans (exclusion list) and author lookups read only the index
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_quotes_recent ON quotes (date_used, quote_text, author)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_quotes_author ON quotes (author, date_used, quote_text)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_quotes_text_hash ON quotes (text_hash)")
+
+
+MIGRATIONS = [
+    _migration_1_log_index,
+    _migration_2_reference_context_hash,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def migrate(conn):
+    """
+    Apply any pending migrations in order.
+
+    Returns:
+        int: The schema version after migrating.
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number in range(version + 1, SCHEMA_VERSION + 1):
+        MIGRATIONS[number - 1](conn)
+        conn.execute(f"PRAGMA user_version = {number}")
+        conn.commit()
+        print(f"Migrated quote index to schema version {number}")
+    return max(version, SCHEMA_VERSION)
+
+
+def init_db():
+    """Initialize the index database, apply migrations, and sync it with the log."""
+    with _sync_lock:
+        conn = sqlite3.connect(DB_PATH)
+        _import_legacy_db(conn)
+        migrate(conn)
+        sync_index(conn)
+        conn.close()
+
+
+def get_used_quotes(limit=None):
+    """
+    Retrieve previously used quotes from the database, most recent first.
+    
+    Args:
+        limit: Maximum number of quotes to return (all if None)
+    
+    Returns:
+        List of tuples: [(quote_text, author), ...]
+    """
+    init_db()  # Ensure DB exists
+    
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    
+    cursor.execute(
+        "SELECT quote_text, author FROM quotes ORDER BY date_used DESC LIMIT ?",
+        (-1 if limit is None else limit,)
+    )
+    quotes = cursor.fetchall()
     
-    conn.commit()
     conn.close()
+    return quotes
 
 
-def get_used_quotes():
+def get_quotes_by_author(author, limit=20):
     """
-    Retrieve all previously used quotes from the database.
+    Retrieve quotes previously used for an author, most recent first.
     
     Returns:
-        List of tuples: [(quote_text, author), ...]
+        List of tuples: [(quote_text, date_used), ...]
     """
     init_db()  # Ensure DB exists
     
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
     
-    cursor.execute("SELECT quote_text, author FROM quotes ORDER BY date_used DESC")
+    cursor.execute(
+        "SELECT quote_text, date_used FROM quotes WHERE author = ? ORDER BY date_used DESC LIMIT ?",
+        (author, limit)
+    )
     quotes = cursor.fetchall()
     
     conn.close()
     return quotes
 
 
-def add_quotes(quotes_list):
+def add_quotes(quotes_list, reference=None):
     """
-    Add new quotes to the database.
+    Add new quotes to the history log and the database index.
     
     Args:
-        quotes_list: List of dicts with 'quote' and 'author' keys
-                     e.g., [{'quote': '...', 'author': 'Name'}, ...]
+        quotes_list: List of dicts with 'quote', 'author' and optional 'context' keys
+                     e.g., [{'quote': '...', 'author': 'Name', 'context': '...'}, ...]
+        reference: Scripture reference the quotes were chosen for
     
     Returns:
-        int: Number of quotes successfully added (duplicates are skipped)
+        int: Number of quotes successfully added (duplicates, including
+             normalized-text duplicates, are skipped). A quote last used on an
+             earlier day (e.g. picked again from the quote bank) is logged again
+             as a reuse so it re-enters the exclusion window, but not counted.
     """
     init_db()  # Ensure DB exists
     
@@ -67,23 +302,56 @@ def add_quotes(quotes_list):
     cursor = conn.cursor()
     
     today = datetime.now().isoformat()[:10]  # YYYY-MM-DD
-    added_count = 0
+    segment = _segment_name(today)
+    new_lines = []
+    reused_lines = []
     
     for item in quotes_list:
+        quote_text = item.get('quote', '')
+        author = item.get('author', 'Unknown')
+        context = item.get('context')
+        quote_hash = text_hash(quote_text)
+        existing = cursor.execute(
+            "SELECT quote_text, author, date_used FROM quotes WHERE text_hash = ?", (quote_hash,)
+        ).fetchone()
+        if existing:
+            # Same quote (possibly with different punctuation or casing)
+            if existing[2] < today:
+                cursor.execute(
+                    "UPDATE quotes SET date_used = ?, segment = ?, reference = ?, context = ? WHERE quote_text = ?",
+                    (today, segment, reference, context, existing[0])
+                )
+                reused_lines.append(_log_line(existing[0], existing[1], today, reference, context))
+            continue
         try:
             cursor.execute(
-                "INSERT INTO quotes (quote_text, author, date_used) VALUES (?, ?, ?)",
-                (item.get('quote', ''), item.get('author', 'Unknown'), today)
+                """INSERT INTO quotes
+                   (quote_text, author, date_used, segment, reference, context, text_hash)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (quote_text, author, today, segment, reference, context, quote_hash)
             )
-            added_count += 1
+            new_lines.append(_log_line(quote_text, author, today, reference, context))
         except sqlite3.IntegrityError:
             # Quote already exists (duplicate), skip it
             pass
     
-    conn.commit()
-    conn.close()
+    with _sync_lock:
+        if new_lines or reused_lines:
+            os.makedirs(LOG_DIR, exist_ok=True)
+            path = os.path.join(LOG_DIR, segment)
+            with open(path, "a", encoding="utf-8") as f:
+                f.writelines(new_lines + reused_lines)
+            # Record the new end of the segment so the next load skips it
+            stat = os.stat(path)
+            cursor.execute(
+                "INSERT OR REPLACE INTO log_segments (name, size, mtime_ns, sha1) VALUES (?, ?, ?, ?)",
+                (segment, stat.st_size, stat.st_mtime_ns, _file_sha1(path))
+            )
+        
+        conn.commit()
+        conn.close()
     
-    return added_count
+    return len(new_lines)
 
 
 def get_quote_count():
@@ -110,14 +378,12 @@ def format_exclusion_list(max_quotes=50):
     Returns:
         str: Formatted list of quotes, or empty string if no history
     """
-    quotes = get_used_quotes()
+    # Limit to max_quotes most recent
+    quotes = get_used_quotes(limit=max_quotes)
     
     if not quotes:
         return ""
     
-    # Limit to max_quotes most recent
-    quotes = quotes[:max_quotes]
-    
     lines = []
     for quote_text, author in quotes:
         # Truncate long quotes for the prompt
@@ -132,4 +398,6 @@ if __name__ == "__main__":
     # Quick test
     init_db()
     print(f"Database initialized at: {DB_PATH}")
+    print(f"History log directory: {LOG_DIR}")
+    print(f"Schema version: {SCHEMA_VERSION}")
     print(f"Total quotes in database: {get_quote_count()}")
@@ -0,0 +1,140 @@
+"""
+Rate Limit Module
+
+Client-side token buckets for Gemini calls, per model: one bucket for
+requests per minute and one for tokens per minute. Calls queue (in arrival
+order) until both buckets can cover them, so concurrent stages use the
+quota fully without tripping 429s.
+
+Limits come from the environment, as defaults for every model and/or per
+model:
+    GEMINI_RPM=10 GEMINI_TPM=250000
+    GEMINI_RATE_LIMITS='{"gemini-3-flash-preview": {"rpm": 10, "tpm": 250000}}'
+Models without a configured limit are not throttled.
+"""
+
+import json
+import os
+import threading
+import time
+
+DEFAULT_RPM = float(os.getenv("GEMINI_RPM", "0")) or None
+DEFAULT_TPM = float(os.getenv("GEMINI_TPM", "0")) or None
+MODEL_LIMITS = json.loads(os.getenv("GEMINI_RATE_LIMITS", "{}"))
+
+# Rough prompt-size estimate until the response reports real usage
+CHARS_PER_TOKEN = 4
+EXPECTED_OUTPUT_TOKENS = 2048
+
+
+def estimate_tokens(prompt):
+    """Estimate the tokens a call will consume (prompt plus a typical response)."""
+    return len(prompt) // CHARS_PER_TOKEN + EXPECTED_OUTPUT_TOKENS
+
+
+class TokenBucket:
+    """Holds up to `per_minute` units, refilled continuously; may go into debt after a reconcile."""
+
+    def __init__(self, per_minute, clock=time.monotonic):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount):
+        """Seconds until `amount` units are available (0 if they are now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+    def take(self, amount):
+        self._refill()
+        self.tokens -= amount
+
+    def drain(self, seconds):
+        """Empty the bucket and hold it empty for `seconds` (after a server-side 429)."""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+
+class ModelLimiter:
+    """Request and token buckets for one model, with a FIFO queue in front of them."""
+
+    def __init__(self, rpm=None, tpm=None, clock=time.monotonic, sleep=time.sleep):
+        self.requests = TokenBucket(rpm, clock) if rpm else None
+        self.tokens = TokenBucket(tpm, clock) if tpm else None
+        self.sleep = sleep
+        self._queue = threading.Lock()  # held by the caller at the head of the queue
+        self._state = threading.Lock()
+
+    def acquire(self, tokens, timeout=None):
+        """
+        Block until the call fits under both limits, then reserve it.
+
+        Returns:
+            float: Seconds spent waiting.
+
+        Raises:
+            TimeoutError: (without waiting further or reserving anything) if the
+            call would not fit within `timeout` seconds.
+        """
+        waited = 0.0
+        with self._queue:
+            while True:
+                with self._state:
+                    wait = max(
+                        self.requests.time_until(1) if self.requests else 0.0,
+                        self.tokens.time_until(tokens) if self.tokens else 0.0,
+                    )
+                    if wait <= 0:
+                        if self.requests:
+                            self.requests.take(1)
+                        if self.tokens:
+                            self.tokens.take(tokens)
+                        return waited
+                if timeout is not None and waited + wait > timeout:
+                    raise TimeoutError(f"rate limit queue needs {waited + wait:.0f}s, {timeout:.0f}s allowed")
+                self.sleep(wait)
+                waited += wait
+
+    def reconcile(self, estimated, actual):
+        """Correct the token bucket once the response reports its real usage."""
+        if self.tokens and actual is not None:
+            with self._state:
+                self.tokens.take(actual - estimated)
+
+    def backoff(self, seconds):
+        """Hold every queued call for `seconds` after the server rejected one."""
+        with self._state:
+            if self.requests:
+                self.requests.drain(seconds)
+            if self.tokens:
+                self.tokens.drain(seconds)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(model):
+    """Return the shared limiter for `model` (configured from the environment on first use)."""
+    with _limiters_lock:
+        if model not in _limiters:
+            limits = MODEL_LIMITS.get(model, {})
+            _limiters[model] = ModelLimiter(
+                rpm=limits.get("rpm", DEFAULT_RPM),
+                tpm=limits.get("tpm", DEFAULT_TPM),
+            )
+        return _limiters[model]
+
+
+def is_rate_limited(error):
+    """True if a model call failed because the server-side quota was exceeded."""
+    text = str(error)
+    return "429" in text or "RESOURCE_EXHAUSTED" in text
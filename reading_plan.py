@@ -0,0 +1,141 @@
+"""
+Reading Plan Calendar Module
+
+Keeps a date -> reference calendar for the reading plan in reading_plan.json.
+The daily scrape records each confirmed reference, and upcoming days can be
+imported ahead of time from a CSV export of the plan (date,reference), so
+batch generation knows what is coming. Days the calendar doesn't know are
+forecast from the most recent known day when the plan reads whole chapters
+in sequence (scripture_refs.next_reading); plans that split chapters need
+an import.
+
+Usage:
+    python reading_plan.py import plan.csv
+    python reading_plan.py upcoming --days 7
+"""
+
+import argparse
+import csv
+import json
+import os
+import threading
+from datetime import date, datetime, timedelta
+
+import scripture_refs
+
+# Calendar file location (same directory as this script)
+PLAN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reading_plan.json")
+
+_lock = threading.Lock()
+
+
+def load_calendar(path=None):
+    """Return the calendar (default: PLAN_PATH) as {YYYY-MM-DD: reference}."""
+    path = path or PLAN_PATH
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_calendar(calendar):
+    with open(PLAN_PATH, "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(calendar.items())), f, ensure_ascii=False, indent=1)
+        f.write("\n")
+
+
+def get_reference(day):
+    """Return the reference for a date (date object or YYYY-MM-DD), or None."""
+    return load_calendar().get(str(day))
+
+
+def record(day, reference):
+    """Store the confirmed reference for a date. Returns True if the calendar changed."""
+    with _lock:
+        calendar = load_calendar()
+        if calendar.get(str(day)) == reference:
+            return False
+        calendar[str(day)] = reference
+        _save_calendar(calendar)
+        return True
+
+
+def upcoming(days, start=None):
+    """
+    List the next `days` calendar days starting at `start` (default: tomorrow).
+
+    Returns:
+        List of tuples: [(YYYY-MM-DD, reference or None), ...]
+    """
+    start = start or date.today() + timedelta(days=1)
+    calendar = load_calendar()
+    dates = [str(start + timedelta(days=offset)) for offset in range(days)]
+    return [(day, calendar.get(day)) for day in dates]
+
+
+def forecast(days, start=None):
+    """
+    Like upcoming(), but a day missing from the calendar is predicted by advancing
+    the most recent earlier calendar reference one reading per day.
+
+    Returns:
+        List of tuples: [(YYYY-MM-DD, reference or None, 'calendar' | 'predicted' | None), ...]
+    """
+    start = start or date.today() + timedelta(days=1)
+    calendar = load_calendar()
+    known = sorted(day for day in calendar if day < str(start))
+    last_day, last_ref = (known[-1], calendar[known[-1]]) if known else (None, None)
+    results = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        reference = calendar.get(str(day))
+        if reference:
+            results.append((str(day), reference, "calendar"))
+            last_day, last_ref = str(day), reference
+            continue
+        predicted = last_ref
+        for _ in range((day - date.fromisoformat(last_day)).days if last_ref else 0):
+            predicted = scripture_refs.next_reading(predicted)
+            if not predicted:
+                break
+        results.append((str(day), predicted, "predicted" if predicted else None))
+    return results
+
+
+def import_csv(path):
+    """
+    Merge a `date,reference` CSV into the calendar.
+
+    Returns:
+        int: Number of dates added or changed.
+    """
+    with _lock:
+        calendar = load_calendar()
+        changed = 0
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                if len(row) < 2 or not row[0].strip() or row[0].strip().lower() == "date":
+                    continue
+                day = datetime.strptime(row[0].strip(), "%Y-%m-%d").date().isoformat()
+                reference = row[1].strip()
+                if calendar.get(day) != reference:
+                    calendar[day] = reference
+                    changed += 1
+        _save_calendar(calendar)
+    return changed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the reading plan calendar.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import", help="Merge a date,reference CSV into the calendar.")
+    import_parser.add_argument("csv_path")
+    upcoming_parser = subparsers.add_parser("upcoming", help="Show the references for the coming days.")
+    upcoming_parser.add_argument("--days", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.command == "import":
+        print(f"Imported {import_csv(args.csv_path)} date(s) into {PLAN_PATH}")
+    else:
+        for day, reference, source in forecast(args.days):
+            print(f"{day}  {reference or '(unknown)'}{'  (predicted)' if source == 'predicted' else ''}")
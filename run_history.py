@@ -0,0 +1,336 @@
+"""
+Run History Module
+
+A local SQLite history of every run: one row per run (command, reference,
+outcome, total time, email size, token totals, scripture prefetch hit and
+time saved) and one row per stage (wall
+time, attempts and retries, model, queue wait, input/output tokens from the
+response usage metadata). Runs are recorded from the run record tracing
+produces, so the JSONL metrics log can be imported too.
+
+The report shows per-stage percentiles for recent runs against a baseline
+window and flags regressions: a p95 that grew by REGRESSION_FACTOR or more,
+or an input-token p95 above INPUT_TOKEN_LIMIT (e.g. when the quote exclusion
+list grows the prompt).
+
+Usage:
+    python run_history.py report                      # last 7 runs vs the 28 before
+    python run_history.py report --recent 14 --baseline 56
+    python run_history.py trend generate_v2_content   # weekly p50/p95 for one stage
+    python run_history.py import run_metrics.jsonl    # backfill from the metrics log
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from collections import defaultdict
+
+# History location (same directory as this script, overridable for CI)
+DB_PATH = os.getenv(
+    "RUN_HISTORY_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "run_history.db"),
+)
+
+REGRESSION_FACTOR = 2.0
+INPUT_TOKEN_LIMIT = int(os.getenv("REPORT_INPUT_TOKEN_LIMIT", "30000"))
+# Stages faster than this are too noisy to flag on latency
+MIN_FLAG_MS = 50.0
+
+_lock = threading.Lock()
+
+
+# --- Schema Migrations ---
+# Each entry upgrades the history by one version; PRAGMA user_version records
+# how many have been applied. Append new migrations, never edit old ones.
+def _migration_1_runs_and_stages(conn):
+    """One row per run and one per stage."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS runs (
+            run_id TEXT PRIMARY KEY,
+            started_at TEXT NOT NULL,
+            command TEXT,
+            reference TEXT,
+            outcome TEXT,
+            total_ms REAL,
+            email_bytes INTEGER,
+            input_tokens INTEGER,
+            output_tokens INTEGER
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS stages (
+            run_id TEXT NOT NULL REFERENCES runs(run_id),
+            name TEXT NOT NULL,
+            parent TEXT,
+            outcome TEXT,
+            wall_ms REAL,
+            attempts INTEGER,
+            retries INTEGER,
+            model TEXT,
+            queue_wait_ms REAL,
+            input_tokens INTEGER,
+            output_tokens INTEGER
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_stages_name ON stages(name, run_id)")
+
+
+def _migration_2_prefetch(conn):
+    """Scripture prefetch outcome and time saved per run."""
+    # Histories written before versioning may already have the columns
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(runs)")}
+    for column, kind in (("prefetch", "TEXT"), ("prefetch_saved_ms", "REAL")):
+        if column not in columns:
+            conn.execute(f"ALTER TABLE runs ADD COLUMN {column} {kind}")
+
+
+MIGRATIONS = [
+    _migration_1_runs_and_stages,
+    _migration_2_prefetch,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def migrate(conn):
+    """
+    Apply any pending migrations in order.
+
+    Returns:
+        int: The schema version after migrating.
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number in range(version + 1, SCHEMA_VERSION + 1):
+        MIGRATIONS[number - 1](conn)
+        conn.execute(f"PRAGMA user_version = {number}")
+        conn.commit()
+        print(f"Migrated run history to schema version {number}")
+    return max(version, SCHEMA_VERSION)
+
+
+def _connect():
+    conn = sqlite3.connect(DB_PATH)
+    migrate(conn)
+    return conn
+
+
+def record(run):
+    """
+    Store one run record (as returned by tracing.end_run). Re-recording a run replaces it.
+
+    Returns:
+        int: Number of stage rows stored.
+    """
+    if not run or "run_id" not in run:
+        return 0
+    spans = run.get("spans", [])
+    stage_rows = []
+    for span in spans:
+        attempts = span.get("attempts")
+        retries = span.get("retries", max(0, attempts - 1) if attempts else 0)
+        stage_rows.append((
+            run["run_id"], span["name"], span.get("parent"), span.get("outcome"), span.get("wall_ms"),
+            attempts, retries, span.get("model"), span.get("queue_wait_ms"),
+            span.get("input_tokens"), span.get("output_tokens"),
+        ))
+    # Model calls only count on their innermost span, so summing spans counts each call once
+    input_tokens = sum(span.get("input_tokens") or 0 for span in spans)
+    output_tokens = sum(span.get("output_tokens") or 0 for span in spans)
+    email_bytes = sum(span.get("email_bytes") or 0 for span in spans)
+
+    with _lock:
+        conn = _connect()
+        conn.execute("DELETE FROM stages WHERE run_id = ?", (run["run_id"],))
+        conn.execute(
+            "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (run["run_id"], run.get("started_at"), run.get("command"), run.get("reference"), run.get("outcome"),
+             run.get("total_ms"), email_bytes or None, input_tokens or None, output_tokens or None,
+             run.get("prefetch"), run.get("prefetch_saved_ms"))
+        )
+        conn.executemany("INSERT INTO stages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", stage_rows)
+        conn.commit()
+        conn.close()
+    return len(stage_rows)
+
+
+def import_metrics(path):
+    """Backfill the history from a run_metrics.jsonl log. Returns the number of runs imported."""
+    count = 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record(json.loads(line))
+                count += 1
+    return count
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of `values` (None if empty)."""
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return None
+    position = (len(values) - 1) * pct / 100.0
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def _stage_samples(conn, run_ids):
+    """{stage: {'wall_ms': [...], 'input_tokens': [...], 'retries': [...]}} for the given runs."""
+    samples = defaultdict(lambda: defaultdict(list))
+    if not run_ids:
+        return samples
+    placeholders = ",".join("?" * len(run_ids))
+    rows = conn.execute(
+        f"""SELECT name, SUM(wall_ms), SUM(input_tokens), SUM(retries) FROM stages
+            WHERE run_id IN ({placeholders}) GROUP BY run_id, name""",
+        run_ids
+    ).fetchall()
+    # Stages that run several times per run (per persona, per batch day) are summed per run
+    for name, wall_ms, input_tokens, retries in rows:
+        samples[name]["wall_ms"].append(wall_ms)
+        samples[name]["input_tokens"].append(input_tokens)
+        samples[name]["retries"].append(retries or 0)
+    return samples
+
+
+def report(recent=7, baseline=28, command="run"):
+    """
+    Compare the last `recent` runs of `command` with the `baseline` runs before them.
+
+    Returns:
+        List of dicts per stage: {'stage', 'runs', 'p50_ms', 'p95_ms', 'baseline_p95_ms',
+        'input_tokens_p95', 'baseline_input_tokens_p95', 'retries', 'flags'}, slowest first.
+    """
+    with _lock:
+        conn = _connect()
+        run_ids = [row[0] for row in conn.execute(
+            "SELECT run_id FROM runs WHERE command = ? ORDER BY started_at DESC LIMIT ?",
+            (command, recent + baseline)
+        ).fetchall()]
+        current = _stage_samples(conn, run_ids[:recent])
+        previous = _stage_samples(conn, run_ids[recent:])
+        conn.close()
+
+    rows = []
+    for stage, values in current.items():
+        before = previous.get(stage, {})
+        row = {
+            "stage": stage,
+            "runs": len(values["wall_ms"]),
+            "p50_ms": percentile(values["wall_ms"], 50),
+            "p95_ms": percentile(values["wall_ms"], 95),
+            "baseline_p95_ms": percentile(before.get("wall_ms", []), 95),
+            "input_tokens_p95": percentile(values["input_tokens"], 95),
+            "baseline_input_tokens_p95": percentile(before.get("input_tokens", []), 95),
+            "retries": sum(values["retries"]),
+            "flags": [],
+        }
+        if (row["baseline_p95_ms"] and row["p95_ms"] >= MIN_FLAG_MS
+                and row["p95_ms"] >= REGRESSION_FACTOR * row["baseline_p95_ms"]):
+            row["flags"].append(f"p95 x{row['p95_ms'] / row['baseline_p95_ms']:.1f}")
+        if row["input_tokens_p95"] and row["input_tokens_p95"] > INPUT_TOKEN_LIMIT:
+            row["flags"].append(f"input tokens > {INPUT_TOKEN_LIMIT}")
+        if (row["input_tokens_p95"] and row["baseline_input_tokens_p95"]
+                and row["input_tokens_p95"] >= REGRESSION_FACTOR * row["baseline_input_tokens_p95"]):
+            row["flags"].append(f"input tokens x{row['input_tokens_p95'] / row['baseline_input_tokens_p95']:.1f}")
+        rows.append(row)
+    rows.sort(key=lambda row: row["p95_ms"] or 0, reverse=True)
+    return rows
+
+
+def prefetch_stats(recent=28, command="run"):
+    """
+    Scripture prefetch outcome over the last `recent` runs of `command` that predicted a reference.
+
+    Returns:
+        dict: {'runs', 'hits', 'hit_rate', 'saved_p50_ms', 'saved_total_ms'}, or None if no run prefetched.
+    """
+    with _lock:
+        conn = _connect()
+        rows = conn.execute(
+            """SELECT prefetch, prefetch_saved_ms FROM runs WHERE command = ? AND prefetch IS NOT NULL
+               ORDER BY started_at DESC LIMIT ?""",
+            (command, recent)
+        ).fetchall()
+        conn.close()
+    if not rows:
+        return None
+    saved = [saved_ms for outcome, saved_ms in rows if outcome == "hit"]
+    return {
+        "runs": len(rows),
+        "hits": len(saved),
+        "hit_rate": len(saved) / len(rows),
+        "saved_p50_ms": percentile(saved, 50),
+        "saved_total_ms": sum(saved_ms or 0 for saved_ms in saved),
+    }
+
+
+def trend(stage, weeks=12):
+    """
+    Weekly percentiles for one stage.
+
+    Returns:
+        List of (week 'YYYY-Www', runs, p50_ms, p95_ms, input_tokens_p95), oldest first.
+    """
+    with _lock:
+        conn = _connect()
+        rows = conn.execute(
+            """SELECT strftime('%Y-W%W', r.started_at), SUM(s.wall_ms), SUM(s.input_tokens)
+               FROM stages s JOIN runs r ON r.run_id = s.run_id
+               WHERE s.name = ? GROUP BY s.run_id""",
+            (stage,)
+        ).fetchall()
+        conn.close()
+    by_week = defaultdict(lambda: ([], []))
+    for week, wall_ms, input_tokens in rows:
+        by_week[week][0].append(wall_ms)
+        by_week[week][1].append(input_tokens)
+    return [
+        (week, len(wall), percentile(wall, 50), percentile(wall, 95), percentile(tokens, 95))
+        for week, (wall, tokens) in sorted(by_week.items())[-weeks:]
+    ]
+
+
+def _fmt(value, digits=0):
+    return "-" if value is None else f"{value:,.{digits}f}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report stage latency and token regressions across runs.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    report_parser = subparsers.add_parser("report", help="Per-stage percentiles, recent runs vs a baseline.")
+    report_parser.add_argument("--recent", type=int, default=7)
+    report_parser.add_argument("--baseline", type=int, default=28)
+    report_parser.add_argument("--run-command", default="run", help="Which command's runs to compare.")
+    trend_parser = subparsers.add_parser("trend", help="Weekly percentiles for one stage.")
+    trend_parser.add_argument("stage")
+    trend_parser.add_argument("--weeks", type=int, default=12)
+    import_parser = subparsers.add_parser("import", help="Backfill from a run_metrics.jsonl log.")
+    import_parser.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        print(f"Imported {import_metrics(args.path)} runs into {DB_PATH}")
+    elif args.command == "trend":
+        print(f"{'week':<10} {'runs':>5} {'p50 ms':>10} {'p95 ms':>10} {'in tok p95':>11}")
+        for week, runs, p50, p95, tokens in trend(args.stage, args.weeks):
+            print(f"{week:<10} {runs:>5} {_fmt(p50):>10} {_fmt(p95):>10} {_fmt(tokens):>11}")
+    else:
+        rows = report(args.recent, args.baseline, args.run_command)
+        if not rows:
+            print(f"No '{args.run_command}' runs recorded in {DB_PATH}")
+        print(f"{'stage':<38} {'runs':>4} {'p50 ms':>9} {'p95 ms':>9} {'base p95':>9} "
+              f"{'in tok p95':>10} {'retries':>7}  flags")
+        for row in rows:
+            print(f"{row['stage']:<38} {row['runs']:>4} {_fmt(row['p50_ms']):>9} {_fmt(row['p95_ms']):>9} "
+                  f"{_fmt(row['baseline_p95_ms']):>9} {_fmt(row['input_tokens_p95']):>10} {row['retries']:>7}  "
+                  f"{', '.join(row['flags'])}")
+        flagged = [row for row in rows if row["flags"]]
+        if flagged:
+            print(f"\n{len(flagged)} stage(s) flagged.")
+        prefetch = prefetch_stats(args.recent + args.baseline, args.run_command)
+        if prefetch:
+            print(f"\nScripture prefetch: {prefetch['hits']}/{prefetch['runs']} hits ({prefetch['hit_rate']:.0%}), "
+                  f"saved p50 {_fmt(prefetch['saved_p50_ms'])} ms, total {_fmt(prefetch['saved_total_ms'] / 1000, 1)} s")
@@ -0,0 +1,286 @@
+"""
+Scripture Reference Module
+
+Parses free-text references such as "Gen 43; Matt 12:1-13:23" into
+canonical (book, chapter, verse) ranges and formats them back as a stable
+string ("Genesis 43; Matthew 12:1-13:23"). Book names, abbreviations and
+OSIS codes are accepted; overlapping or adjacent neighbouring ranges in the
+same book are merged (the plan's order is kept), so references that mean the
+same text share one canonical key.
+
+Usage:
+    python scripture_refs.py "gen 43:1-10; Genesis 43; Mt 12:1-13:23"
+"""
+
+import argparse
+import re
+from collections import namedtuple
+
+# (canonical name, OSIS code as used in BibleGateway verse classes, extra aliases)
+BOOKS = [
+    ("Genesis", "Gen", ["gn"]), ("Exodus", "Exod", ["ex"]), ("Leviticus", "Lev", ["lv"]),
+    ("Numbers", "Num", ["nm", "nb"]), ("Deuteronomy", "Deut", ["dt"]), ("Joshua", "Josh", ["jos"]),
+    ("Judges", "Judg", ["jdg", "jgs"]), ("Ruth", "Ruth", ["rth"]), ("1 Samuel", "1Sam", ["1sm"]),
+    ("2 Samuel", "2Sam", ["2sm"]), ("1 Kings", "1Kgs", ["1kgs"]), ("2 Kings", "2Kgs", ["2kgs"]),
+    ("1 Chronicles", "1Chr", []), ("2 Chronicles", "2Chr", []), ("Ezra", "Ezra", []),
+    ("Nehemiah", "Neh", []), ("Esther", "Esth", []), ("Job", "Job", ["jb"]),
+    ("Psalms", "Ps", ["psalm", "pss", "psa"]), ("Proverbs", "Prov", ["prv"]),
+    ("Ecclesiastes", "Eccl", ["qoh"]), ("Song of Songs", "Song", ["song of solomon", "canticles", "sos"]),
+    ("Isaiah", "Isa", []), ("Jeremiah", "Jer", []), ("Lamentations", "Lam", []),
+    ("Ezekiel", "Ezek", ["ezk"]), ("Daniel", "Dan", ["dn"]), ("Hosea", "Hos", []),
+    ("Joel", "Joel", ["jl"]), ("Amos", "Amos", []), ("Obadiah", "Obad", ["ob"]),
+    ("Jonah", "Jonah", ["jnh"]), ("Micah", "Mic", []), ("Nahum", "Nah", []),
+    ("Habakkuk", "Hab", []), ("Zephaniah", "Zeph", []), ("Haggai", "Hag", []),
+    ("Zechariah", "Zech", []), ("Malachi", "Mal", []), ("Matthew", "Matt", ["mt"]),
+    ("Mark", "Mark", ["mk", "mrk"]), ("Luke", "Luke", ["lk"]), ("John", "John", ["jn", "jhn"]),
+    ("Acts", "Acts", []), ("Romans", "Rom", ["rm"]), ("1 Corinthians", "1Cor", []),
+    ("2 Corinthians", "2Cor", []), ("Galatians", "Gal", []), ("Ephesians", "Eph", []),
+    ("Philippians", "Phil", ["php"]), ("Colossians", "Col", []), ("1 Thessalonians", "1Thess", []),
+    ("2 Thessalonians", "2Thess", []), ("1 Timothy", "1Tim", []), ("2 Timothy", "2Tim", []),
+    ("Titus", "Titus", []), ("Philemon", "Phlm", ["phm"]), ("Hebrews", "Heb", []),
+    ("James", "Jas", ["jm"]), ("1 Peter", "1Pet", []), ("2 Peter", "2Pet", []),
+    ("1 John", "1John", ["1jn"]), ("2 John", "2John", ["2jn"]), ("3 John", "3John", ["3jn"]),
+    ("Jude", "Jude", []), ("Revelation", "Rev", ["revelations", "apocalypse"]),
+]
+
+SINGLE_CHAPTER_BOOKS = {"Obad", "Phlm", "2John", "3John", "Jude"}
+
+# Verse number standing for "to the end of the chapter" (chapter lengths are not tracked)
+CHAPTER_END = 999
+
+Passage = namedtuple("Passage", ["book", "start_chapter", "start_verse", "end_chapter", "end_verse"])
+
+_ORDINALS = {"i": "1", "ii": "2", "iii": "3", "first": "1", "second": "2", "third": "3"}
+
+
+def _alias_key(text):
+    """Lowercase, drop dots and spaces, and turn leading ordinals into digits ('I John' -> '1john')."""
+    words = text.lower().replace(".", " ").split()
+    if len(words) > 1 and words[0] in _ORDINALS:
+        words[0] = _ORDINALS[words[0]]
+    return "".join(words)
+
+
+def _build_aliases():
+    aliases = {}
+    for index, (name, code, extras) in enumerate(BOOKS):
+        for alias in [name, code] + extras:
+            aliases[_alias_key(alias)] = index
+    return aliases
+
+
+_ALIASES = _build_aliases()
+_NAME_KEYS = [(_alias_key(name), index) for index, (name, _, _) in enumerate(BOOKS)]
+
+# "<book> <numbers>" or bare "<numbers>" continuing the previous book
+_NUMBERS = r"\d[\d:\s\-–—]*"
+_NUMBERS_ONLY = re.compile(rf"^{_NUMBERS}$")
+_BOOK_AND_NUMBERS = re.compile(rf"^(.*?[a-z.])\s*({_NUMBERS})?$", re.IGNORECASE)
+_RANGE = re.compile(r"^(\d+)(?::(\d+))?(?:-(\d+)(?::(\d+))?)?$")
+
+
+def book_index(text):
+    """
+    Resolve a book name, abbreviation or OSIS code to its index in BOOKS.
+    Unambiguous prefixes of full names are accepted ('Philem' -> Philemon).
+
+    Raises:
+        ValueError: Unknown or ambiguous book.
+    """
+    key = _alias_key(text)
+    if key in _ALIASES:
+        return _ALIASES[key]
+    matches = {index for name_key, index in _NAME_KEYS if len(key) >= 2 and name_key.startswith(key)}
+    if len(matches) == 1:
+        return matches.pop()
+    raise ValueError(f"{'Ambiguous' if matches else 'Unknown'} book '{text}'")
+
+
+def _parse_numbers(book, numbers, chapter_context):
+    """Turn '12:1-13:23', '43', '3:16' (or '16' within chapter_context) into a Passage."""
+    match = _RANGE.match(numbers.replace("–", "-").replace("—", "-").replace(" ", ""))
+    if not match:
+        raise ValueError(f"Cannot parse '{numbers}'")
+    a, a_verse, b, b_verse = (int(x) if x else None for x in match.groups())
+
+    if BOOKS[book][1] in SINGLE_CHAPTER_BOOKS and a_verse is None and b_verse is None:
+        if a == 1 and b is None:
+            # bare "Jude 1" is the whole book, as "Genesis 43" is the whole chapter
+            return Passage(book, 1, 1, 1, CHAPTER_END)
+        # "Jude 3-5" means verses
+        return Passage(book, 1, a, 1, b or a)
+    if chapter_context is not None and a_verse is None and b_verse is None:
+        # "..., 18-20" after "John 3:16" continues chapter 3
+        return Passage(book, chapter_context, a, chapter_context, b or a)
+    if a_verse is None:
+        # Whole chapters: "43", "43-44", or "43-44:5"
+        return Passage(book, a, 1, b or a, b_verse or CHAPTER_END)
+    if b is None:
+        return Passage(book, a, a_verse, a, a_verse)
+    if b_verse is None:
+        # "43:5-10" is verses 5-10 of chapter 43
+        return Passage(book, a, a_verse, a, b)
+    return Passage(book, a, a_verse, b, b_verse)
+
+
+def parse(text):
+    """
+    Parse a reference string into Passages in the order given.
+    Segments are separated by ';'; a segment without a book continues the
+    previous one, and after a verse ',' continues the same chapter
+    ("John 3:16, 18-20").
+
+    Raises:
+        ValueError: The text is not a reference.
+    """
+    passages = []
+    book = None
+    for segment in re.split(r"[;\n]", text):
+        chapter_context = None
+        for part in segment.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            if _NUMBERS_ONLY.match(part):
+                numbers = part
+            else:
+                match = _BOOK_AND_NUMBERS.match(part)
+                if not match or not match.group(2):
+                    raise ValueError(f"Cannot parse '{part}'")
+                book, numbers = book_index(match.group(1)), match.group(2)
+                chapter_context = None
+            if book is None:
+                raise ValueError(f"No book in '{part}'")
+            passage = _parse_numbers(book, numbers, chapter_context)
+            has_verses = ":" in numbers or chapter_context is not None or BOOKS[book][1] in SINGLE_CHAPTER_BOOKS
+            chapter_context = passage.end_chapter if has_verses else None
+            passages.append(passage)
+    if not passages:
+        raise ValueError(f"No reference in '{text}'")
+    return passages
+
+
+def _after(chapter, verse):
+    """The position right after (chapter, verse)."""
+    return (chapter + 1, 1) if verse == CHAPTER_END else (chapter, verse + 1)
+
+
+def _joined(first, second):
+    """The single passage covering two overlapping or adjacent ranges in one book, or None."""
+    if first.book != second.book:
+        return None
+    start = min((first.start_chapter, first.start_verse), (second.start_chapter, second.start_verse))
+    end = max((first.end_chapter, first.end_verse), (second.end_chapter, second.end_verse))
+    touching = ((second.start_chapter, second.start_verse) <= _after(first.end_chapter, first.end_verse)
+                and (first.start_chapter, first.start_verse) <= _after(second.end_chapter, second.end_verse))
+    # Keep the merged range expressible as a string ("Genesis 43:5-44" is not)
+    if not touching or (start[1] != 1 and end[1] == CHAPTER_END):
+        return None
+    return Passage(first.book, start[0], start[1], end[0], end[1])
+
+
+def merge(passages):
+    """
+    Merge each passage into the one before it when they overlap or are adjacent
+    in the same book. Passages keep the plan's order ("Psalm 1; Genesis 2" is
+    not re-sorted into book order).
+    """
+    merged = []
+    for passage in passages:
+        while merged:
+            joined = _joined(merged[-1], passage)
+            if joined is None:
+                break
+            passage = joined
+            merged.pop()
+        merged.append(passage)
+    return merged
+
+
+def format_passage(passage):
+    """Format one Passage: 'Genesis 43', 'Genesis 43-44', 'John 3:16', 'Matthew 12:1-13:23'."""
+    name = BOOKS[passage.book][0]
+    c1, v1, c2, v2 = passage.start_chapter, passage.start_verse, passage.end_chapter, passage.end_verse
+    if BOOKS[passage.book][1] in SINGLE_CHAPTER_BOOKS and c1 == c2 == 1 and v2 != CHAPTER_END:
+        if v1 == v2 == 1:
+            return f"{name} 1:1"  # bare "Jude 1" would read back as the whole book
+        return f"{name} {v1}" if v1 == v2 else f"{name} {v1}-{v2}"
+    if v1 == 1 and v2 == CHAPTER_END:
+        return f"{name} {c1}" if c1 == c2 else f"{name} {c1}-{c2}"
+    if c1 == c2:
+        return f"{name} {c1}:{v1}" if v1 == v2 else f"{name} {c1}:{v1}-{v2}"
+    if v2 == CHAPTER_END:
+        return f"{name} {c1}:{v1}-{c2}"
+    return f"{name} {c1}:{v1}-{c2}:{v2}"
+
+
+def canonical_parts(text):
+    """Canonical display strings, one per merged passage (the passages BibleGateway returns for canonical())."""
+    return [format_passage(passage) for passage in merge(parse(text))]
+
+
+def canonical(text):
+    """Stable canonical string for a reference, e.g. 'mt 12:1-50; Matthew 13:1-23' -> 'Matthew 12:1-13:23'."""
+    return "; ".join(canonical_parts(text))
+
+
+def cache_key(text):
+    """canonical(text), or the whitespace-normalized text when it cannot be parsed."""
+    try:
+        return canonical(text)
+    except ValueError:
+        return " ".join(text.split())
+
+
+def next_reading(text):
+    """
+    Guess the reading after `text` in a sequential plan: each whole-chapter
+    passage moves on by its own length ('Genesis 43; Psalm 5' -> 'Genesis 44; Psalms 6',
+    'Genesis 43-44' -> 'Genesis 45-46'). Chapter counts are not tracked, so the
+    guess can run past the end of a book.
+
+    Returns:
+        str: The guessed reference, or None if a passage covers part of a chapter
+        (where the next day's split can't be predicted) or `text` cannot be parsed.
+    """
+    try:
+        passages = merge(parse(text))
+    except ValueError:
+        return None
+    following = []
+    for passage in passages:
+        if passage.start_verse != 1 or passage.end_verse != CHAPTER_END or BOOKS[passage.book][1] in SINGLE_CHAPTER_BOOKS:
+            return None
+        length = passage.end_chapter - passage.start_chapter + 1
+        following.append(passage._replace(start_chapter=passage.end_chapter + 1,
+                                          end_chapter=passage.end_chapter + length))
+    return "; ".join(format_passage(passage) for passage in following)
+
+
+def label_from_verse_ids(verse_ids):
+    """
+    Label a passage from BibleGateway verse ids ('Gen-43-1', ..., 'Gen-43-34').
+    Returns None if no id can be read.
+    """
+    verses = []
+    for verse_id in verse_ids:
+        match = re.match(r"^(\w+?)-(\d+)-(\d+)$", verse_id)
+        if match:
+            try:
+                verses.append((book_index(match.group(1)), int(match.group(2)), int(match.group(3))))
+            except ValueError:
+                continue
+    if not verses:
+        return None
+    (book, c1, v1), (_, c2, v2) = min(verses), max(v for v in verses if v[0] == min(verses)[0])
+    return format_passage(Passage(book, c1, v1, c2, v2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normalize a scripture reference.")
+    parser.add_argument("reference")
+    args = parser.parse_args()
+
+    for passage in merge(parse(args.reference)):
+        print(f"{format_passage(passage):<30} {passage}")
+    print(f"\nCanonical: {canonical(args.reference)}")
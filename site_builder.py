@@ -0,0 +1,235 @@
+"""
+Static Site Builder Module
+
+Turns the archive (archive/YYYY-MM-DD.json) into a static HTML site: one
+page per day in the email layout, an index and an Atom feed.
+
+Builds are incremental. site/manifest.json records each day's content hash
+(plus the file size and mtime, so unchanged files are not even re-read) and
+the fields the index and feed need, so adding one day renders one page and
+rewrites the index and feed in a single pass from the manifest.
+
+Usage:
+    python site_builder.py build --base-url https://example.com/devotional/
+    python site_builder.py build --force          # re-render every page
+    python site_builder.py benchmark --days 365
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from datetime import date as dt_date, timedelta
+
+import devotional_archive
+
+# Output location (same directory as this script)
+SITE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "site")
+FEED_ENTRIES = 30
+# Bump when the page layout changes, to re-render every page once
+LAYOUT_VERSION = 1
+
+_DAY_FILE = re.compile(r"^(\d{4}-\d{2}-\d{2})\.json$")
+
+
+def _manifest_path(site_dir):
+    return os.path.join(site_dir, "manifest.json")
+
+
+def _load_manifest(site_dir):
+    try:
+        with open(_manifest_path(site_dir), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"layout": LAYOUT_VERSION, "days": {}}
+    if manifest.get("layout") != LAYOUT_VERSION:
+        return {"layout": LAYOUT_VERSION, "days": {}}
+    return manifest
+
+
+def _write_if_changed(path, text):
+    """Write `text` to `path` unless it already holds exactly that. Returns True if written."""
+    data = text.encode("utf-8")
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    with open(path, "wb") as f:
+        f.write(data)
+    return True
+
+
+def _day_page(record, render):
+    """Day page: the email layout with a link back to the index."""
+    page = render(record)
+    nav = '<p style="text-align:center;font-family:sans-serif;"><a href="index.html">&larr; All devotionals</a></p>'
+    return re.sub(r"(<body[^>]*>)", lambda m: m.group(1) + nav, page, count=1)
+
+
+def _index_page(days):
+    items = "".join(
+        f'<li><a href="{day}.html">{day}</a> &middot; {html.escape(meta["reference"] or "")}'
+        f'<br><strong>{html.escape(meta["subject"] or "")}</strong> &mdash; {html.escape(meta["big_idea"] or "")}</li>'
+        for day, meta in days
+    )
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Daily Devotionals</title>
+<link rel="alternate" type="application/atom+xml" href="feed.xml">
+<style>body{{font-family:Georgia,serif;max-width:680px;margin:2em auto;color:#2c3e50}}li{{margin:0 0 1em}}</style>
+</head><body><h1>Daily Devotionals</h1><p><a href="feed.xml">Atom feed</a></p><ul>{items}</ul></body></html>
+"""
+
+
+def _atom_feed(days, base_url):
+    updated = f"{days[0][0]}T00:00:00Z" if days else "1970-01-01T00:00:00Z"
+    entries = "".join(
+        f"""  <entry>
+    <title>{html.escape(meta["subject"] or day)}</title>
+    <link href="{html.escape(base_url)}{day}.html"/>
+    <id>{html.escape(base_url)}{day}.html#{meta["hash"][:12]}</id>
+    <updated>{day}T00:00:00Z</updated>
+    <summary>{html.escape(f'{meta["reference"]}: {meta["big_idea"]}')}</summary>
+  </entry>
+"""
+        for day, meta in days[:FEED_ENTRIES]
+    )
+    return f"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Daily Devotionals</title>
+  <link href="{html.escape(base_url)}"/>
+  <link rel="self" href="{html.escape(base_url)}feed.xml"/>
+  <id>{html.escape(base_url)}</id>
+  <updated>{updated}</updated>
+{entries}</feed>
+"""
+
+
+def build(render, site_dir=None, archive_dir=None, base_url="", force=False):
+    """
+    Bring the site up to date with the archive.
+
+    Args:
+        render: Callable(record) -> page HTML (the email layout)
+        force: Re-render every page
+
+    Returns:
+        dict: {'rendered', 'removed', 'unchanged', 'ms'}
+    """
+    start = time.perf_counter()
+    site_dir = site_dir or SITE_DIR
+    archive_dir = archive_dir or devotional_archive.ARCHIVE_DIR
+    os.makedirs(site_dir, exist_ok=True)
+    manifest = {"layout": LAYOUT_VERSION, "days": {}} if force else _load_manifest(site_dir)
+    known = manifest["days"]
+    on_disk = sorted(
+        match.group(1) for match in map(_DAY_FILE.match, os.listdir(archive_dir) if os.path.isdir(archive_dir) else [])
+        if match
+    )
+
+    stats = {"rendered": 0, "removed": 0, "unchanged": 0}
+    for day in on_disk:
+        path = os.path.join(archive_dir, f"{day}.json")
+        stat = os.stat(path)
+        previous = known.get(day)
+        page_path = os.path.join(site_dir, f"{day}.html")
+        if previous and previous["size"] == stat.st_size and previous["mtime_ns"] == stat.st_mtime_ns \
+                and os.path.exists(page_path):
+            stats["unchanged"] += 1
+            continue
+
+        with open(path, "rb") as f:
+            data = f.read()
+        content_hash = hashlib.sha1(data).hexdigest()
+        if previous and previous["hash"] == content_hash and os.path.exists(page_path):
+            stats["unchanged"] += 1  # Touched (e.g. fresh checkout) but identical content
+        else:
+            record = json.loads(data)
+            _write_if_changed(page_path, _day_page(record, render))
+            header = (record.get("v2_content") or {}).get("header", {})
+            previous = {
+                "hash": content_hash,
+                "reference": record.get("reference"),
+                "subject": header.get("subject"),
+                "big_idea": header.get("big_idea"),
+            }
+            stats["rendered"] += 1
+        known[day] = {**previous, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    for day in set(known) - set(on_disk):
+        page_path = os.path.join(site_dir, f"{day}.html")
+        if os.path.exists(page_path):
+            os.remove(page_path)
+        del known[day]
+        stats["removed"] += 1
+
+    # Index and feed in one pass over the manifest (newest first)
+    days = sorted(known.items(), reverse=True)
+    _write_if_changed(os.path.join(site_dir, "index.html"), _index_page(days))
+    _write_if_changed(os.path.join(site_dir, "feed.xml"), _atom_feed(days, base_url))
+    with open(_manifest_path(site_dir), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+    stats["ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return stats
+
+
+def default_render(record):
+    """Render with the email layout (imported lazily: devotional_bot pulls in selenium and genai)."""
+    import devotional_bot
+    return devotional_bot.render_archived(record)
+
+
+def benchmark(days=365):
+    """Full build of `days` canned archive days, then an incremental build after adding one more."""
+    import devotional_bot
+    import offline_stubs
+    offline_stubs.install(devotional_bot)  # The canned days' scripture resolves through the stubs
+    work_dir = tempfile.mkdtemp(prefix="site_benchmark_")
+    archive_dir = os.path.join(work_dir, "archive")
+    site_dir = os.path.join(work_dir, "site")
+    os.makedirs(archive_dir)
+    first = dt_date(2025, 1, 1)
+
+    def add_day(i):
+        day = (first + timedelta(days=i)).isoformat()
+        with open(os.path.join(archive_dir, f"{day}.json"), "w", encoding="utf-8") as f:
+            json.dump(offline_stubs.sample_record(day), f)
+
+    try:
+        for i in range(days):
+            add_day(i)
+        full = build(default_render, site_dir, archive_dir)
+        print(f"Full build:        {full['rendered']} pages in {full['ms']:,.0f} ms")
+        add_day(days)
+        incremental = build(default_render, site_dir, archive_dir)
+        print(f"After adding 1 day: {incremental['rendered']} page rendered, "
+              f"{incremental['unchanged']} unchanged, in {incremental['ms']:,.0f} ms")
+        noop = build(default_render, site_dir, archive_dir)
+        print(f"No-op rebuild:      {noop['ms']:,.0f} ms")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a static HTML archive of past devotionals.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Incrementally build site/ from archive/.")
+    build_parser.add_argument("--base-url", default="", help="Absolute URL the site is published at (for the feed).")
+    build_parser.add_argument("--force", action="store_true", help="Re-render every page.")
+    bench_parser = subparsers.add_parser("benchmark", help="Time a full and an incremental build.")
+    bench_parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    if args.command == "benchmark":
+        benchmark(args.days)
+    else:
+        result = build(default_render, base_url=args.base_url, force=args.force)
+        print(f"Site built in {SITE_DIR}: {result['rendered']} rendered, {result['unchanged']} unchanged, "
+              f"{result['removed']} removed ({result['ms']:,.0f} ms)")
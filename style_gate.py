@@ -0,0 +1,220 @@
+"""
+Style Gate Module
+
+Fast local checks on generated content before it is sent: blacklisted
+"AI slop" phrases (the SYSTEM_IDENTITY blacklist), missing required JSON
+keys and oversized sections. All sections are scanned in one pass of a
+single compiled pattern, and each issue names the section path to fix
+(e.g. "v2_content.anchor.insight"), so only that section is regenerated.
+
+Usage:
+    python style_gate.py benchmark --rounds 200
+"""
+
+import argparse
+import bisect
+import json
+import re
+import time
+
+# Mirrors the blacklist in SYSTEM_IDENTITY (section 6)
+BLACKLIST = [
+    "tapestry", "beacon", "vital role", "pivotal", "journey",
+    "furthermore", "in conclusion", "navigate", "leverage",
+]
+
+
+def _inflections(phrase):
+    """The phrase plus the plural and verb forms of its last word (navigate -> navigates, navigated, navigating)."""
+    head, _, word = phrase.rpartition(" ")
+    forms = {word, word + "s", word + "es", word + "ed", word + "ing"}
+    if word.endswith("e"):
+        forms |= {word + "d", word[:-1] + "ing"}
+    if word.endswith("y") and word[-2:-1] not in "aeiou":
+        forms |= {word[:-1] + "ies", word[:-1] + "ied"}
+    return [f"{head} {form}" if head else form for form in forms]
+
+
+# Word-boundary alternation of every listed inflection, longest first (no open-ended
+# suffixes, so "journeyman" and "Beaconsfield" don't match)
+BLACKLIST_PATTERN = re.compile(
+    r"\b(?:" + "|".join(
+        re.escape(form)
+        for form in sorted({form for phrase in BLACKLIST for form in _inflections(phrase)}, key=lambda f: (-len(f), f))
+    ) + r")\b",
+    re.IGNORECASE,
+)
+
+REQUIRED_KEYS = {
+    "v2_content": [
+        "header.subject", "header.big_idea", "header.mode",
+        "anchor.key_verses", "anchor.insight",
+        "integration.soma", "integration.soul", "integration.spirit",
+    ],
+    "case_study": ["subject", "narrative", "connection", "takeaway"],
+    "core_devotional": ["title", "content"],
+}
+
+# Character limits per section path
+MAX_CHARS = {
+    "v2_content.header.subject": 120,
+    "v2_content.header.big_idea": 300,
+    "v2_content.anchor.insight": 4000,
+    "case_study.narrative": 8000,
+    "core_devotional.content": 15000,
+}
+
+# Quote text is an author's own words; only our context line is style-checked
+_UNCHECKED = re.compile(r"^quotes\.\d+\.(quote|author)$")
+
+_SEPARATOR = "\n\x00\n"
+
+
+def get_section(content, section):
+    """Return the value at a dotted section path (list items by index), or None."""
+    node = content
+    for key in section.split("."):
+        if isinstance(node, list):
+            node = node[int(key)] if key.isdigit() and int(key) < len(node) else None
+        elif isinstance(node, dict):
+            node = node.get(key)
+        else:
+            return None
+    return node
+
+
+def _flatten(value, path, out):
+    """Collect (path, text) for every string leaf under `value`."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            _flatten(item, f"{path}.{key}", out)
+    elif isinstance(value, list):
+        for i, item in enumerate(value):
+            _flatten(item, f"{path}.{i}", out)
+    elif isinstance(value, str):
+        out.append((path, value))
+    return out
+
+
+def sections_of(content):
+    """Flatten {'v2_content': ..., 'case_study': ..., ...} into [(section path, text), ...]."""
+    out = []
+    for name, value in content.items():
+        if value:
+            _flatten(value, name, out)
+    return [(path, text) for path, text in out if not _UNCHECKED.match(path)]
+
+
+def scan(content):
+    """
+    Check generated content in one pass.
+
+    Args:
+        content: {'v2_content': dict, 'case_study': dict, 'core_devotional': dict, 'quotes': list}
+
+    Returns:
+        List of dicts: [{'section', 'kind' ('blacklist'|'missing'|'oversized'), 'detail'}, ...]
+    """
+    issues = []
+    for name, paths in REQUIRED_KEYS.items():
+        if content.get(name) is None:
+            continue  # Stage failed entirely; nothing to patch
+        for path in paths:
+            if not get_section(content[name], path):
+                issues.append({"section": f"{name}.{path}", "kind": "missing", "detail": path})
+
+    sections = sections_of(content)
+    starts, pos = [], 0
+    for _, text in sections:
+        starts.append(pos)
+        pos += len(text) + len(_SEPARATOR)
+    corpus = _SEPARATOR.join(text for _, text in sections)
+
+    flagged = {}
+    for match in BLACKLIST_PATTERN.finditer(corpus):
+        section = sections[bisect.bisect_right(starts, match.start()) - 1][0]
+        flagged.setdefault(section, []).append(match.group(0).lower())
+    for section, words in flagged.items():
+        issues.append({"section": section, "kind": "blacklist", "detail": ", ".join(sorted(set(words)))})
+
+    for path, limit in MAX_CHARS.items():
+        text = get_section(content, path)
+        if isinstance(text, str) and len(text) > limit:
+            issues.append({"section": path, "kind": "oversized", "detail": f"{len(text)} > {limit} chars"})
+    return issues
+
+
+def repair_target(section):
+    """
+    The section regenerated for an issue: a V2 module field (e.g. v2_content.anchor.key_verses,
+    v2_content.integration.soma), a case study / core devotional field, or one quote's context
+    (never the quote text or byline, see _UNCHECKED).
+    """
+    parts = section.split(".")
+    return ".".join(parts[:3] if parts[0] in ("v2_content", "quotes") else parts[:2])
+
+
+def corrective_prompt(section, current, issues, reference, big_idea=""):
+    """Short prompt that fixes one section in place (instead of re-running its stage)."""
+    problems = "\n".join(f"- {issue['kind']}: {issue['detail']}" for issue in issues)
+    shape = json.dumps(current, ensure_ascii=False, indent=1) if current is not None else "(missing)"
+    return f"""
+    STYLE CORRECTION for one section of a devotional on {reference}.
+    Theme: {big_idea}
+    Section: {section}
+    Problems:
+    {problems}
+
+    Rewrite only this section. Keep its meaning, voice and JSON shape. Do not use any of
+    these words or phrases: {", ".join(BLACKLIST)}. Use active voice and concrete nouns.
+
+    CURRENT VALUE:
+    ```json
+    {shape}
+    ```
+
+    Return ONLY a JSON object: {{"value": <the corrected section>}}
+    """
+
+
+def set_section(content, section, value):
+    """Replace the value at a section path in `content` (creating dict keys as needed)."""
+    keys = section.split(".")
+    node = content
+    for key in keys[:-1]:
+        node = node[int(key)] if isinstance(node, list) else node.setdefault(key, {})
+    if isinstance(node, list):
+        node[int(keys[-1])] = value
+    else:
+        node[keys[-1]] = value
+
+
+def benchmark(rounds):
+    """Scan the offline sample content (with planted violations) `rounds` times."""
+    import offline_stubs
+    content = {
+        "v2_content": json.loads(json.dumps(offline_stubs.V2_CONTENT)),
+        "case_study": dict(offline_stubs.CASE_STUDY),
+        "core_devotional": dict(offline_stubs.CORE_DEVOTIONAL),
+        "quotes": [dict(q) for q in offline_stubs.PRAYER_QUOTES],
+    }
+    content["core_devotional"]["content"] += " Their journey was pivotal."
+    chars = sum(len(text) for _, text in sections_of(content))
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        issues = scan(content)
+    elapsed = time.perf_counter() - start
+    print(f"{len(sections_of(content))} sections, {chars} chars, {len(issues)} issue(s) per scan")
+    print(f"{rounds} scans in {elapsed * 1000:.1f} ms: {elapsed / rounds * 1e6:.0f} us/scan, "
+          f"{chars * rounds / elapsed / 1e6:.1f} M chars/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Style gate for generated devotional content.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    bench_parser = subparsers.add_parser("benchmark", help="Measure scanner throughput.")
+    bench_parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    benchmark(args.rounds)
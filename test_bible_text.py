@@ -0,0 +1,27 @@
+import http_client
+import offline_stubs
+
+
+def test_extract_passages_splits_a_multi_version_page(offline_bot):
+    page = offline_stubs.biblegateway_page(["ESV", "NIV"])
+    by_version = offline_bot._extract_passages(page, ["ESV", "NIV"])
+    assert set(by_version) == {"ESV", "NIV"}
+    assert len(by_version["ESV"]) == len(by_version["NIV"]) == 2
+    assert all("versenum" not in passage and "footnote" not in passage
+               for passages in by_version.values() for passage in passages)
+    # Versions nobody asked for are dropped
+    assert set(offline_bot._extract_passages(page, ["NIV"])) == {"NIV"}
+
+
+def test_get_bible_text_fetches_versions_together_and_caches_each(offline_bot):
+    reference = offline_stubs.REFERENCE
+    texts = offline_bot.get_bible_text(reference, versions=["ESV", "NIV"])
+    assert set(texts) == {"ESV", "NIV"} and all(texts.values())
+    assert http_client._session.requests == 1
+    for version in ("ESV", "NIV"):
+        assert offline_bot._load_cached_passages(reference, version) == texts[version]
+
+    # Each version is served from its own cache entry, without a request
+    assert offline_bot.get_bible_text(reference, versions=["NIV"]) == {"NIV": texts["NIV"]}
+    assert offline_bot.get_bible_text(reference) == texts["ESV"]
+    assert http_client._session.requests == 1
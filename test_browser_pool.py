@@ -0,0 +1,72 @@
+import pytest
+from selenium.common.exceptions import InvalidSessionIdException, TimeoutException
+
+import browser_pool
+
+
+class FakeDriver:
+    def __init__(self, dead=False):
+        self.dead = dead
+        self.quit_called = False
+        self.loaded = []
+
+    @property
+    def current_url(self):
+        if self.dead:
+            raise InvalidSessionIdException("session deleted")
+        return self.loaded[-1] if self.loaded else "about:blank"
+
+    def get(self, url):
+        if self.dead:
+            raise InvalidSessionIdException("session deleted")
+        self.loaded.append(url)
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    started = []
+
+    def start_browser(block_assets=True):
+        started.append(FakeDriver())
+        return started[-1]
+
+    monkeypatch.setattr(browser_pool, "start_browser", start_browser)
+    monkeypatch.setattr(browser_pool, "_idle", [])
+    monkeypatch.setattr(browser_pool, "_open_count", 0)
+    monkeypatch.setattr(browser_pool, "POOL_SIZE", 1)
+    return started
+
+
+def load(driver):
+    driver.get("https://example.com/")
+    return driver.current_url
+
+
+def test_dead_pooled_browser_is_discarded_and_retried_once(pool):
+    assert browser_pool.run(load) == "https://example.com/"
+    pool[0].dead = True  # Chrome crashed while idle between runs
+
+    assert browser_pool.run(load) == "https://example.com/"
+    assert len(pool) == 2 and pool[0].quit_called
+    assert browser_pool._idle == [pool[1]] and browser_pool._open_count == 1
+
+
+def test_page_errors_on_a_live_browser_are_not_retried(pool):
+    def timeout(driver):
+        driver.get("https://example.com/")
+        raise TimeoutException("no passages")
+
+    with pytest.raises(TimeoutException):
+        browser_pool.run(timeout)
+    assert len(pool) == 1 and pool[0].quit_called
+    assert browser_pool._idle == [] and browser_pool._open_count == 0
+
+
+def test_unblocked_options_are_still_headless():
+    arguments = browser_pool._chrome_options(block_assets=False).arguments
+    assert "--headless" in arguments and "--no-sandbox" in arguments
+    assert not any(arg.startswith("--blink-settings") for arg in arguments)
+    assert "prefs" in browser_pool._chrome_options().experimental_options
@@ -0,0 +1,37 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from daemon import Daemon, Job, next_fire, parse_cron
+
+
+def at(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_next_fire_daily_and_weekly():
+    assert next_fire(parse_cron("30 9 * * *"), at(2026, 10, 19, 9, 30)) == at(2026, 10, 20, 9, 30)
+    assert next_fire(parse_cron("30 9 * * *"), at(2026, 10, 19, 8, 0)) == at(2026, 10, 19, 9, 30)
+    # 2026-10-19 is a Monday; 0 and 7 are both Sunday
+    assert next_fire(parse_cron("0 11 * * 0"), at(2026, 10, 19)) == at(2026, 10, 25, 11, 0)
+    assert next_fire(parse_cron("0 11 * * 7"), at(2026, 10, 19)) == at(2026, 10, 25, 11, 0)
+
+
+def test_lists_ranges_and_steps():
+    schedule = parse_cron("*/15 6-8 * * 1-5")
+    assert next_fire(schedule, at(2026, 10, 19, 8, 50)) == at(2026, 10, 20, 6, 0)
+    assert next_fire(schedule, at(2026, 10, 24, 6, 0)) == at(2026, 10, 26, 6, 0)  # skips the weekend
+    with pytest.raises(ValueError):
+        parse_cron("61 * * * *")
+    with pytest.raises(ValueError):
+        parse_cron("* * *")
+
+
+def test_run_job_records_outcome():
+    ok = Job("run", "* * * * *", lambda: {"outcome": "sent"})
+    broken = Job("batch", "* * * * *", lambda: 1 / 0)
+    daemon = Daemon([ok, broken])
+    daemon.run_job(ok)
+    daemon.run_job(broken)
+    assert ok.last_outcome == "sent" and ok.runs == 1
+    assert broken.last_outcome.startswith("error") and daemon.running is None
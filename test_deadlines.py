@@ -0,0 +1,63 @@
+import pytest
+
+import deadlines
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def test_timeouts_and_backoffs_shrink_to_the_time_left():
+    clock = FakeClock()
+    deadline = deadlines.Deadline(300, clock=clock, sleep=clock.sleep)
+    generation = deadline.reserve(90)
+
+    assert generation.timeout(120) == 120
+    clock.now += 150  # 60 s left for generation
+    assert generation.timeout(120) == 60
+    assert generation.backoff(60)
+    assert clock.slept == [20]  # (60 - MIN_ATTEMPT_SECONDS) / 2
+
+    clock.now += 25  # 15 s left: not worth another attempt
+    assert not generation.backoff(60)
+    assert clock.slept == [20]
+    assert generation.timeout(120) == 15
+    assert deadline.remaining() == pytest.approx(105)
+
+    clock.now += 15
+    assert generation.timeout(120) == deadlines.MIN_TIMEOUT_SECONDS
+    with pytest.raises(deadlines.DeadlineExceeded):
+        generation.check("quotes")
+    deadline.check("send")
+
+
+def test_open_ended_deadline_never_expires():
+    clock = FakeClock()
+    deadline = deadlines.Deadline(None, clock=clock, sleep=clock.sleep)
+    assert deadline.reserve(90) is deadline
+    assert deadline.timeout(30) == 30
+    assert deadline.backoff(60) and clock.slept == [60]
+    assert not deadline.expired()
+
+
+def test_rate_limit_queue_longer_than_the_deadline_raises_deadline_exceeded(offline_bot, monkeypatch):
+    import rate_limit
+    clock = FakeClock()
+    limiter = rate_limit.ModelLimiter(rpm=1, clock=clock, sleep=clock.sleep)
+    limiter.acquire(10)  # The next call waits a full minute
+    monkeypatch.setattr(rate_limit, "limiter_for", lambda model: limiter)
+
+    deadline = deadlines.Deadline(30)
+    config = offline_bot.types.GenerateContentConfig()
+    with pytest.raises(deadlines.DeadlineExceeded):
+        offline_bot._generate(offline_bot._get_client("offline"), offline_bot.MODEL_NAME, "prompt", config, deadline)
+    assert clock.slept == []
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta, timezone
+
+import delivery
+
+
+def test_queue_orders_recipients_across_timezones():
+    recipients = [
+        {"email": "la@example.com", "timezone": "America/Los_Angeles", "time": "06:30"},
+        {"email": "sg@example.com", "timezone": "Asia/Singapore", "time": "05:45"},
+        {"email": "uk@example.com", "timezone": "Europe/London", "time": "07:00"},
+    ]
+    queue = delivery.build_queue(recipients, "2026-10-19")
+    order = [queue.pop() for _ in range(3)]
+    assert [item["email"] for _, item in order] == ["sg@example.com", "uk@example.com", "la@example.com"]
+    assert order[0][0] == datetime(2026, 10, 18, 21, 45, tzinfo=timezone.utc)
+    assert order[2][0] == datetime(2026, 10, 19, 13, 30, tzinfo=timezone.utc)  # PDT
+
+
+def test_release_waits_for_slots_and_paces_sends():
+    clock = [datetime(2026, 10, 19, 6, 0, tzinfo=timezone.utc)]
+    sent = []
+
+    def sleep(seconds):
+        clock[0] += timedelta(seconds=seconds)
+
+    queue = delivery.DeliveryQueue()
+    for i in range(3):
+        queue.push(clock[0] + timedelta(minutes=10), f"r{i}")
+    stats = delivery.release(queue, lambda item: sent.append((item, clock[0])) or True,
+                             now=lambda: clock[0], sleep=sleep, sends_per_minute=30)
+    assert stats["sent"] == 3 and stats["failed"] == 0
+    assert [t.strftime("%H:%M:%S") for _, t in sent] == ["06:10:00", "06:10:02", "06:10:04"]
+
+
+def test_run_delivery_retries_without_sleeping_after_the_last_attempt(offline_bot, monkeypatch):
+    timeouts = []
+    backoffs = []
+
+    def failing_smtp(host, port, context=None, timeout=None):
+        timeouts.append(timeout)
+        raise OSError("connection refused")
+
+    def release(queue, send, on_idle=None):
+        results = []
+        while len(queue):
+            _, item = queue.pop()
+            results.append(send(item))
+        return {"sent": sum(results), "failed": len(results) - sum(results), "max_lateness_s": 0}
+
+    monkeypatch.setattr(offline_bot.smtplib, "SMTP_SSL", failing_smtp)
+    monkeypatch.setattr(offline_bot.deadlines.Deadline, "backoff", lambda self, seconds: backoffs.append(seconds) or True)
+    monkeypatch.setattr(offline_bot.delivery, "release", release)
+    monkeypatch.setattr(offline_bot.delivery, "load_recipients", lambda: [{"email": "a@example.com"}])
+
+    stats = offline_bot.run_delivery("2026-10-19")
+    assert stats["sent"] == 0 and stats["failed"] == 1
+    assert len(timeouts) == 3 and all(timeout <= 30 for timeout in timeouts)
+    assert backoffs == [5, 10]  # No wait after the third attempt
@@ -0,0 +1,57 @@
+import json
+
+import devotional_archive
+import devotional_bot
+
+
+def test_archive_stores_reference_not_scripture(tmp_path, monkeypatch):
+    monkeypatch.setattr(devotional_archive, "ARCHIVE_DIR", str(tmp_path / "archive"))
+    v2_content = {"header": {"subject": "Mercy first", "big_idea": "Mercy before merit."}}
+    path = devotional_archive.save_run("Genesis 43", v2_content, None, None, [], date="2026-10-19", version="ESV")
+
+    with open(path, encoding="utf-8") as f:
+        record = json.load(f)
+    assert "bible_texts" not in record
+    assert (record["reference"], record["version"]) == ("Genesis 43", "ESV")
+
+    fetched = []
+
+    def get_bible_text(reference, versions=None, deadline=None):
+        fetched.append((reference, versions))
+        return {"ESV": ["<p>Then their father Israel said to them</p>"]}
+
+    monkeypatch.setattr(devotional_bot, "get_bible_text", get_bible_text)
+    html = devotional_bot.render_archived(devotional_archive.load_run("2026-10-19"))
+    assert "Then their father Israel" in html and fetched == [("Genesis 43", ["ESV"])]
+
+    # Records archived with inline scripture still render without a lookup
+    legacy = dict(record, bible_texts=["<p>Inline passage</p>"])
+    assert "Inline passage" in devotional_bot.render_archived(legacy) and len(fetched) == 1
+
+
+def test_failed_send_keeps_pending_content_and_quotes_unused(offline_bot, monkeypatch):
+    import offline_stubs
+    import quotes_db
+    from datetime import datetime
+
+    today = datetime.now().isoformat()[:10]
+    record = offline_stubs.sample_record(today)
+    devotional_archive.save_pending(today, offline_stubs.REFERENCE, record["v2_content"], record["case_study"],
+                                    record["core_devotional"], record["quotes"], version="ESV")
+    used_before = len(quotes_db.get_used_quotes())
+    monkeypatch.setattr(offline_bot, "send_v2_email", lambda *args, **kwargs: False)
+
+    offline_bot.run_pipeline()
+    assert devotional_archive.load_pending(today) is not None
+    assert devotional_archive.load_run(today) is None
+    assert len(quotes_db.get_used_quotes()) == used_before
+
+
+def test_quotes_without_context_render_without_a_context_line(offline_bot):
+    import offline_stubs
+    record = offline_stubs.sample_record("2026-10-19")
+    quotes = [{"quote": "Pray.", "author": "E.M. Bounds"}, {**record["quotes"][0]}]
+    html = offline_bot.render_v2_html(record["reference"], offline_stubs.sample_bible_texts(), record["v2_content"],
+                                      record["case_study"], quotes, record["core_devotional"])
+    assert "Context: None" not in html
+    assert html.count("Context: ") == 1
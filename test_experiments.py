@@ -0,0 +1,34 @@
+import json
+
+import devotional_bot
+import experiments
+import offline_stubs
+
+
+def test_variants_are_scored_per_case(offline_bot, monkeypatch):
+
+    def generate_content(self, model, contents, config=None):
+        text = offline_stubs._canned_response(contents)
+        if "BROKEN" in contents:
+            text = text[:40]
+        elif "SLOPPY" in contents:
+            text = json.dumps({**json.loads(text), "header": {"subject": "A tapestry of grace"}})
+        return offline_stubs.StubResponse(text, contents)
+
+    monkeypatch.setattr(offline_stubs._StubModels, "generate_content", generate_content)
+    variants = [
+        {"name": "baseline"},
+        {"name": "broken", "v2_instructions": "BROKEN"},
+        {"name": "sloppy", "v2_instructions": "SLOPPY"},
+    ]
+    corpus = [{"reference": f"Psalm {n}", "text": "The Lord is my shepherd."} for n in (1, 2)]
+
+    results, seconds = experiments.run_experiment(devotional_bot, variants, corpus, concurrency=3)
+    summary = {row["variant"]: row for row in experiments.summarize(results, seconds)}
+
+    assert [row["cases"] for row in summary.values()] == [2, 2, 2]
+    assert summary["baseline"]["valid_json_rate"] == 1.0 and summary["baseline"]["blacklist_hits"] == 0
+    assert summary["broken"]["valid_json_rate"] == 0.0
+    assert summary["sloppy"]["cases_with_blacklist"] == 2
+    assert summary["sloppy"]["missing_keys"] == 2 * 2  # header.big_idea and header.mode dropped
+    assert all(result["input_tokens"] > 0 for result in results)
@@ -0,0 +1,27 @@
+import threading
+import time
+
+
+def test_slow_source_misses_its_deadline_while_the_others_return(offline_bot, monkeypatch):
+    release = threading.Event()
+
+    def fetch(url, name, timeout=None):
+        if name == "slow":
+            release.wait(5)
+        if name == "broken":
+            raise RuntimeError("boom")
+        return f"<p>{name} for {url}</p>"
+
+    monkeypatch.setattr(offline_bot, "get_biblegateway_devotional", fetch)
+    sources = [
+        {"name": "slow", "url": "https://slow.example/{date}", "deadline": 0.2},
+        {"name": "fast", "url": "https://fast.example/{date}", "deadline": 2},
+        {"name": "broken", "url": "https://broken.example/", "deadline": 2},
+    ]
+    start = time.monotonic()
+    try:
+        collected = offline_bot.collect_extra_devotionals(offline_bot.start_extra_devotionals(sources, "2026-10-19"))
+    finally:
+        release.set()
+    assert collected == [{"name": "fast", "html": "<p>fast for https://fast.example/2026-10-19</p>"}]
+    assert time.monotonic() - start < 2
@@ -0,0 +1,62 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import http_client
+
+
+@pytest.fixture
+def origin(tmp_path, monkeypatch):
+    """A local server that fails its first GET with a 502, then serves one page with an ETag."""
+    monkeypatch.setattr(http_client, "STORE_PATH", str(tmp_path / "http_responses.db"))
+    monkeypatch.setattr(http_client, "_session", None)
+    monkeypatch.setattr(http_client, "TRANSPORT", "requests")
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.headers.get("If-None-Match"))
+            if len(hits) == 1:
+                self.send_response(502)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            elif self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.send_header("ETag", '"v1"')
+                self.end_headers()
+            else:
+                body = b"<p>page</p>"
+                self.send_response(200)
+                self.send_header("ETag", '"v1"')
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/page", hits
+    server.shutdown()
+    server.server_close()
+
+
+def test_502_is_retried_then_304_serves_the_stored_body(origin):
+    url, hits = origin
+    first = http_client.fetch(url)
+    assert first.status_code == 200 and first.content == b"<p>page</p>" and not first.revalidated
+    assert hits == [None, None]  # The 502 was retried once
+
+    second = http_client.fetch(url)
+    assert hits[-1] == '"v1"'
+    assert second.revalidated and second.status_code == 200 and second.content == b"<p>page</p>"
+
+
+def test_without_revalidation_nothing_is_stored(origin):
+    url, hits = origin
+    http_client.fetch(url, revalidate=False)
+    http_client.fetch(url, revalidate=False)
+    assert hits == [None, None, None]
+    assert http_client._load_stored(url) is None
@@ -0,0 +1,37 @@
+import tracemalloc
+
+import profiling
+import tracing
+
+
+def test_profile_report_attributes_nested_stages(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "_span_hooks", [])
+    monkeypatch.setattr(profiling, "_results", [])
+    profiling.enable()
+
+    with tracing.span("get_bible_text"):
+        with tracing.span("get_bible_text.cleanup"):
+            sorted(str(i) for i in range(20000))
+    tracemalloc.stop()
+    report_path = profiling.write_report(str(tmp_path), top=5)
+
+    report = open(report_path, encoding="utf-8").read()
+    assert report.index("get_bible_text.cleanup") < report.index("=== get_bible_text ===")
+    assert "=== get_bible_text.cleanup ===" in report and "cumulative" in report
+    assert sorted(path.name for path in tmp_path.glob("*.prof")) == [
+        "01_get_bible_text.cleanup.prof", "02_get_bible_text.prof"
+    ]
+
+
+def test_profiled_run_covers_the_scripture_cleanup(offline_bot, monkeypatch):
+    monkeypatch.setattr(tracing, "_span_hooks", [])
+    monkeypatch.setattr(profiling, "_results", [])
+    monkeypatch.setattr(offline_bot, "SCRIPTURE_PREFETCH", False)  # As under --profile
+    profiling.enable()
+    try:
+        offline_bot.run_pipeline()
+    finally:
+        tracemalloc.stop()
+    stages = {stage["name"] for stage in profiling._results}
+    assert {"get_bible_text", "get_bible_text.cleanup"} <= stages
+    assert "scripture_prefetch" not in stages
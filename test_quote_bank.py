@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+import quote_bank
+import quotes_db
+
+
+@pytest.fixture(autouse=True)
+def bank(tmp_path, monkeypatch):
+    monkeypatch.setattr(quotes_db, "DB_PATH", str(tmp_path / "quotes.db"))
+    monkeypatch.setattr(quotes_db, "LOG_DIR", str(tmp_path / "quotes_history"))
+    monkeypatch.setattr(quote_bank, "DB_PATH", str(tmp_path / "quote_bank.db"))
+    monkeypatch.setattr(quote_bank, "CURATED_PATH", str(tmp_path / "quote_bank.jsonl"))
+    (tmp_path / "quotes_history").mkdir()
+    history = [
+        {"date": "2026-01-01", "author": "E.M. Bounds (Author on prayer)", "quote": "Mercy answers the praying heart."},
+    ]
+    (tmp_path / "quotes_history" / "2026-01.jsonl").write_text(
+        "".join(json.dumps(line) + "\n" for line in history), encoding="utf-8"
+    )
+    curated = [
+        {"quote": "Mercy answers the praying heart!", "author": "E.M. Bounds (Author on prayer)", "themes": ["mercy"]},
+        {"quote": "God's mercy waits on prayer.", "author": "E.M. Bounds (Author on prayer)", "themes": ["mercy"]},
+        {"quote": "God's mercy outruns our sin.", "author": "E.M. Bounds (Author on prayer)", "themes": ["mercy"]},
+        {"quote": "Wait on the Lord.", "author": "Andrew Murray", "themes": ["mercy", "patience"]},
+        {"quote": "Mercy without a byline.", "author": "", "themes": ["mercy"]},
+        {"quote": "Prayer is friendship.", "author": "Teresa of Avila", "themes": ["mercy", "friendship"]},
+        {"quote": "Abide in Him and ask.", "author": "Andrew Murray", "themes": ["abiding"]},
+        {"quote": "Mercy, cut short.", "author": "Oswald Chambers (Missionary and author of", "themes": ["mercy"]},
+    ]
+    (tmp_path / "quote_bank.jsonl").write_text(
+        "".join(json.dumps(line) + "\n" for line in curated), encoding="utf-8"
+    )
+
+
+def test_select_ranks_unused_matches_one_per_author():
+    picks = quote_bank.select("Mercy before merit", count=5)
+    quotes = [pick["quote"] for pick in picks]
+    authors = [pick["author"] for pick in picks]
+    assert len(authors) == len(set(authors)) == 3
+    assert "Mercy answers the praying heart!" not in quotes  # Used already (same normalized text)
+    assert "Mercy without a byline." not in quotes
+    assert quote_bank.stats() == (6, 5)
+    assert quote_bank.select("the and of") == []
+
+
+def test_shipped_bank_entries_are_well_formed():
+    with open(quote_bank.BASE_DIR + "/quote_bank.jsonl", encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    assert entries
+    assert [entry for entry in entries if quote_bank.entry_problem(entry)] == []
+
+
+def test_used_quotes_never_come_back():
+    first = quote_bank.select("mercy", count=3)
+    quotes_db.add_quotes(first, reference="Genesis 43")
+    second = quote_bank.select("mercy", count=3)
+    assert not {pick["quote"] for pick in first} & {pick["quote"] for pick in second}
+    assert [pick["quote"] for pick in second] == ["God's mercy outruns our sin."]  # Shorter than asked: bank is dry
+    assert quote_bank.stats() == (6, 2)
+
+
+def test_prayer_quotes_fall_back_to_the_model_when_the_bank_runs_short(offline_bot):
+    import offline_stubs
+    v2_content = {"header": {"big_idea": "Abiding", "mode": "Rest"}}  # One unused match in the bank
+    quotes = offline_bot.generate_prayer_quotes("Genesis 43", "text", v2_content=v2_content)
+    assert [quote["quote"] for quote in quotes] == [quote["quote"] for quote in offline_stubs.PRAYER_QUOTES]
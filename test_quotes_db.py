@@ -0,0 +1,114 @@
+"""
+Tests for the quote history log and its SQLite index.
+Run with: python -m pytest test_quotes_db.py
+"""
+
+import os
+
+import pytest
+
+import quotes_db
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    """Point quotes_db at an empty log directory and index."""
+    monkeypatch.setattr(quotes_db, "DB_PATH", str(tmp_path / "quotes.db"))
+    monkeypatch.setattr(quotes_db, "LOG_DIR", str(tmp_path / "quotes_history"))
+    return tmp_path / "quotes_history"
+
+
+def test_add_quotes_appends_log_and_skips_duplicates(history):
+    added = quotes_db.add_quotes([
+        {"quote": "Pray without ceasing.", "author": "Paul"},
+        {"quote": "God shapes the world by prayer.", "author": "E.M. Bounds"},
+    ])
+    assert added == 2
+    assert quotes_db.add_quotes([{"quote": "Pray without ceasing.", "author": "Paul"}]) == 0
+
+    segments = os.listdir(history)
+    assert len(segments) == 1
+    assert len((history / segments[0]).read_text(encoding="utf-8").splitlines()) == 2
+    assert quotes_db.get_quote_count() == 2
+
+
+def test_index_picks_up_appended_and_rewritten_segments(history):
+    history.mkdir()
+    segment = history / "2026-01.jsonl"
+    segment.write_text('{"date": "2026-01-02", "author": "A", "quote": "one"}\n', encoding="utf-8")
+    assert quotes_db.get_quote_count() == 1
+
+    # Appended tail (e.g. a pulled commit from another machine)
+    with open(segment, "a", encoding="utf-8") as f:
+        f.write('{"date": "2026-01-03", "author": "B", "quote": "two"}\n')
+    assert [q for q, _ in quotes_db.get_used_quotes()] == ["two", "one"]
+
+    # Rewritten segment (e.g. a merge that reordered lines)
+    segment.write_text('{"date": "2026-01-03", "author": "B", "quote": "two"}\n', encoding="utf-8")
+    assert quotes_db.get_used_quotes() == [("two", "B")]
+
+    # Deleted segment
+    segment.unlink()
+    assert quotes_db.get_quote_count() == 0
+
+
+def test_unchanged_segments_are_skipped(history):
+    quotes_db.add_quotes([{"quote": "Ask, seek, knock.", "author": "Jesus"}])
+    conn = quotes_db.sqlite3.connect(quotes_db.DB_PATH)
+    try:
+        assert quotes_db.sync_index(conn) == 0
+    finally:
+        conn.close()
+
+
+def test_normalized_duplicates_are_skipped(history):
+    quotes_db.add_quotes([{"quote": "Prayer is the greater work.", "author": "Oswald Chambers"}])
+    added = quotes_db.add_quotes([{"quote": "prayer is the  greater work", "author": "Chambers"}])
+    assert added == 0
+
+
+def test_reference_and_context_survive_index_rebuild(history):
+    quotes_db.add_quotes(
+        [{"quote": "God shapes the world by prayer.", "author": "E.M. Bounds", "context": "Jacob prays."}],
+        reference="Genesis 32",
+    )
+    os.remove(quotes_db.DB_PATH)  # Force a rebuild from the log
+
+    assert quotes_db.get_quotes_by_author("E.M. Bounds")[0][0] == "God shapes the world by prayer."
+    conn = quotes_db.sqlite3.connect(quotes_db.DB_PATH)
+    try:
+        row = conn.execute("SELECT reference, context, text_hash FROM quotes").fetchone()
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == quotes_db.SCHEMA_VERSION
+    finally:
+        conn.close()
+    assert row == ("Genesis 32", "Jacob prays.", quotes_db.text_hash("God shapes the world by prayer."))
+
+
+def test_migration_backfills_existing_index(history):
+    conn = quotes_db.sqlite3.connect(quotes_db.DB_PATH)
+    quotes_db._migration_1_log_index(conn)
+    conn.execute("PRAGMA user_version = 1")
+    conn.execute(
+        "INSERT INTO quotes (quote_text, author, date_used, segment) VALUES ('Ask.', 'A', '2026-01-01', 'x')"
+    )
+    conn.commit()
+
+    assert quotes_db.migrate(conn) == quotes_db.SCHEMA_VERSION
+    assert conn.execute("SELECT text_hash FROM quotes").fetchone()[0] == quotes_db.text_hash("Ask.")
+    conn.close()
+
+
+def test_quote_used_again_on_a_later_day_moves_forward(history):
+    history.mkdir()
+    (history / "2026-01.jsonl").write_text(
+        '{"date": "2026-01-02", "author": "A", "quote": "one"}\n'
+        '{"date": "2026-01-03", "author": "B", "quote": "two"}\n',
+        encoding="utf-8",
+    )
+    assert quotes_db.add_quotes([{"quote": "One!", "author": "A"}]) == 0
+    assert [q for q, _ in quotes_db.get_used_quotes()] == ["one", "two"]
+
+    # The reuse line survives a rebuild of the index from the log
+    os.remove(quotes_db.DB_PATH)
+    assert [q for q, _ in quotes_db.get_used_quotes()] == ["one", "two"]
+    assert quotes_db.get_quote_count() == 2
@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+
+from rate_limit import ModelLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        with self.lock:
+            self.now += seconds
+
+
+def make_limiter(rpm=None, tpm=None):
+    clock = FakeClock()
+    return ModelLimiter(rpm=rpm, tpm=tpm, clock=clock, sleep=clock.sleep), clock
+
+
+def test_burst_up_to_rpm_then_queues():
+    limiter, clock = make_limiter(rpm=6)
+    waits = [limiter.acquire(10) for _ in range(7)]
+    assert waits[:6] == [0.0] * 6
+    assert abs(waits[6] - 10.0) < 1e-6  # one request refills every 60/6 seconds
+    assert abs(clock.now - 10.0) < 1e-6
+
+
+def test_token_limit_and_reconcile():
+    limiter, clock = make_limiter(tpm=6000)
+    assert limiter.acquire(3000) == 0.0
+    # The call actually used 9000 tokens, so the bucket is now 3000 in debt
+    limiter.reconcile(3000, 9000)
+    waited = limiter.acquire(1000)
+    assert abs(waited - 40.0) < 1e-6  # (1000 + 3000) tokens at 100 tokens/s
+
+
+def test_backoff_holds_queue():
+    limiter, clock = make_limiter(rpm=60)
+    limiter.backoff(30)
+    assert limiter.acquire(1) >= 30.0
+
+
+def test_unlimited_model_never_waits():
+    limiter, clock = make_limiter()
+    assert all(limiter.acquire(10**6) == 0.0 for _ in range(100))
+
+
+def test_acquire_gives_up_without_waiting_past_its_timeout():
+    limiter, clock = make_limiter(rpm=6)
+    for _ in range(6):
+        limiter.acquire(10)
+    with pytest.raises(TimeoutError):
+        limiter.acquire(10, timeout=5)
+    assert clock.now == 0.0  # Neither slept nor reserved a slot
+    assert abs(limiter.acquire(10, timeout=15) - 10.0) < 1e-6
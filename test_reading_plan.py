@@ -0,0 +1,46 @@
+import json
+from datetime import date
+
+import pytest
+
+import devotional_archive
+import reading_plan
+
+
+@pytest.fixture
+def calendar(tmp_path, monkeypatch):
+    monkeypatch.setattr(reading_plan, "PLAN_PATH", str(tmp_path / "reading_plan.json"))
+
+
+def test_forecast_fills_gaps_from_the_last_known_day(calendar):
+    reading_plan.record("2026-10-18", "Genesis 43; Psalm 5")
+    reading_plan.record("2026-10-21", "Exodus 1")
+    forecast = reading_plan.forecast(4, start=date(2026, 10, 19))
+    assert forecast == [
+        ("2026-10-19", "Genesis 44; Psalms 6", "predicted"),
+        ("2026-10-20", "Genesis 45; Psalms 7", "predicted"),
+        ("2026-10-21", "Exodus 1", "calendar"),
+        ("2026-10-22", "Exodus 2", "predicted"),
+    ]
+
+    reading_plan.record("2026-10-18", "Genesis 43; Matthew 12:1-13:23")  # Split chapter: can't predict
+    assert reading_plan.forecast(1, start=date(2026, 10, 19)) == [("2026-10-19", None, None)]
+
+
+def test_run_batch_pre_generates_calendar_and_predicted_days(offline_bot, monkeypatch):
+    plan = {}
+    monkeypatch.setattr(reading_plan, "load_calendar", lambda path=None: dict(plan))
+    days = reading_plan.upcoming(3)
+    plan[days[0][0]] = "Genesis 43; Matthew 12:1-13:23"
+    plan[days[1][0]] = "Genesis 44"  # days[2] is predicted from this
+
+    assert offline_bot.run_batch(3, workers=2) == 3
+    pending = {day: devotional_archive.load_pending(day) for day in devotional_archive.list_pending()}
+    assert {day: record["reference"] for day, record in pending.items()} == {
+        days[0][0]: "Genesis 43; Matthew 12:1-13:23", days[1][0]: "Genesis 44", days[2][0]: "Genesis 45",
+    }
+    assert all(record["v2_content"] and "bible_texts" not in record for record in pending.values())
+    quotes = [json.dumps(q, sort_keys=True) for record in pending.values() for q in record["quotes"]]
+    assert len(quotes) == len(set(quotes))  # No quote reused across the batch
+
+    assert offline_bot.run_batch(3) == 0  # Already pre-generated
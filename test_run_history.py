@@ -0,0 +1,83 @@
+import sqlite3
+
+import pytest
+
+import run_history
+
+
+@pytest.fixture(autouse=True)
+def history(tmp_path, monkeypatch):
+    monkeypatch.setattr(run_history, "DB_PATH", str(tmp_path / "run_history.db"))
+
+
+def make_run(i, v2_ms, quote_tokens):
+    return {
+        "run_id": f"run{i:03d}",
+        "started_at": f"2026-10-{i + 1:02d}T09:30:00",
+        "command": "run",
+        "outcome": "sent",
+        "total_ms": v2_ms + 1000,
+        "spans": [
+            {"name": "generate_v2_content", "wall_ms": v2_ms, "attempts": 2, "model": "gemini-3-flash-preview",
+             "input_tokens": 4000, "output_tokens": 1500},
+            {"name": "generate_quotes", "wall_ms": 900.0, "attempts": 1, "input_tokens": quote_tokens,
+             "output_tokens": 300},
+            {"name": "send_v2_email", "wall_ms": 400.0, "email_bytes": 52000},
+        ],
+    }
+
+
+def test_record_totals_tokens_and_email_bytes():
+    assert run_history.record(make_run(0, 8000.0, 2000)) == 3
+    run_history.record(make_run(0, 8000.0, 2000))  # re-recording replaces
+    conn = run_history._connect()
+    assert conn.execute("SELECT input_tokens, output_tokens, email_bytes FROM runs").fetchall() == [(6000, 1800, 52000)]
+    assert conn.execute("SELECT COUNT(*), SUM(retries) FROM stages").fetchone() == (3, 1)
+    conn.close()
+
+
+def test_report_flags_latency_and_token_regressions():
+    for i in range(10):
+        run_history.record(make_run(i, 8000.0, 2000))
+    for i in range(10, 14):
+        run_history.record(make_run(i, 17000.0, 40000))
+    rows = {row["stage"]: row for row in run_history.report(recent=4, baseline=10)}
+    assert rows["generate_v2_content"]["flags"] == ["p95 x2.1"]
+    assert rows["generate_quotes"]["flags"] == ["input tokens > 30000", "input tokens x20.0"]
+    assert rows["send_v2_email"]["flags"] == []
+
+
+def test_percentile():
+    assert run_history.percentile([1, 2, 3, 4, 5], 50) == 3
+    assert run_history.percentile([10, 20], 95) == pytest.approx(19.5)
+    assert run_history.percentile([], 95) is None
+
+
+def test_prefetch_stats_after_upgrading_an_old_history():
+    conn = sqlite3.connect(run_history.DB_PATH)
+    conn.execute("""CREATE TABLE runs (run_id TEXT PRIMARY KEY, started_at TEXT NOT NULL, command TEXT,
+                    reference TEXT, outcome TEXT, total_ms REAL, email_bytes INTEGER, input_tokens INTEGER,
+                    output_tokens INTEGER)""")
+    conn.close()
+    for i, (prefetch, saved_ms) in enumerate([("hit", 800.0), ("miss", 0.0), ("hit", 1200.0), (None, None)]):
+        run = make_run(i, 8000.0, 2000)
+        if prefetch:
+            run.update(prefetch=prefetch, prefetch_saved_ms=saved_ms)
+        run_history.record(run)
+    stats = run_history.prefetch_stats()
+    assert (stats["runs"], stats["hits"], stats["saved_total_ms"]) == (3, 2, 2000.0)
+    assert stats["saved_p50_ms"] == 1000.0
+    conn = sqlite3.connect(run_history.DB_PATH)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == run_history.SCHEMA_VERSION
+    conn.close()
+
+
+def test_unversioned_history_with_prefetch_columns_migrates():
+    run_history.record(make_run(0, 8000.0, 2000))
+    conn = sqlite3.connect(run_history.DB_PATH)
+    conn.execute("PRAGMA user_version = 0")  # Written before the history was versioned
+    conn.close()
+    run = make_run(1, 8000.0, 2000)
+    run.update(prefetch="hit", prefetch_saved_ms=500.0)
+    run_history.record(run)
+    assert run_history.prefetch_stats()["hits"] == 1
@@ -0,0 +1,46 @@
+import json
+
+import http_client
+import offline_stubs
+
+
+def test_run_multi_sends_two_personas_from_one_scripture_fetch(offline_bot, monkeypatch, tmp_path):
+    config = tmp_path / "run_config.json"
+    config.write_text(json.dumps({
+        "plans": [{"name": "fixed", "reference": offline_stubs.REFERENCE}],
+        "personas": [
+            {"name": "leader", "plan": "fixed", "receiver": "leader@example.com"},
+            {"name": "students", "plan": "fixed", "receiver": "students@example.com",
+             "audience": "university students", "versions": ["NIV", "ESV"]},
+        ],
+    }))
+    fetches = []
+    get_bible_text = offline_bot.get_bible_text
+
+    def counting(reference, versions=None, deadline=None):
+        fetches.append((reference, list(versions or [])))
+        return get_bible_text(reference, versions=versions, deadline=deadline)
+
+    sent = {}
+    send_v2_email = offline_bot.send_v2_email
+
+    def recording(reference, bible_texts, *args, receiver=None, **kwargs):
+        sent[receiver] = (bible_texts, args[4], args[2])
+        return send_v2_email(reference, bible_texts, *args, receiver=receiver, **kwargs)
+
+    monkeypatch.setattr(offline_bot, "get_bible_text", counting)
+    monkeypatch.setattr(offline_bot, "send_v2_email", recording)
+
+    assert offline_bot.run_multi(str(config)) == 2
+    # One fetch for the shared reference, covering every version either persona reads
+    assert len(fetches) == 1 and fetches[0][0] == offline_stubs.REFERENCE
+    assert set(fetches[0][1]) >= {"ESV", "NIV"}
+    assert http_client._session.requests == 1
+
+    leader_texts, leader_parallel, leader_quotes = sent["leader@example.com"]
+    student_texts, student_parallel, student_quotes = sent["students@example.com"]
+    assert leader_texts and student_texts
+    assert "ESV" in student_parallel and "NIV" not in student_parallel
+    # Both personas were offered the same canned quotes; each quote goes out once
+    emailed = [quote["quote"] for quote in leader_quotes + student_quotes]
+    assert emailed and len(emailed) == len(set(emailed))
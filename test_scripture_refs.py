@@ -0,0 +1,69 @@
+import pytest
+
+import scripture_refs
+from scripture_refs import canonical
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Genesis 43; Matthew 12:1-13:23", "Genesis 43; Matthew 12:1-13:23"),
+    ("gen 43 ; Mt 12:1–13:23", "Genesis 43; Matthew 12:1-13:23"),
+    ("I Jn 2", "1 John 2"),
+    ("1John 2:1-6", "1 John 2:1-6"),
+    ("Song of Solomon 2:4", "Song of Songs 2:4"),
+    ("Philem 4-7", "Philemon 4-7"),
+    ("Jude 3", "Jude 3"),
+    ("John 3:16, 18-20", "John 3:16; John 3:18-20"),
+    ("Genesis 43:5-10", "Genesis 43:5-10"),
+    ("Genesis 43-44:5", "Genesis 43:1-44:5"),
+])
+def test_canonical(text, expected):
+    assert canonical(text) == expected
+
+
+def test_overlapping_and_adjacent_ranges_merge():
+    assert canonical("Genesis 43:1-10; Gen 43") == "Genesis 43"
+    assert canonical("Gen 1, 3; 2") == "Genesis 1-3"
+    assert canonical("John 3:16-18; John 3:17-21") == "John 3:16-21"
+    assert canonical("John 3:19-21; John 3:16-18") == "John 3:16-21"
+
+
+def test_merge_keeps_the_plans_order():
+    assert canonical("Psalm 1; Genesis 2") == "Psalms 1; Genesis 2"
+    assert canonical("Matthew 13:1-23; Genesis 43") == "Matthew 13:1-23; Genesis 43"
+    assert canonical("Genesis 3; Psalm 1; Genesis 4") == "Genesis 3; Psalms 1; Genesis 4"
+
+
+def test_bare_single_chapter_book_is_the_whole_book():
+    (passage,) = scripture_refs.parse("Jude 1")
+    assert passage[1:] == (1, 1, 1, scripture_refs.CHAPTER_END)
+    assert canonical("Jude 1") == "Jude 1"
+    assert canonical("Jude 1:1") == "Jude 1:1"
+    assert canonical("Jude 1-4") == "Jude 1-4"
+    assert canonical("Obadiah 1; Jude 3") == "Obadiah 1; Jude 3"
+
+
+def test_cache_key_matches_for_equivalent_spellings():
+    assert scripture_refs.cache_key("Gen 43; Matt 12:1-13:23") == scripture_refs.cache_key("genesis 43;matthew 12:1-13:23")
+    assert scripture_refs.cache_key("Today's  reading") == "Today's reading"
+
+
+def test_rejects_unknown_and_ambiguous_books():
+    with pytest.raises(ValueError):
+        canonical("Hezekiah 3")
+    with pytest.raises(ValueError):
+        canonical("Ju 3")  # Judges or Jude
+    with pytest.raises(ValueError):
+        canonical("Genesis")
+
+
+def test_label_from_verse_ids():
+    assert scripture_refs.label_from_verse_ids(["Gen-43-1", "Gen-43-2", "Gen-43-34"]) == "Genesis 43:1-34"
+    assert scripture_refs.label_from_verse_ids(["Matt-12-1", "Matt-13-23"]) == "Matthew 12:1-13:23"
+    assert scripture_refs.label_from_verse_ids(["nope"]) is None
+
+
+def test_next_reading():
+    assert scripture_refs.next_reading("Gen 43; Psalm 5") == "Genesis 44; Psalms 6"
+    assert scripture_refs.next_reading("Genesis 43-44") == "Genesis 45-46"
+    assert scripture_refs.next_reading("Genesis 43; Matthew 12:1-13:23") is None  # Next split unknown
+    assert scripture_refs.next_reading("not a reference") is None
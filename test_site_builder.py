@@ -0,0 +1,37 @@
+import json
+import os
+
+import site_builder
+
+
+def write_day(archive_dir, day, subject):
+    record = {"date": day, "reference": "Genesis 43", "bible_texts": [],
+              "v2_content": {"header": {"subject": subject, "big_idea": "Mercy first."}}}
+    (archive_dir / f"{day}.json").write_text(json.dumps(record), encoding="utf-8")
+
+
+def render(record):
+    return f"<html><body><h1>{record['v2_content']['header']['subject']}</h1></body></html>"
+
+
+def test_incremental_build(tmp_path):
+    archive_dir, site_dir = tmp_path / "archive", tmp_path / "site"
+    archive_dir.mkdir()
+    for day in ("2026-10-17", "2026-10-18"):
+        write_day(archive_dir, day, f"Subject {day}")
+    build = lambda: site_builder.build(render, str(site_dir), str(archive_dir), base_url="https://example.com/")
+
+    assert build()["rendered"] == 2
+    assert build()["rendered"] == 0
+
+    write_day(archive_dir, "2026-10-19", "Newest & best")
+    os.remove(archive_dir / "2026-10-17.json")
+    result = build()
+    assert (result["rendered"], result["unchanged"], result["removed"]) == (1, 1, 1)
+    assert not (site_dir / "2026-10-17.html").exists()
+    assert 'href="index.html"' in (site_dir / "2026-10-19.html").read_text(encoding="utf-8")
+
+    index = (site_dir / "index.html").read_text(encoding="utf-8")
+    assert index.index("2026-10-19") < index.index("2026-10-18")
+    feed = (site_dir / "feed.xml").read_text(encoding="utf-8")
+    assert "<title>Newest &amp; best</title>" in feed and "https://example.com/2026-10-19.html" in feed
@@ -0,0 +1,62 @@
+import style_gate
+
+
+def sample():
+    return {
+        "v2_content": {
+            "header": {"subject": "Stop Negotiating (Gen 43)", "big_idea": "Mercy first.", "mode": "Mercy > Merit"},
+            "anchor": {"key_verses": ["Genesis 43:23 - Peace to you."], "insight": "Judah offers himself."},
+            "integration": {"soma": {"action": "Open your hands."}, "soul": {"pivot": "Gift."}, "spirit": {"explanation": "Breathe."}},
+        },
+        "case_study": {"subject": "Corrie ten Boom", "narrative": "Munich, 1947.", "connection": "A feast.", "takeaway": "Forgive."},
+        "core_devotional": {"title": "The Table", "content": "The brothers return."},
+        "quotes": [{"quote": "Life is a journey.", "author": "Someone", "context": "Judah's plea."}],
+    }
+
+
+def test_clean_content_passes():
+    assert style_gate.scan(sample()) == []
+
+
+def test_flags_blacklist_per_section_but_not_quoted_words():
+    content = sample()
+    content["v2_content"]["anchor"]["insight"] = "A pivotal moment in the Journeying of Judah."
+    content["quotes"][0]["context"] = "We navigated the famine."
+    issues = {issue["section"]: issue for issue in style_gate.scan(content)}
+    assert set(issues) == {"v2_content.anchor.insight", "quotes.0.context"}
+    assert issues["v2_content.anchor.insight"]["detail"] == "journeying, pivotal"
+    assert style_gate.repair_target("quotes.0.context") == "quotes.0.context"
+
+
+def test_blacklist_matches_inflections_but_not_longer_words():
+    def hits(text):
+        return [match.group(0).lower() for match in style_gate.BLACKLIST_PATTERN.finditer(text)]
+
+    assert hits("Tapestries, beacons, journeyed, navigating, leveraged and vital roles.") == [
+        "tapestries", "beacons", "journeyed", "navigating", "leveraged", "vital roles"]
+    assert hits("A journeyman from Beaconsfield left a navigator's pivotally placed tapestrylike rug.") == []
+
+
+def test_missing_and_oversized():
+    content = sample()
+    del content["case_study"]["takeaway"]
+    content["v2_content"]["header"]["subject"] = "x" * 200
+    kinds = {(issue["section"], issue["kind"]) for issue in style_gate.scan(content)}
+    assert kinds == {("case_study.takeaway", "missing"), ("v2_content.header.subject", "oversized")}
+
+
+def test_set_section_patches_in_place():
+    content = sample()
+    style_gate.set_section(content, "v2_content.integration.soma", {"action": "Walk."})
+    style_gate.set_section(content, "quotes.0", {"quote": "Q", "author": "A", "context": "C"})
+    assert content["v2_content"]["integration"]["soma"] == {"action": "Walk."}
+    assert content["quotes"][0]["context"] == "C"
+
+
+def test_quote_context_repair_leaves_the_quote_and_byline_alone(offline_bot):
+    content = sample()
+    content["quotes"][0]["context"] = "Judah's journey back to Egypt."
+    remaining = offline_bot.apply_style_gate("Genesis 43", "text", content)
+    assert remaining == []
+    assert content["quotes"][0] == {"quote": "Life is a journey.", "author": "Someone",
+                                    "context": "Judah's walk through back to Egypt."}
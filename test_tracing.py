@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+import tracing
+
+
+@pytest.fixture(autouse=True)
+def metrics(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "METRICS_PATH", str(tmp_path / "run_metrics.jsonl"))
+    monkeypatch.setattr(tracing, "_run", None)
+    return tmp_path / "run_metrics.jsonl"
+
+
+def test_spans_record_parent_outcome_and_run_line(metrics):
+    tracing.start_run(command="run")
+
+    @tracing.traced("generate_case_study")
+    def failing_stage():
+        tracing.increment("attempts")
+        tracing.increment("attempts")
+        return None
+
+    with tracing.span("pipeline"):
+        failing_stage()
+        with pytest.raises(ValueError):
+            with tracing.span("send_v2_email"):
+                raise ValueError("smtp down")
+    tracing.set_run_attrs(outcome="send_failed")
+    tracing.append_run_attr("degraded", {"module": "quotes"})
+    run = tracing.end_run()
+
+    spans = {span["name"]: span for span in run["spans"]}
+    assert spans["pipeline"]["parent"] is None and spans["pipeline"]["outcome"] == "ok"
+    assert spans["generate_case_study"]["parent"] == "pipeline"
+    assert (spans["generate_case_study"]["outcome"], spans["generate_case_study"]["attempts"]) == ("failed", 2)
+    assert spans["send_v2_email"]["outcome"] == "error"
+    assert spans["send_v2_email"]["error"] == "ValueError: smtp down"
+
+    lines = metrics.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1
+    written = json.loads(lines[0])
+    assert written["command"] == "run" and written["outcome"] == "send_failed"
+    assert written["degraded"] == [{"module": "quotes"}] and "_start" not in written
+    assert written["total_ms"] >= spans["pipeline"]["wall_ms"]
+    assert tracing.end_run() is None  # Closed
+
+
+def test_spans_without_a_run_are_not_recorded(metrics):
+    with tracing.span("get_bible_text") as record:
+        tracing.annotate(cache_hits=1)
+    assert record["cache_hits"] == 1
+    assert not metrics.exists()
@@ -0,0 +1,64 @@
+import devotional_bot
+import offline_stubs
+
+
+def test_translate_all_fans_out_one_call_per_language(offline_bot, monkeypatch):
+    record = offline_stubs.sample_record("2026-10-19")
+    content = {
+        "bible_texts": offline_stubs.sample_bible_texts(),
+        "parallel_texts": None,
+        "v2_content": record["v2_content"],
+        "case_study": record["case_study"],
+        "core_devo": record["core_devotional"],
+        "quotes_list": record["quotes"],
+    }
+    calls = []
+    translate_content = devotional_bot.translate_content
+
+    def counting(reference, sections, language, local_text=None, deadline=None):
+        calls.append((language["code"], local_text is not None))
+        if language["code"] == "xx":
+            return None
+        return translate_content(reference, sections, language, local_text, deadline)
+
+    monkeypatch.setattr(devotional_bot, "translate_content", counting)
+    languages = [
+        {"code": "es", "name": "Spanish", "version": "RVR1960"},
+        {"code": "de", "name": "German"},
+        {"code": "xx", "name": "Broken"},
+    ]
+    translations = devotional_bot.translate_all(record["reference"], content, languages)
+
+    assert sorted(calls) == [("de", False), ("es", True), ("xx", False)]
+    assert sorted(translations) == ["de", "es"]
+    spanish = translations["es"]
+    assert spanish["version"] == "RVR1960" and spanish["bible_texts"]
+    assert translations["de"]["version"] == devotional_bot.DEFAULT_VERSION
+    assert spanish["v2_content"]["header"]["subject"].startswith("[es] ")
+    assert [q["author"] for q in spanish["quotes_list"]] == [q["author"] for q in record["quotes"]]
+    assert content["v2_content"]["header"]["subject"] == record["v2_content"]["header"]["subject"]
+
+    html = devotional_bot.render_v2_html(record["reference"], spanish["bible_texts"], spanish["v2_content"],
+                                         spanish["case_study"], spanish["quotes_list"], spanish["core_devo"],
+                                         version=spanish["version"], language="es")
+    assert '<html lang="es">' in html and "(RVR1960)" in html
+
+
+def test_merge_translation_falls_back_per_section_and_per_quote():
+    sections = {
+        "v2_content": {"header": {"subject": "Mercy"}},
+        "case_study": {"subject": "Corrie"},
+        "core_devotional": {"title": "The Table"},
+        "quotes": [{"quote": "Pray.", "author": "E.M. Bounds"}, {"quote": "Abide.", "author": "Andrew Murray"}],
+    }
+    translated = {
+        "v2_content": {"header": {"subject": "Misericordia"}},
+        "case_study": "not an object",
+        "quotes": ["Orad.", {"quote": "Permaneced.", "author": "A. Murray"}],
+    }
+    merged = devotional_bot._merge_translation(sections, translated)
+    assert merged["v2_content"]["header"]["subject"] == "Misericordia"
+    assert merged["case_study"] == sections["case_study"]
+    assert merged["core_devotional"] == sections["core_devotional"]
+    assert merged["quotes"] == [{"quote": "Pray.", "author": "E.M. Bounds"},
+                                {"quote": "Permaneced.", "author": "Andrew Murray"}]
@@ -0,0 +1,50 @@
+import pytest
+
+import verse_store
+
+PASSAGE = (
+    '<h3><span class="text John-3-16">For God So Loved</span></h3>'
+    '<p><span class="text John-3-16">For God so loved the world,</span> '
+    '<span class="text John-3-17">For God did not send his Son to condemn.</span></p>'
+    '<p><span class="text John-3-18">Whoever believes is not condemned,</span> '
+    '<span class="text John-3-18">but whoever does not believe is condemned already.</span></p>'
+)
+
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(verse_store, "DB_PATH", str(tmp_path / "verses.db"))
+
+
+def test_assembles_stored_sub_ranges_only():
+    assert verse_store.store_passages("John 3:16-18", "ESV", [PASSAGE]) == 3
+    html = verse_store.assemble("Jn 3:17-18", "ESV")[0]
+    assert 'class="text John-3-17"' in html and "condemned already" in html
+    assert "John-3-16" not in html
+    assert verse_store.assemble("John 3:16-19", "ESV") is None
+    assert verse_store.assemble("John 3", "ESV") is None  # chapter length unknown
+    assert verse_store.assemble("John 3:16", "NIV") is None
+
+
+def test_whole_chapter_fetch_records_chapter_length():
+    verse_store.store_passages("John 3", "ESV", [PASSAGE.replace("John-3-16", "John-3-1").replace("John-3-17", "John-3-2").replace("John-3-18", "John-3-3")])
+    assert verse_store.stats() == {"ESV": (3, 1)}
+    html = verse_store.assemble("John 3", "ESV")[0]
+    assert html.startswith("<h3>For God So Loved</h3><p>")
+    assert html.count("<p>") == 2
+
+
+def test_single_verse_is_not_served_as_a_whole_single_chapter_book():
+    verse_store.store_passages("Jude 1:1", "ESV", ['<p><span class="text Jude-1-1">Jude, a servant of Jesus Christ,</span></p>'])
+    assert verse_store.assemble("Jude 1:1", "ESV") is not None
+    assert verse_store.assemble("Jude 1", "ESV") is None
+
+
+def test_check_key_verses():
+    verse_store.store_passages("John 3:16-18", "ESV", [PASSAGE])
+    checks = verse_store.check_key_verses([
+        "John 3:16 - For God so loved the world",
+        "John 3:17 - God sent his Son to judge.",
+        "Romans 8:28 - And we know",
+    ], "ESV")
+    assert [check["status"] for check in checks] == ["match", "mismatch", "unknown"]
@@ -0,0 +1,48 @@
+import gzip
+import http.client
+import json
+
+import pytest
+
+import devotional_archive
+import web_server
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(devotional_archive, "ARCHIVE_DIR", str(tmp_path))
+    record = {"date": "2020-01-06", "reference": "Genesis 43", "bible_texts": ["<p>text</p>"],
+              "v2_content": {"header": {"big_idea": "Mercy first."}}, "quotes": []}
+    (tmp_path / "2020-01-06.json").write_text(json.dumps(record), encoding="utf-8")
+    renders = []
+    site = web_server.DevotionalSite(lambda record: renders.append(1) or f"<h1>{record['reference']}</h1>" * 50)
+    server = web_server.start(site, port=0)
+    yield server.server_port, renders
+    server.shutdown()
+
+
+def get(port, path, **headers):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.request("GET", path, headers=headers)
+    response = conn.getresponse()
+    return response, response.read()
+
+
+def test_serves_compressed_body_with_etag_and_304(server):
+    port, renders = server
+    response, body = get(port, "/today.html", **{"Accept-Encoding": "gzip"})
+    assert response.status == 200 and response.getheader("Content-Encoding") == "gzip"
+    assert gzip.decompress(body).decode() == "<h1>Genesis 43</h1>" * 50
+
+    response, body = get(port, "/2020-01-06.html", **{"Accept-Encoding": "gzip",
+                                                       "If-None-Match": response.getheader("ETag")})
+    assert response.status == 304 and body == b""
+    assert len(renders) == 1  # rendered once, then served from the precomputed bodies
+
+
+def test_json_identity_and_missing_day(server):
+    port, _ = server
+    response, body = get(port, "/2020-01-06.json")
+    assert response.getheader("Content-Encoding") is None
+    assert json.loads(body)["v2_content"]["header"]["big_idea"] == "Mercy first."
+    assert get(port, "/2020-01-05.html")[0].status == 404
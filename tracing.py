@@ -0,0 +1,157 @@
+"""
+Run Tracing Module
+
+Wraps each pipeline stage in a span (wall time, attempts, model, prompt and
+response sizes, outcome) and appends one JSONL record per run to a local
+metrics file, so stage latency can be compared across runs.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+from functools import wraps
+
+# Metrics file location (same directory as this script, overridable for CI)
+METRICS_PATH = os.getenv(
+    "RUN_METRICS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "run_metrics.jsonl"),
+)
+
+_lock = threading.Lock()
+_local = threading.local()
+_run = None
+_span_hooks = []
+
+
+def _stack():
+    """Return the span stack of the current thread."""
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def start_run(**attrs):
+    """Begin a new run record. Spans opened afterwards are attached to it."""
+    global _run
+    with _lock:
+        _run = {
+            "run_id": uuid.uuid4().hex[:12],
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "_start": time.perf_counter(),
+            "spans": [],
+            **attrs,
+        }
+    return _run
+
+
+def add_span_hook(hook):
+    """
+    Register `hook(name)` to wrap every span; it must return a context manager.
+    Used by profiling mode to attach cProfile/tracemalloc to each stage.
+    """
+    _span_hooks.append(hook)
+
+
+def set_run_attrs(**attrs):
+    """Attach top-level fields (e.g. reference, outcome) to the current run."""
+    with _lock:
+        if _run is not None:
+            _run.update(attrs)
+
+
+def append_run_attr(field, value):
+    """Append to a list field of the current run (e.g. degraded modules), safe across threads."""
+    with _lock:
+        if _run is not None:
+            _run.setdefault(field, []).append(value)
+
+
+@contextmanager
+def span(name, **attrs):
+    """
+    Time a pipeline stage.
+
+    Yields the span dict so callers can add fields directly; `annotate` and
+    `increment` update the innermost span of the current thread.
+    """
+    stack = _stack()
+    record = {
+        "name": name,
+        "parent": stack[-1]["name"] if stack else None,
+        "outcome": "ok",
+        **attrs,
+    }
+    stack.append(record)
+    with ExitStack() as hooks:
+        for hook in _span_hooks:
+            hooks.enter_context(hook(name))
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record["outcome"] = "error"
+            record["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record["wall_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            stack.pop()
+            with _lock:
+                if _run is not None:
+                    _run["spans"].append(record)
+
+
+def traced(name):
+    """Decorator form of `span`; a falsy return value marks the span as failed."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name) as record:
+                result = func(*args, **kwargs)
+                if not result:
+                    record["outcome"] = "failed"
+                return result
+        return wrapper
+    return decorator
+
+
+def annotate(**fields):
+    """Set fields on the innermost open span of the current thread."""
+    stack = _stack()
+    if stack:
+        stack[-1].update(fields)
+
+
+def increment(field, amount=1):
+    """Add to a numeric field on the innermost open span of the current thread."""
+    stack = _stack()
+    if stack:
+        stack[-1][field] = stack[-1].get(field, 0) + amount
+
+
+def end_run(**attrs):
+    """
+    Close the current run and append it as one JSON line to METRICS_PATH.
+
+    Returns:
+        dict: The run record that was written, or None if no run was started.
+    """
+    global _run
+    with _lock:
+        run, _run = _run, None
+    if run is None:
+        return None
+
+    run.update(attrs)
+    run["total_ms"] = round((time.perf_counter() - run.pop("_start")) * 1000, 1)
+
+    try:
+        with open(METRICS_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run, default=str) + "\n")
+        print(f"\n--- Run metrics written to {METRICS_PATH} ---")
+    except OSError as e:
+        print(f"Error writing run metrics: {e}")
+    return run
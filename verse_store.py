@@ -0,0 +1,291 @@
+"""
+Verse Store Module
+
+A verse-indexed SQLite store of scripture, keyed by (version, book, chapter,
+verse), filled from the cleaned passages get_bible_text fetches. Any range
+of stored verses can be assembled locally with one primary-key range scan,
+so after warm-up most days need no BibleGateway request. Key verses quoted
+by the model can be checked against the stored text.
+
+Chapters are only served for "whole chapter" references once a whole
+chapter has been stored (chapter lengths are learned, not hard-coded).
+
+Usage:
+    python verse_store.py show "Genesis 43:1-5" --version ESV
+    python verse_store.py stats
+"""
+
+import argparse
+import difflib
+import os
+import re
+import sqlite3
+import threading
+
+from bs4 import BeautifulSoup
+
+import scripture_refs
+from scripture_refs import CHAPTER_END
+
+# Store location (inside the local fetch cache)
+DB_PATH = os.path.join(
+    os.getenv("DEVOTIONAL_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")),
+    "verses.db",
+)
+
+_lock = threading.Lock()
+
+_VERSE_CLASS = re.compile(r"^([1-3]?[A-Za-z]+)-(\d+)-(\d+)$")
+
+
+def _connect():
+    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS verses (
+            version TEXT NOT NULL,
+            book INTEGER NOT NULL,
+            chapter INTEGER NOT NULL,
+            verse INTEGER NOT NULL,
+            heading TEXT,
+            paragraph_start INTEGER NOT NULL DEFAULT 0,
+            html TEXT NOT NULL,
+            text TEXT NOT NULL,
+            PRIMARY KEY (version, book, chapter, verse)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS chapters (
+            version TEXT NOT NULL,
+            book INTEGER NOT NULL,
+            chapter INTEGER NOT NULL,
+            last_verse INTEGER NOT NULL,
+            PRIMARY KEY (version, book, chapter)
+        ) WITHOUT ROWID
+    """)
+    return conn
+
+
+def extract_verses(passage_html):
+    """
+    Split one cleaned passage into verses.
+
+    Returns:
+        Dict: {(book, chapter, verse): {'heading', 'paragraph_start', 'html', 'text'}}
+        in document order. Verses split over several lines (poetry) are joined.
+    """
+    soup = BeautifulSoup(passage_html, "html.parser")
+    verses = {}
+    pending_heading = None
+    for span in soup.find_all("span", class_="text"):
+        match = next((_VERSE_CLASS.match(c) for c in span.get("class", []) if _VERSE_CLASS.match(c)), None)
+        if not match:
+            continue
+        try:
+            key = (scripture_refs.book_index(match.group(1)), int(match.group(2)), int(match.group(3)))
+        except ValueError:
+            continue
+        if span.find_parent(["h3", "h4"]):
+            pending_heading = span.get_text(" ", strip=True)
+            continue
+
+        paragraph = span.find_parent("p")
+        first_in_paragraph = paragraph is not None and paragraph.find("span", class_="text") is span
+        entry = verses.get(key)
+        if entry is None:
+            verses[key] = {
+                "heading": pending_heading,
+                "paragraph_start": int(first_in_paragraph),
+                "html": span.decode_contents().strip(),
+                "text": span.get_text(" ", strip=True),
+            }
+            pending_heading = None
+        else:
+            entry["html"] += " " + span.decode_contents().strip()
+            entry["text"] += " " + span.get_text(" ", strip=True)
+    return verses
+
+
+def store_passages(reference, version, passages_html):
+    """
+    Store the verses of fetched passages. When the passages line up with the
+    canonical parts of `reference`, whole-chapter parts also record the
+    chapter's length so whole chapters can be served later.
+
+    Returns:
+        int: Number of verses stored.
+    """
+    try:
+        parts = scripture_refs.merge(scripture_refs.parse(reference))
+    except ValueError:
+        parts = []
+
+    rows, complete = [], {}
+    for i, passage_html in enumerate(passages_html):
+        verses = extract_verses(passage_html)
+        for (book, chapter, verse), entry in verses.items():
+            rows.append((version, book, chapter, verse, entry["heading"], entry["paragraph_start"],
+                         entry["html"], entry["text"]))
+        if len(parts) == len(passages_html) and verses:
+            part = parts[i]
+            for book, chapter, verse in verses:
+                # A chapter is complete if the part covers it from verse 1 through its end
+                whole = (
+                    book == part.book
+                    and part.start_chapter <= chapter <= part.end_chapter
+                    and (chapter > part.start_chapter or part.start_verse == 1)
+                    and (chapter < part.end_chapter or part.end_verse == CHAPTER_END)
+                )
+                if whole:
+                    complete[(book, chapter)] = max(complete.get((book, chapter), 0), verse)
+
+    with _lock:
+        conn = _connect()
+        conn.executemany("INSERT OR REPLACE INTO verses VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.executemany(
+            "INSERT OR REPLACE INTO chapters VALUES (?, ?, ?, ?)",
+            [(version, book, chapter, last) for (book, chapter), last in complete.items()]
+        )
+        conn.commit()
+        conn.close()
+    return len(rows)
+
+
+def _render(rows):
+    """Rebuild passage HTML (headings and paragraphs) from stored verse rows."""
+    parts, open_paragraph = [], False
+    for book, chapter, verse, heading, paragraph_start, html in rows:
+        if heading:
+            if open_paragraph:
+                parts.append("</p>")
+                open_paragraph = False
+            parts.append(f"<h3>{heading}</h3>")
+        if paragraph_start or not open_paragraph:
+            if open_paragraph:
+                parts.append("</p>")
+            parts.append("<p>")
+            open_paragraph = True
+        code = scripture_refs.BOOKS[book][1]
+        parts.append(f'<span class="text {code}-{chapter}-{verse}">{html}</span> ')
+    if open_paragraph:
+        parts.append("</p>")
+    return "".join(parts)
+
+
+def _assemble_passage(conn, version, passage):
+    """HTML for one Passage, or None unless every verse in it is stored."""
+    book, c1, v1, c2, v2 = passage
+    lengths = dict(conn.execute(
+        "SELECT chapter, last_verse FROM chapters WHERE version = ? AND book = ? AND chapter BETWEEN ? AND ?",
+        (version, book, c1, c2)
+    ).fetchall())
+    rows = conn.execute(
+        """SELECT book, chapter, verse, heading, paragraph_start, html FROM verses
+           WHERE version = ? AND book = ? AND (chapter, verse) BETWEEN (?, ?) AND (?, ?)
+           ORDER BY chapter, verse""",
+        (version, book, c1, v1, c2, v2)
+    ).fetchall()
+
+    have = {(chapter, verse) for _, chapter, verse, _, _, _ in rows}
+    for chapter in range(c1, c2 + 1):
+        last = v2 if chapter == c2 else CHAPTER_END
+        if last == CHAPTER_END:
+            if chapter not in lengths:
+                return None
+            last = lengths[chapter]
+        first = v1 if chapter == c1 else 1
+        if any((chapter, verse) not in have for verse in range(first, last + 1)):
+            return None
+    return _render(rows)
+
+
+def assemble(reference, version):
+    """
+    Assemble a reference from stored verses.
+
+    Returns:
+        List of passage HTML strings (one per canonical part), or None if any
+        verse is missing.
+    """
+    try:
+        parts = scripture_refs.merge(scripture_refs.parse(reference))
+    except ValueError:
+        return None
+    with _lock:
+        conn = _connect()
+        passages = [_assemble_passage(conn, version, part) for part in parts]
+        conn.close()
+    if any(passage is None for passage in passages):
+        return None
+    return passages
+
+
+def verse_text(reference, version):
+    """Plain text of a reference from stored verses, or None if any verse is missing."""
+    passages = assemble(reference, version)
+    if passages is None:
+        return None
+    return " ".join(BeautifulSoup(html, "html.parser").get_text(" ", strip=True) for html in passages)
+
+
+def _normalize(text):
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def check_key_verses(key_verses, version, threshold=0.8):
+    """
+    Compare quoted key verses ("Genesis 43:23 - Peace to you...") with the stored text.
+
+    Returns:
+        List of dicts: [{'key_verse', 'reference', 'status' ('match'|'mismatch'|'unknown'),
+                         'similarity', 'actual'}, ...]
+    """
+    results = []
+    for key_verse in key_verses or []:
+        match = re.match(r"^\s*(.+?\d+:\d+(?:\s*[-–]\s*\d+)?)\s*[-–—:]\s*(.+)$", key_verse)
+        result = {"key_verse": key_verse, "reference": None, "status": "unknown", "similarity": None, "actual": None}
+        if match:
+            result["reference"] = match.group(1).strip()
+            quoted = match.group(2).strip().strip('"“”')
+            actual = verse_text(result["reference"], version)
+            if actual:
+                quoted_norm, actual_norm = _normalize(quoted), _normalize(actual)
+                # A quoted fragment of the verse counts as a match
+                if quoted_norm and quoted_norm in actual_norm:
+                    similarity = 1.0
+                else:
+                    similarity = difflib.SequenceMatcher(None, quoted_norm, actual_norm).ratio()
+                result.update(
+                    status="match" if similarity >= threshold else "mismatch",
+                    similarity=round(similarity, 3),
+                    actual=actual,
+                )
+        results.append(result)
+    return results
+
+
+def stats():
+    """Return {version: (verses stored, complete chapters)}."""
+    with _lock:
+        conn = _connect()
+        verses = dict(conn.execute("SELECT version, COUNT(*) FROM verses GROUP BY version").fetchall())
+        chapters = dict(conn.execute("SELECT version, COUNT(*) FROM chapters GROUP BY version").fetchall())
+        conn.close()
+    return {version: (count, chapters.get(version, 0)) for version, count in verses.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect the local verse store.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    show_parser = subparsers.add_parser("show", help="Print a reference assembled from stored verses.")
+    show_parser.add_argument("reference")
+    show_parser.add_argument("--version", default="ESV")
+    subparsers.add_parser("stats", help="Count stored verses and complete chapters per version.")
+    args = parser.parse_args()
+
+    if args.command == "show":
+        text = verse_text(args.reference, args.version)
+        print(text if text else f"{args.reference} ({args.version}) is not fully stored yet.")
+    else:
+        for version, (count, chapters) in sorted(stats().items()):
+            print(f"{version}: {count} verses, {chapters} complete chapters")
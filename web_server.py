@@ -0,0 +1,257 @@
+"""
+Web Server Module
+
+Serves archived devotionals over HTTP so a web view, app or many readers
+can fetch a day without regenerating it:
+
+    GET /                   -> today's HTML (latest archived day)
+    GET /today.html|.json   -> same, as HTML or structured JSON
+    GET /YYYY-MM-DD.html    -> a past day (.json for the structured content)
+
+Bodies are rendered once per archived file (re-rendered only when the
+JSON changes) and stored precompressed (gzip, plus brotli when the brotli
+package is installed), each with a strong ETag, so a request is a dict
+lookup and a socket write; If-None-Match answers 304 with no body.
+
+Usage:
+    python web_server.py serve --port 8080
+    python web_server.py benchmark --seconds 5 --clients 4
+"""
+
+import argparse
+import gzip
+import hashlib
+import http.client
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import devotional_archive
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Past days never change once sent; today's may be re-run
+TODAY_MAX_AGE = 300
+PAST_MAX_AGE = 86400
+
+JSON_FIELDS = ["date", "reference", "v2_content", "case_study", "core_devotional", "quotes"]
+
+_PATH = re.compile(r"^/(?:(today|\d{4}-\d{2}-\d{2})\.(html|json))?$")
+
+
+class Resource:
+    """One precomputed response body in every supported encoding."""
+
+    def __init__(self, body, content_type):
+        digest = hashlib.sha1(body).hexdigest()[:16]
+        self.content_type = content_type
+        self.variants = {"identity": (body, f'"{digest}"')}
+        self.variants["gzip"] = (gzip.compress(body, compresslevel=9, mtime=0), f'"{digest}-gz"')
+        if brotli:
+            self.variants["br"] = (brotli.compress(body), f'"{digest}-br"')
+
+    def negotiate(self, accept_encoding):
+        """Pick the smallest encoding the client accepts (q=0 excludes one)."""
+        accepted = set()
+        for part in (accept_encoding or "").split(","):
+            name, _, params = part.strip().partition(";")
+            if name and not re.search(r"q\s*=\s*0(\.0*)?\s*$", params):
+                accepted.add(name.strip().lower())
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+
+def build_resources(record, render):
+    """Precompute the HTML and JSON resources for one archive record."""
+    content = {field: record.get(field) for field in JSON_FIELDS}
+    return {
+        "html": Resource(render(record).encode("utf-8"), "text/html; charset=utf-8"),
+        "json": Resource(json.dumps(content, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8"),
+    }
+
+
+class DevotionalSite:
+    """
+    Precomputed HTML/JSON resources for archived days, refreshed when a day's
+    file changes. Days in `pinned` are served as given (no archive file needed).
+    """
+
+    def __init__(self, render):
+        self.render = render
+        self.pinned = {}
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def latest_date(self):
+        """Most recent archived day that is not in the future."""
+        today = datetime.now().isoformat()[:10]
+        if not os.path.isdir(devotional_archive.ARCHIVE_DIR):
+            return None
+        dates = [
+            name[:-5] for name in os.listdir(devotional_archive.ARCHIVE_DIR)
+            if re.match(r"^\d{4}-\d{2}-\d{2}\.json$", name) and name[:-5] <= today
+        ]
+        return max(dates, default=None)
+
+    def resources(self, date):
+        """Return {'html': Resource, 'json': Resource} for `date`, or None if it isn't archived."""
+        if date in self.pinned:
+            return self.pinned[date]
+        path = os.path.join(devotional_archive.ARCHIVE_DIR, f"{date}.json")
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        key = (stat.st_size, stat.st_mtime_ns)
+        cached = self._cache.get(date)
+        if cached and cached[0] == key:
+            return cached[1]
+        with self._lock:
+            resources = build_resources(devotional_archive.load_run(date), self.render)
+            self._cache[date] = (key, resources)
+        return resources
+
+
+def make_server(site, host="127.0.0.1", port=8080):
+    """Build (but don't start) a threaded HTTP server for `site`."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive
+        disable_nagle_algorithm = True  # Headers and body go out as separate writes
+
+        def do_GET(self):
+            match = _PATH.match(self.path.split("?", 1)[0])
+            if not match:
+                self.send_error(404)
+                return
+            day, kind = match.group(1) or "today", match.group(2) or "html"
+            date = site.latest_date() if day == "today" else day
+            resources = site.resources(date) if date else None
+            if not resources:
+                self.send_error(404, f"No devotional archived for {day}")
+                return
+
+            resource = resources[kind]
+            encoding = resource.negotiate(self.headers.get("Accept-Encoding"))
+            body, etag = resource.variants[encoding]
+            not_modified = etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]
+            self.send_response(304 if not_modified else 200)
+            self.send_header("ETag", etag)
+            self.send_header("Vary", "Accept-Encoding")
+            max_age = TODAY_MAX_AGE if day == "today" or date == site.latest_date() else PAST_MAX_AGE
+            self.send_header("Cache-Control", f"public, max-age={max_age}")
+            if not_modified:
+                self.end_headers()
+                return
+            self.send_header("Content-Type", resource.content_type)
+            if encoding != "identity":
+                self.send_header("Content-Encoding", encoding)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def start(site, host="127.0.0.1", port=8080):
+    """Serve `site` on a background thread. Returns the server (call .shutdown() to stop)."""
+    server = make_server(site, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"--- Devotional web server on http://{host}:{server.server_port}/ ---")
+    return server
+
+
+def default_render(record):
+    """Render with the email layout (imported lazily: devotional_bot pulls in selenium and genai)."""
+    import devotional_bot
+    return devotional_bot.render_archived(record)
+
+
+# --- Benchmark ---
+def _client_loop(args):
+    """Worker process: send keep-alive GETs until `deadline`; return the request count."""
+    port, path, headers, deadline = args
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    count = 0
+    while time.time() < deadline:
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        count += 1
+    conn.close()
+    return count
+
+
+def benchmark(seconds=5, clients=4, date=None):
+    """
+    Measure requests per second against one server process. The server thread
+    shares one interpreter (one core under the GIL); clients run in separate
+    processes so they don't compete with it.
+    """
+    site = DevotionalSite(default_render)
+    if date is None:
+        # No archive needed: benchmark the canned offline content
+        import devotional_bot
+        import offline_stubs
+        offline_stubs.install(devotional_bot)
+        date = "2000-01-01"
+        site.pinned[date] = build_resources(offline_stubs.sample_record(date), default_render)
+    server = start(site, port=0)
+    port = server.server_port
+
+    resources = site.resources(date)
+    etag = resources["html"].variants["gzip"][1]
+    cases = [
+        ("html, identity", f"/{date}.html", {}),
+        ("html, gzip", f"/{date}.html", {"Accept-Encoding": "gzip"}),
+        ("html, 304", f"/{date}.html", {"Accept-Encoding": "gzip", "If-None-Match": etag}),
+        ("json, gzip", f"/{date}.json", {"Accept-Encoding": "gzip"}),
+    ]
+    if brotli:
+        cases.insert(2, ("html, br", f"/{date}.html", {"Accept-Encoding": "br, gzip"}))
+
+    for encoding, (body, _) in resources["html"].variants.items():
+        print(f"HTML {encoding}: {len(body):,} bytes")
+    print(f"\n{'case':<16} {'req/s':>10}")
+    with multiprocessing.Pool(clients) as pool:
+        for label, path, headers in cases:
+            deadline = time.time() + seconds
+            total = sum(pool.map(_client_loop, [(port, path, headers, deadline)] * clients))
+            print(f"{label:<16} {total / seconds:>10,.0f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve archived devotionals over HTTP.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve_parser = subparsers.add_parser("serve", help="Serve the archive until Ctrl+C.")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8080)
+    bench_parser = subparsers.add_parser("benchmark", help="Requests per second for one day's page.")
+    bench_parser.add_argument("--seconds", type=float, default=5)
+    bench_parser.add_argument("--clients", type=int, default=4)
+    bench_parser.add_argument("--date", help="Archived YYYY-MM-DD day (default: canned offline content).")
+    args = parser.parse_args()
+
+    if args.command == "benchmark":
+        benchmark(args.seconds, args.clients, args.date)
+    else:
+        server = make_server(DevotionalSite(default_render), args.host, args.port)
+        print(f"--- Devotional web server on http://{args.host}:{args.port}/ ---")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n--- Stopping web server ---")